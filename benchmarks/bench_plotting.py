@@ -0,0 +1,74 @@
+import time
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.bench_streaming import percentiles
+from benchmarks.resource_usage import ResourceUsage
+from src.utils.decimation import MinMaxDecimator
+from src.utils.ring_buffer import RingBuffer
+
+
+def run_plot_preparation_benchmark(channel_count: int = 16,
+                                   sampling_rate: float = 2000,
+                                   x_axis_max: float = 3.0,
+                                   frame_rate: float = 60,
+                                   plot_width: int = 500,
+                                   iterations: int = 1000) -> Dict:
+    """
+    Time the per-frame data preparation RealTimePlotter needs for a redraw.
+
+    Each iteration writes one display frame's worth of new samples to a ring
+    buffer, then takes the latest x_axis_max seconds for every channel and
+    reduces it to a min/max envelope, as RealTimePlotter does per redraw.
+
+    Args:
+        channel_count: Number of subplots
+        sampling_rate: Number of samples per second
+        x_axis_max: Seconds of data displayed
+        frame_rate: Display frames per second being simulated
+        plot_width: Subplot width in pixels, i.e. the number of bins
+        iterations: Number of display frames to prepare
+
+    Returns:
+        Dict of results
+    """
+    ring_buffer = RingBuffer(channel_count, sampling_rate, capacity_seconds=2 * x_axis_max)
+    window_length = int(x_axis_max * sampling_rate)
+    samples_per_frame = max(1, int(sampling_rate / frame_rate))
+
+    rng = np.random.default_rng(0)
+    new_samples = rng.normal(size=(samples_per_frame, channel_count)).astype(np.float32)
+    ring_buffer.write(rng.normal(size=(window_length, channel_count)).astype(np.float32))
+
+    decimator = MinMaxDecimator(channel_count, window_length, plot_width)
+
+    durations = np.empty(iterations)
+    points_prepared = 0
+    usage = ResourceUsage()
+
+    for iteration in range(iterations):
+        ring_buffer.write(new_samples)
+
+        start = time.perf_counter()
+        window = ring_buffer.latest(window_length)
+        curves = decimator.decimate(window)
+        durations[iteration] = time.perf_counter() - start
+
+        points_prepared += curves.size
+
+    usage.stop()
+
+    return {
+        "channel_count": channel_count,
+        "sampling_rate": sampling_rate,
+        "x_axis_max": x_axis_max,
+        "plot_width": plot_width,
+        "iterations": iterations,
+        "raw_points_per_frame": window_length * channel_count,
+        "points_per_frame": points_prepared / iterations,
+        "prepare_ms": percentiles(durations * 1000),
+        "max_frame_rate": float(1 / np.mean(durations)),
+        "cpu_percent": usage.cpu_percent,
+        "peak_rss_mb": usage.peak_rss_mb,
+    }
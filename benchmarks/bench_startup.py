@@ -0,0 +1,105 @@
+"""
+Time from interpreter start to the config window being shown.
+
+Each run starts a fresh interpreter, so nothing is cached in sys.modules.
+The "lazy" run imports what main.py imports. The "baseline" run also
+imports what the config window's import graph pulled in before device
+backends were loaded on first use. Then it was only numpy, imported by
+src.utils.tracing, since device managers and plotters were never imported
+on the way to the config window.
+
+    python -m benchmarks.bench_startup --repeats 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+# Modules whose import cost startup should not pay
+HEAVY_MODULES = ("numpy", "scipy", "pyqtgraph", "qtm", "pygds", "pkg_resources")
+
+# Heavy modules that main.py's imports loaded before lazy loading
+BASELINE_MODULES = ("numpy",)
+
+# Run in a fresh interpreter with the mode as its argument
+STARTUP_SCRIPT = f"""
+import time
+start = time.perf_counter()
+
+import importlib
+import json
+import sys
+
+if sys.argv[1] == "baseline":
+    for module_name in {BASELINE_MODULES!r}:
+        importlib.import_module(module_name)
+
+from PySide6.QtWidgets import QApplication
+
+from src.managers.config_manager import ConfigManager
+from src.managers.window_manager import WindowManager
+
+app = QApplication([])
+config_window = WindowManager(ConfigManager()).create_config_window()
+config_window.show()
+app.processEvents()
+
+print(json.dumps({{"window_shown_s": time.perf_counter() - start,
+                   "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_startup(mode: str) -> Dict:
+    """
+    Start a fresh interpreter and time showing the config window.
+
+    Args:
+        mode: "lazy" or "baseline"
+
+    Returns:
+        Dict with the seconds to the window being shown (after the
+        interpreter itself has started) and the heavy modules loaded by then
+    """
+    environment = dict(os.environ)
+    environment.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    completed = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, mode],
+                               capture_output=True,
+                               text=True,
+                               check=True,
+                               env=environment)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_startup_benchmark(repeats: int = 5) -> Dict:
+    """
+    Time lazy and baseline startup `repeats` times each.
+
+    Returns:
+        Dict of results, times in milliseconds
+    """
+    results = {"repeats": repeats}
+
+    for mode in ("lazy", "baseline"):
+        runs = [measure_startup(mode) for _ in range(repeats)]
+        times_ms = [1000 * run["window_shown_s"] for run in runs]
+        results[mode] = {"median_ms": statistics.median(times_ms),
+                         "min_ms": min(times_ms),
+                         "max_ms": max(times_ms),
+                         "heavy_modules": runs[-1]["heavy_modules"]}
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time startup to the config window.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.repeats)
+    for mode in ("lazy", "baseline"):
+        print(f"{mode:>8}: {results[mode]['median_ms']:.0f} ms median "
+              f"(heavy modules: {', '.join(results[mode]['heavy_modules']) or 'none'})")
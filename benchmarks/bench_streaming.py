@@ -0,0 +1,202 @@
+import threading
+import time
+from typing import Callable, Dict, List
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.resource_usage import ResourceUsage
+from src.devices.abstract_manager import AbstractDeviceManager
+from src.devices.trigno.trigno_client import TrignoClient
+from src.devices.trigno.trigno_manager import TrignoManager
+from src.devices.trigno.trigno_simulator import TrignoSimulator
+from src.devices.usbamp.fake_gds import FakeGDS
+from src.devices.usbamp.usbamp_manager import USBAmpManager
+
+
+def configure_client_class(channel_count: int,
+                           sampling_rate: float,
+                           command_port: int,
+                           emg_data_port: int):
+    """
+    Point TrignoClient at a simulator's ports and frame format.
+
+    The class is patched rather than subclassed because QObject attribute
+    lookup resolves connect() to QObject.connect on further subclasses.
+
+    Returns:
+        Context manager that restores the original class attributes on exit
+    """
+    return patch.multiple(TrignoClient,
+                          COMMAND_PORT=command_port,
+                          EMG_DATA_PORT=emg_data_port,
+                          EMG_CHANNELS=channel_count,
+                          EMG_FRAME_SIZE=channel_count * 4,
+                          EMG_SAMPLING_RATE=sampling_rate)
+
+
+def run_streaming_benchmark(channel_count: int,
+                            sampling_rate: float,
+                            duration: float,
+                            poll_interval: float = 0.001) -> Dict:
+    """
+    Stream from a simulated base station through TrignoManager to a consumer.
+
+    The simulator puts the frame index in the last channel, so the consumer
+    can tell when each sample was due to be sent and whether any were lost.
+
+    Args:
+        channel_count: Number of channels per frame
+        sampling_rate: Frames per second sent by the simulator
+        duration: Seconds to stream for
+        poll_interval: Seconds the consumer sleeps between reads
+
+    Returns:
+        Dict of results
+    """
+    simulator = TrignoSimulator(command_port=0,
+                                emg_data_port=0,
+                                sampling_rate=sampling_rate,
+                                channel_count=channel_count,
+                                embed_frame_counter=True)
+    simulator.start()
+
+    with configure_client_class(channel_count,
+                                sampling_rate,
+                                simulator.command_port,
+                                simulator.emg_data_port):
+        manager = TrignoManager(TrignoClient, host_ip=simulator.host_ip)
+        manager.connect()
+        results = stream_and_consume(manager, lambda: simulator.stream_start_time,
+                                     duration, poll_interval)
+
+        manager.disconnect()
+        simulator.stop()
+
+    results["frames_sent"] = simulator.frames_sent
+    return results
+
+
+def run_usbamp_streaming_benchmark(channel_count: int,
+                                   sampling_rate: int,
+                                   duration: float,
+                                   poll_interval: float = 0.001) -> Dict:
+    """
+    Stream from a FakeGDS through USBAmpManager to a consumer.
+
+    Args:
+        channel_count: Number of amplifier channels
+        sampling_rate: Samples per second; must be a g.USBamp rate
+        duration: Seconds to stream for
+        poll_interval: Seconds the consumer sleeps between reads
+
+    Returns:
+        Dict of results
+    """
+    def create_device() -> FakeGDS:
+        return FakeGDS(channel_count=channel_count, embed_scan_counter=True)
+
+    manager = USBAmpManager(sampling_rate=sampling_rate, gds_class=create_device)
+    manager.connect()
+    device = manager.client.connection
+
+    results = stream_and_consume(manager, lambda: device.stream_start_time,
+                                 duration, poll_interval)
+    results["frames_sent"] = device.scans_sent
+    results["scans_per_block"] = manager.client.scans_per_block
+
+    manager.disconnect()
+    return results
+
+
+def stream_and_consume(manager: AbstractDeviceManager,
+                       get_stream_start_time: Callable[[], float],
+                       duration: float,
+                       poll_interval: float) -> Dict:
+    """
+    Stream through a manager while a thread polls its ring buffer.
+
+    The source must put the frame index in the last channel.
+
+    Args:
+        manager: Connected device manager
+        get_stream_start_time: Returns the perf_counter() time frame 0 was
+        due, once streaming has started
+        duration: Seconds to stream for
+        poll_interval: Seconds the consumer sleeps between reads
+
+    Returns:
+        Dict of results
+    """
+    sampling_rate = manager.stream_queue.sampling_rate
+
+    latencies: List[float] = []
+    consumer_stats = {"samples": 0, "missed": 0, "out_of_order": 0}
+    is_consuming = threading.Event()
+    is_consuming.set()
+
+    def consume() -> None:
+        next_index = 0
+        expected_frame = 0
+
+        while is_consuming.is_set():
+            start, block = manager.stream_queue.read_since(next_index)
+            if block.shape[1]:
+                now = time.perf_counter()
+                frame_indices = block[-1]
+
+                # Latency of the newest sample: now minus when it was due.
+                # Converted from float32 so the time keeps full precision.
+                newest_frame = int(frame_indices[-1])
+                newest_due = get_stream_start_time() + (newest_frame + 1) / sampling_rate
+                latencies.append(now - newest_due)
+
+                consumer_stats["missed"] += start - next_index
+                consumer_stats["out_of_order"] += int(frame_indices[0] != expected_frame)
+                consumer_stats["out_of_order"] += int(np.count_nonzero(np.diff(frame_indices) != 1))
+                consumer_stats["samples"] += block.shape[1]
+
+                expected_frame = newest_frame + 1
+                next_index = start + block.shape[1]
+
+            time.sleep(poll_interval)
+
+    consumer = threading.Thread(target=consume)
+    usage = ResourceUsage()
+
+    manager.start_streaming()
+    consumer.start()
+    time.sleep(duration)
+    manager.stop_streaming()
+
+    usage.stop()
+    is_consuming.clear()
+    consumer.join()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "channel_count": manager.stream_queue.channel_count,
+        "sampling_rate": sampling_rate,
+        "duration_s": usage.wall_time,
+        "frames_received": manager.stream_queue.total_samples,
+        "frames_consumed": consumer_stats["samples"],
+        "frames_per_second": manager.stream_queue.total_samples / usage.wall_time,
+        "frames_missed_by_consumer": consumer_stats["missed"],
+        "frame_sequence_errors": consumer_stats["out_of_order"],
+        "blocks_consumed": len(latencies),
+        "latency_ms": percentiles(latencies_ms),
+        "cpu_percent": usage.cpu_percent,
+        "peak_rss_mb": usage.peak_rss_mb,
+    }
+
+
+def percentiles(values: np.ndarray) -> Dict[str, float]:
+    """Summarize values as p50/p95/p99/max."""
+    if len(values) == 0:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(np.max(values))}
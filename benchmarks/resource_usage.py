@@ -0,0 +1,42 @@
+import time
+from typing import Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is reported as None there
+    resource = None
+
+
+class ResourceUsage:
+    """
+    Measures wall time, process CPU usage and peak RSS from creation until
+    stop() is called.
+
+    Peak RSS is the high-water mark of the whole process, so each benchmark
+    should run in its own process for it to be meaningful.
+    """
+
+    def __init__(self):
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+        self.wall_time: Optional[float] = None
+        self.cpu_time: Optional[float] = None
+
+    def stop(self) -> None:
+        self.wall_time = time.perf_counter() - self._start_wall
+        self.cpu_time = time.process_time() - self._start_cpu
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU time as a percentage of one core over the measured period."""
+        return 100 * self.cpu_time / self.wall_time
+
+    @property
+    def peak_rss_mb(self) -> Optional[float]:
+        if resource is None:
+            return None
+
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,98 @@
+"""
+Headless benchmarks for the acquisition and plot preparation paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --duration 10 --output results.json
+
+Streaming benchmarks run TrignoClient -> TrignoManager -> a polling consumer
+against a local TrignoSimulator for every combination of --channels and
+--rates. USBAmp benchmarks run USBAmpManager against a FakeGDS at each of
+--usbamp-rates with 16 channels. Each benchmark runs in a fresh process so
+peak RSS is per run. Startup is timed to the config window being shown, with
+and without device backends and plotters imported up front.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import json
+from pathlib import Path
+import platform
+import subprocess
+import sys
+from typing import Callable, Dict, Optional
+
+from benchmarks.bench_plotting import run_plot_preparation_benchmark
+from benchmarks.bench_startup import run_startup_benchmark
+from benchmarks.bench_streaming import run_streaming_benchmark, run_usbamp_streaming_benchmark
+
+
+def run_isolated(benchmark: Callable, **kwargs) -> Dict:
+    """Run a benchmark function in its own process and return its results."""
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        return executor.submit(benchmark, **kwargs).result()
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the streaming benchmarks.")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="Seconds to stream for in each streaming benchmark")
+    parser.add_argument("--channels", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--rates", type=float, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--usbamp-rates", type=int, nargs="+", default=[1200, 2400, 4800])
+    parser.add_argument("--startup-repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "streaming": [],
+        "usbamp_streaming": [],
+        "plot_preparation": [],
+        "startup": None,
+    }
+
+    for channel_count in args.channels:
+        for sampling_rate in args.rates:
+            print(f"Streaming: {channel_count} channels at {sampling_rate:g} Hz")
+            result = run_isolated(run_streaming_benchmark,
+                                  channel_count=channel_count,
+                                  sampling_rate=sampling_rate,
+                                  duration=args.duration)
+            results["streaming"].append(result)
+
+    for sampling_rate in args.usbamp_rates:
+        print(f"USBAmp streaming: 16 channels at {sampling_rate} Hz")
+        result = run_isolated(run_usbamp_streaming_benchmark,
+                              channel_count=16,
+                              sampling_rate=sampling_rate,
+                              duration=args.duration)
+        results["usbamp_streaming"].append(result)
+
+    print("Plot preparation: 16 channels")
+    results["plot_preparation"].append(run_isolated(run_plot_preparation_benchmark,
+                                                    channel_count=16))
+
+    print("Startup to config window")
+    results["startup"] = run_startup_benchmark(args.startup_repeats)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.optimize import OptimizeWarning, curve_fit
+from scipy.special import expit
+
+from src.detectors.detection_params import DetectionParameters
+from src.detectors.peak_detector import DetectionResults, PeakDetector
+from src.detectors.trigger_detector import TriggerDetector
+from src.devices.device_types import DeviceTypes
+from src.recorders.session_format import SessionReader
+
+
+@dataclass
+class SessionEpochs:
+    """Every stimulus of a session, cut out of one device's data."""
+    trigger_indices: np.ndarray  # (epochs,) sample index of each trigger
+    stimulus_intensities: np.ndarray  # (epochs,) NaN where unknown
+    sampling_rate: float
+    trigger_offset: int  # Samples in each epoch before its trigger
+    data: np.ndarray  # (epochs, channels, roi_length)
+
+
+@dataclass
+class RecruitmentCurves:
+    """
+    M-wave and H-reflex recruitment curves of every channel.
+
+    Per-intensity arrays have shape (intensities, channels) and per-channel
+    arrays have shape (channels,). Amplitudes are peak-to-peak in the units
+    of the epoch data. Fit parameters are NaN where a fit failed.
+    """
+    intensities: np.ndarray  # (intensities,) sorted unique stimulus intensities
+    epoch_counts: np.ndarray  # (intensities,) number of epochs at each intensity
+    m_amplitude: np.ndarray  # Mean M-wave amplitude per intensity
+    h_amplitude: np.ndarray  # Mean H-reflex amplitude per intensity
+    m_latency: np.ndarray  # Mean M-wave latency per intensity, NaN if never detected
+    h_latency: np.ndarray  # Mean H-reflex latency per intensity, NaN if never detected
+    m_fit: np.ndarray  # (channels, 3) sigmoid m_max, i50, slope
+    h_fit: np.ndarray  # (channels, 3) Gaussian h_max, i_peak, width
+    m_max: np.ndarray  # Sigmoid plateau, or largest mean M amplitude if the fit failed
+    h_max: np.ndarray  # Gaussian peak, or largest mean H amplitude if the fit failed
+    h_m_ratio: np.ndarray  # h_max / m_max
+    detection: DetectionResults  # Per-epoch results, (epochs, channels) arrays
+
+
+def sigmoid(intensity: np.ndarray, m_max: float, i50: float, slope: float) -> np.ndarray:
+    """Boltzmann sigmoid used for M-wave recruitment."""
+    # expit doesn't overflow for the extreme slopes curve_fit tries
+    return m_max * expit((intensity - i50) / slope)
+
+
+def gaussian(intensity: np.ndarray, h_max: float, i_peak: float, width: float) -> np.ndarray:
+    """Gaussian used for the rise and fall of H-reflex recruitment."""
+    return h_max * np.exp(-0.5 * ((intensity - i_peak) / width) ** 2)
+
+
+def load_session_epochs(session_dir: Path,
+                        device: DeviceTypes,
+                        trigger_channel: int,
+                        params: DetectionParameters,
+                        trigger_detector: Optional[TriggerDetector] = None,
+                        pre_trigger: float = 0.0) -> SessionEpochs:
+    """
+    Cut an epoch around every trigger in a recorded session.
+
+    The whole trigger channel is searched in one pass, and all epochs are
+    gathered from the memory-mapped device file with a single fancy index.
+    Stimulus intensities come from the trials the triggers fall in.
+
+    Args:
+        session_dir: Directory the session was written to
+        device: Device whose data is cut into epochs
+        trigger_channel: Index of the trigger channel in the device data
+        params: Detection parameters; roi_length sets the epoch length
+        trigger_detector: Detector for the trigger channel (default:
+        TriggerDetector with default thresholds)
+        pre_trigger: Seconds of data to include before each trigger
+
+    Returns:
+        SessionEpochs
+    """
+    reader = SessionReader(session_dir)
+    data = reader.get_device_data(device)
+    sampling_rate = reader.devices[device.value]["sampling_rate"]
+    first_sample_index = reader.get_first_sample_index(device)
+
+    trigger_detector = trigger_detector or TriggerDetector(sampling_rate)
+    trigger_indices = trigger_detector.process(np.asarray(data[:, trigger_channel]),
+                                               first_sample_index)
+
+    # Epoch starts as rows of the data file
+    trigger_offset = int(round(pre_trigger * sampling_rate))
+    starts = trigger_indices - trigger_offset - first_sample_index
+    is_complete = (starts >= 0) & (starts + params.roi_length <= data.shape[0])
+    trigger_indices = trigger_indices[is_complete]
+    starts = starts[is_complete]
+
+    # (samples - roi_length + 1, channels, roi_length) view; indexing copies
+    if starts.size:
+        windows = sliding_window_view(data, params.roi_length, axis=0)
+        epochs = np.ascontiguousarray(windows[starts])
+    else:
+        epochs = np.empty((0, data.shape[1], params.roi_length), dtype=data.dtype)
+
+    return SessionEpochs(trigger_indices=trigger_indices,
+                         stimulus_intensities=_get_trial_intensities(reader,
+                                                                     trigger_indices,
+                                                                     sampling_rate),
+                         sampling_rate=sampling_rate,
+                         trigger_offset=trigger_offset,
+                         data=epochs)
+
+
+def build_recruitment_curves(epochs: np.ndarray,
+                             intensities: Sequence[float],
+                             params: DetectionParameters,
+                             trigger_offset: int = 0) -> RecruitmentCurves:
+    """
+    Measure every epoch and fit M-wave and H-reflex recruitment curves.
+
+    All epochs are measured by PeakDetector in one batched pass, and
+    per-intensity means are computed without looping over epochs. Only the
+    curve fits loop, once per channel.
+
+    Args:
+        epochs: Array of shape (epochs, channels, roi_length)
+        intensities: Stimulus intensity of each epoch. Epochs with NaN
+        intensity are left out of the curves.
+        params: Detection parameters
+        trigger_offset: Samples in each epoch before its trigger, e.g.
+        SessionEpochs.trigger_offset
+
+    Returns:
+        RecruitmentCurves
+    """
+    intensities = np.asarray(intensities, dtype=np.float64)
+    if intensities.shape != epochs.shape[:1]:
+        raise ValueError("Need one stimulus intensity per epoch")
+
+    detection = PeakDetector(params).detect(epochs, trigger_offset)
+
+    is_known = ~np.isnan(intensities)
+    unique_intensities, group, epoch_counts = np.unique(intensities[is_known],
+                                                        return_inverse=True,
+                                                        return_counts=True)
+
+    m_amplitude = _group_mean(detection.m_amplitude[is_known], group, unique_intensities.size)
+    h_amplitude = _group_mean(detection.h_amplitude[is_known], group, unique_intensities.size)
+    m_latency = _group_mean(detection.m_latency[is_known], group, unique_intensities.size)
+    h_latency = _group_mean(detection.h_latency[is_known], group, unique_intensities.size)
+
+    channel_count = epochs.shape[1]
+    m_fit = np.full((channel_count, 3), np.nan)
+    h_fit = np.full((channel_count, 3), np.nan)
+    for channel in range(channel_count):
+        m_fit[channel] = _fit(sigmoid,
+                              intensities[is_known],
+                              detection.m_amplitude[is_known, channel],
+                              _sigmoid_guess(unique_intensities, m_amplitude[:, channel]))
+        h_fit[channel] = _fit(gaussian,
+                              intensities[is_known],
+                              detection.h_amplitude[is_known, channel],
+                              _gaussian_guess(unique_intensities, h_amplitude[:, channel]))
+
+    m_max = _fit_or_observed_max(m_fit[:, 0], m_amplitude)
+    h_max = _fit_or_observed_max(h_fit[:, 0], h_amplitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h_m_ratio = h_max / m_max
+
+    return RecruitmentCurves(intensities=unique_intensities,
+                             epoch_counts=epoch_counts,
+                             m_amplitude=m_amplitude,
+                             h_amplitude=h_amplitude,
+                             m_latency=m_latency,
+                             h_latency=h_latency,
+                             m_fit=m_fit,
+                             h_fit=h_fit,
+                             m_max=m_max,
+                             h_max=h_max,
+                             h_m_ratio=h_m_ratio,
+                             detection=detection)
+
+
+def _get_trial_intensities(reader: SessionReader,
+                           trigger_indices: np.ndarray,
+                           sampling_rate: float) -> np.ndarray:
+    """Return the stimulus intensity of the trial each trigger falls in."""
+    intensities = np.full(trigger_indices.size, np.nan)
+    trigger_times = trigger_indices / sampling_rate
+
+    for trial in reader.trials:
+        if trial.get("stimulus_intensity") is None:
+            continue
+        in_trial = (trigger_times >= trial["start_time"]) & (trigger_times < trial["end_time"])
+        intensities[in_trial] = trial["stimulus_intensity"]
+
+    return intensities
+
+
+def _group_mean(values: np.ndarray, group: np.ndarray, group_count: int) -> np.ndarray:
+    """
+    Mean of (epochs, channels) values per group, ignoring NaN.
+
+    Returns:
+        Array of shape (groups, channels), NaN for groups without values
+    """
+    is_valid = ~np.isnan(values)
+    sums = np.zeros((group_count, values.shape[1]))
+    counts = np.zeros((group_count, values.shape[1]))
+    np.add.at(sums, group, np.where(is_valid, values, 0))
+    np.add.at(counts, group, is_valid)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / counts
+
+
+def _sigmoid_guess(intensities: np.ndarray, amplitudes: np.ndarray) -> tuple[float, float, float]:
+    m_max = np.nanmax(amplitudes) if amplitudes.size else 1.0
+    # Intensity where the mean first reaches half of its maximum
+    i50 = intensities[np.argmax(amplitudes >= m_max / 2)] if amplitudes.size else 0.0
+    slope = max(np.ptp(intensities) / 10, 1e-6) if intensities.size else 1.0
+    return m_max, i50, slope
+
+
+def _gaussian_guess(intensities: np.ndarray, amplitudes: np.ndarray) -> tuple[float, float, float]:
+    if not amplitudes.size:
+        return 1.0, 0.0, 1.0
+    peak = np.nanargmax(amplitudes)
+    width = max(np.ptp(intensities) / 4, 1e-6)
+    return amplitudes[peak], intensities[peak], width
+
+
+def _fit(function, intensities: np.ndarray, amplitudes: np.ndarray, guess) -> np.ndarray:
+    """Least-squares fit of a 3-parameter curve; NaN parameters if it fails."""
+    is_valid = ~np.isnan(amplitudes)
+    if np.count_nonzero(is_valid) < 3 or np.any(np.isnan(guess)):
+        return np.full(3, np.nan)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", OptimizeWarning)
+            parameters, _ = curve_fit(function,
+                                      intensities[is_valid],
+                                      amplitudes[is_valid],
+                                      p0=guess,
+                                      maxfev=2000)
+    except (RuntimeError, ValueError):
+        return np.full(3, np.nan)
+
+    return parameters
+
+
+def _fit_or_observed_max(fitted_max: np.ndarray, mean_amplitudes: np.ndarray) -> np.ndarray:
+    if mean_amplitudes.size == 0:
+        return fitted_max
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN channels
+        observed_max = np.nanmax(mean_amplitudes, axis=0)
+
+    # Fits that went negative or far beyond the data are not trusted
+    is_plausible = (fitted_max > 0) & (fitted_max <= 2 * observed_max)
+    return np.where(is_plausible, fitted_max, observed_max)
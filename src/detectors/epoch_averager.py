@@ -0,0 +1,129 @@
+from enum import Enum
+from typing import Optional
+
+import numpy as np
+
+
+class AveragingMode(Enum):
+    CUMULATIVE = "Cumulative"  # Every epoch since the last reset
+    WINDOW = "Window"  # The last window_size epochs
+    EXPONENTIAL = "Exponential"  # Older epochs decay by (1 - smoothing)
+
+
+class EpochAverager:
+    """
+    Running mean and standard deviation of epochs, per channel and sample.
+
+    Each add() updates the statistics in place in O(channels * samples),
+    regardless of how many epochs have been added:
+        CUMULATIVE: Welford's algorithm over all epochs since reset()
+        WINDOW: Welford's algorithm with the oldest of the last
+        `window_size` epochs removed as each new one is added. The window's
+        epochs are kept to make removal possible.
+        EXPONENTIAL: Exponentially weighted mean and variance, where each
+        epoch has weight `smoothing`
+    """
+
+    def __init__(self,
+                 channel_count: int,
+                 sample_count: int,
+                 mode: AveragingMode = AveragingMode.CUMULATIVE,
+                 window_size: int = 10,
+                 smoothing: float = 0.1):
+        """
+        Args:
+            channel_count: Number of channels per epoch
+            sample_count: Number of samples per epoch
+            mode: How epochs are weighted
+            window_size: Number of epochs averaged in WINDOW mode
+            smoothing: Weight of the newest epoch in EXPONENTIAL mode,
+            between 0 and 1
+        """
+        self.channel_count = channel_count
+        self.sample_count = sample_count
+        self.mode = mode
+        self.window_size = window_size
+        self.smoothing = smoothing
+
+        self._mean = np.zeros((channel_count, sample_count))
+        self._m2 = np.zeros((channel_count, sample_count))
+        self._window: Optional[np.ndarray] = None
+        self.count = 0
+
+        self.reset()
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Mean of shape (channels, samples)."""
+        return self._mean
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance of shape (channels, samples); zero until two epochs."""
+        if self.mode == AveragingMode.EXPONENTIAL:
+            return self._m2
+
+        effective_count = min(self.count, self.window_size) \
+            if self.mode == AveragingMode.WINDOW else self.count
+        if effective_count < 2:
+            return np.zeros_like(self._m2)
+        return np.maximum(self._m2, 0) / (effective_count - 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Standard deviation of shape (channels, samples)."""
+        return np.sqrt(self.variance)
+
+    def reset(self) -> None:
+        """Forget all epochs, e.g. at the start of a trial."""
+        self._mean.fill(0)
+        self._m2.fill(0)
+        self.count = 0
+
+        if self.mode == AveragingMode.WINDOW:
+            self._window = np.zeros((self.window_size, self.channel_count, self.sample_count))
+        else:
+            self._window = None
+
+    def add(self, data: np.ndarray) -> None:
+        """
+        Add an epoch.
+
+        Args:
+            data: Array of shape (channels, samples)
+        """
+        data = np.asarray(data, dtype=np.float64)
+
+        if self.mode == AveragingMode.EXPONENTIAL:
+            self._add_exponential(data)
+        elif self.mode == AveragingMode.WINDOW and self.count >= self.window_size:
+            self._replace_oldest(data)
+        else:
+            self._add_welford(data)
+
+        if self._window is not None:
+            self._window[self.count % self.window_size] = data
+        self.count += 1
+
+    def _add_welford(self, data: np.ndarray) -> None:
+        delta = data - self._mean
+        self._mean += delta / (self.count + 1)
+        self._m2 += delta * (data - self._mean)
+
+    def _replace_oldest(self, data: np.ndarray) -> None:
+        oldest = self._window[self.count % self.window_size]
+        old_mean = self._mean.copy()
+
+        self._mean += (data - oldest) / self.window_size
+        self._m2 += (data - oldest) * (data - self._mean + oldest - old_mean)
+
+    def _add_exponential(self, data: np.ndarray) -> None:
+        if self.count == 0:
+            self._mean[:] = data
+            return
+
+        delta = data - self._mean
+        increment = self.smoothing * delta
+        self._mean += increment
+        # _m2 holds the variance itself in this mode
+        self._m2[:] = (1 - self.smoothing) * (self._m2 + delta * increment)
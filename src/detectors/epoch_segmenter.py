@@ -0,0 +1,122 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
+
+import numpy as np
+
+from src.detectors.detection_params import DetectionParameters
+from src.detectors.trigger_detector import TriggerDetector
+from src.utils.ring_buffer import RingBuffer
+from src.utils.tracing import tracer
+
+
+@dataclass
+class Epoch:
+    """All channels of data around one trigger."""
+    trigger_index: int  # Sample index of the trigger
+    first_sample_index: int  # Sample index of data[:, 0]
+    sampling_rate: float
+    data: np.ndarray  # (channels, roi_length)
+
+
+class EpochSegmenter:
+    """
+    Cuts epochs around triggers out of a device's ring buffer.
+
+    process_block() is meant to be registered as a block listener on the
+    device manager, so it runs on each block right after it is written to
+    the ring buffer. Triggers are detected on the trigger channel of each
+    block, and each epoch is emitted as soon as the last sample of its window
+    has arrived.
+    """
+
+    def __init__(self,
+                 ring_buffer: RingBuffer,
+                 trigger_channel: int,
+                 params: DetectionParameters,
+                 trigger_detector: Optional[TriggerDetector] = None,
+                 pre_trigger: float = 0.0,
+                 on_epoch: Optional[Callable[[Epoch], None]] = None):
+        """
+        Initialize the segmenter.
+
+        Args:
+            ring_buffer: Buffer the device manager writes to
+            trigger_channel: Index of the trigger channel in each block
+            params: Detection parameters; roi_length sets the epoch length
+            trigger_detector: Detector for the trigger channel (default:
+            TriggerDetector with default thresholds)
+            pre_trigger: Seconds of data to include before each trigger
+            on_epoch: Called with each completed epoch
+        """
+        self.ring_buffer = ring_buffer
+        self.trigger_channel = trigger_channel
+        self.trigger_detector = trigger_detector or TriggerDetector(ring_buffer.sampling_rate)
+        self.roi_length = params.roi_length
+        self.pre_trigger_samples = int(round(pre_trigger * ring_buffer.sampling_rate))
+        self.on_epoch = on_epoch
+
+        # Epochs whose windows could not be read because they were overwritten
+        self.dropped_epochs = 0
+
+        self._pending_triggers: Deque[int] = deque()
+
+    def reset(self) -> None:
+        """Discard pending triggers and reset the trigger detector."""
+        self._pending_triggers.clear()
+        self.trigger_detector.reset()
+
+    def process_block(self,
+                      first_sample_index: int,
+                      block: np.ndarray,
+                      receive_time: Optional[float] = None) -> List[Epoch]:
+        """
+        Detect triggers in a new block and emit any epochs that are complete.
+
+        Args:
+            first_sample_index: Sample index of block[0]
+            block: Array of shape (samples, channels), already written to
+            the ring buffer
+            receive_time: Unused; passed by device managers to block
+            listeners
+
+        Returns:
+            List of epochs completed by this block
+        """
+        start = tracer.begin()
+        triggers = self.trigger_detector.process(block[:, self.trigger_channel],
+                                                 first_sample_index)
+        self._pending_triggers.extend(triggers.tolist())
+
+        epochs = self._emit_complete_epochs()
+        tracer.end("segment", start, "detection")
+        return epochs
+
+    def _emit_complete_epochs(self) -> List[Epoch]:
+        epochs: List[Epoch] = []
+        available_samples = self.ring_buffer.total_samples
+
+        while self._pending_triggers:
+            trigger_index = self._pending_triggers[0]
+            start = trigger_index - self.pre_trigger_samples
+
+            if start + self.roi_length > available_samples:
+                break  # Later triggers cannot be complete either
+
+            self._pending_triggers.popleft()
+
+            first_available, data = self.ring_buffer.read_since(start)
+            if first_available != start:
+                self.dropped_epochs += 1
+                continue
+
+            epoch = Epoch(trigger_index=trigger_index,
+                          first_sample_index=start,
+                          sampling_rate=self.ring_buffer.sampling_rate,
+                          data=data[:, :self.roi_length].copy())
+            epochs.append(epoch)
+
+            if self.on_epoch:
+                self.on_epoch(epoch)
+
+        return epochs
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.detectors.detection_params import DetectionParameters
+from src.utils.tracing import tracer
+
+
+@dataclass
+class DetectionResults:
+    """
+    M-wave and H-reflex measurements for every channel of one or more epochs.
+
+    Each array has the shape of the epoch data without its sample axis, i.e.
+    (channels,) or (epochs, channels). Latencies are in seconds from the
+    trigger and are NaN where no response was detected.
+    Amplitudes are peak-to-peak within the window, or NaN if the window is
+    empty.
+    """
+    m_latency: np.ndarray
+    m_amplitude: np.ndarray
+    m_detected: np.ndarray
+    h_latency: np.ndarray
+    h_amplitude: np.ndarray
+    h_detected: np.ndarray
+    threshold: np.ndarray
+
+
+class PeakDetector:
+    """
+    Detects M-waves and H-reflexes in epochs using DetectionParameters.
+
+    A response is detected when the signal deviates from the baseline mean
+    by more than the threshold for at least `peak_width` seconds. The
+    threshold is `std_cutoff` baseline standard deviations, but never less
+    than `hard_cutoff`. Nothing is detected in a window shorter than
+    `peak_width`.
+
+    Every channel (and every epoch of a batch) is processed in one vectorized
+    pass, so cost does not grow with Python-level loops over channels.
+    """
+
+    # hard_cutoff is given in microvolts while epoch data is in volts
+    HARD_CUTOFF_SCALE = 1e-6
+
+    def __init__(self, params: DetectionParameters):
+        self.set_parameters(params)
+
+    def set_parameters(self, params: DetectionParameters) -> None:
+        """Convert the parameters' times in seconds to sample indices."""
+        self.params = params
+
+        self.baseline_window = self._to_samples(*params.baseline_index)
+        self.m_window = self._to_samples(params.m_start, params.m_end)
+        self.h_window = self._to_samples(params.h_start, params.h_end)
+        self.peak_width = max(1, round(params.peak_width * params.sampling_rate))
+
+    def detect(self, epochs: np.ndarray, trigger_offset: int = 0) -> DetectionResults:
+        """
+        Measure M and H responses.
+
+        Baseline and response windows are relative to the trigger, so they
+        are shifted by `trigger_offset` when epochs include data from before
+        the trigger.
+
+        Args:
+            epochs: Array of shape (channels, roi_length) or
+            (epochs, channels, roi_length)
+            trigger_offset: Number of samples in each epoch before the
+            trigger, e.g. Epoch.trigger_index - Epoch.first_sample_index
+
+        Returns:
+            DetectionResults
+        """
+        start = tracer.begin()
+        baseline_start, baseline_end = self.baseline_window
+        baseline = epochs[..., baseline_start + trigger_offset:baseline_end + trigger_offset]
+        baseline_mean = baseline.mean(axis=-1, keepdims=True)
+        threshold = np.maximum(self.params.std_cutoff * baseline.std(axis=-1, keepdims=True),
+                               self.params.hard_cutoff * self.HARD_CUTOFF_SCALE)
+
+        m_latency, m_amplitude, m_detected = self._measure_window(epochs,
+                                                                  self.m_window,
+                                                                  trigger_offset,
+                                                                  baseline_mean,
+                                                                  threshold)
+        h_latency, h_amplitude, h_detected = self._measure_window(epochs,
+                                                                  self.h_window,
+                                                                  trigger_offset,
+                                                                  baseline_mean,
+                                                                  threshold)
+
+        tracer.end("detect", start, "detection")
+        return DetectionResults(m_latency=m_latency,
+                                m_amplitude=m_amplitude,
+                                m_detected=m_detected,
+                                h_latency=h_latency,
+                                h_amplitude=h_amplitude,
+                                h_detected=h_detected,
+                                threshold=threshold[..., 0])
+
+    def _measure_window(self,
+                        epochs: np.ndarray,
+                        window: tuple[int, int],
+                        trigger_offset: int,
+                        baseline_mean: np.ndarray,
+                        threshold: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the latency, peak-to-peak amplitude and detection flag for
+        one response window.
+        """
+        start, end = window
+        data = epochs[..., start + trigger_offset:end + trigger_offset]
+        result_shape = epochs.shape[:-1]
+
+        if data.shape[-1] == 0:
+            return (np.full(result_shape, np.nan),
+                    np.full(result_shape, np.nan),
+                    np.zeros(result_shape, dtype=bool))
+
+        amplitude = data.max(axis=-1) - data.min(axis=-1)
+
+        # Too short to hold a run
+        if data.shape[-1] < self.peak_width:
+            return np.full(result_shape, np.nan), amplitude, np.zeros(result_shape, dtype=bool)
+
+        # Find runs of at least peak_width samples above threshold. With a
+        # cumulative count, a run ending at i has count[i] - count[i - w] == w
+        is_above = np.abs(data - baseline_mean) > threshold
+        count = np.cumsum(is_above, axis=-1, dtype=np.int32)
+        run_count = count[..., self.peak_width - 1:].copy()
+        run_count[..., 1:] -= count[..., :-self.peak_width]
+        is_run = run_count == self.peak_width
+
+        detected = is_run.any(axis=-1)
+
+        # A run ending at index i starts at i - w + 1, which is its run_count index
+        onset = np.argmax(is_run, axis=-1)
+        latency = np.where(detected,
+                           (start + onset) / self.params.sampling_rate,
+                           np.nan)
+
+        return latency, amplitude, detected
+
+    def _to_samples(self, start_time: float, end_time: float) -> tuple[int, int]:
+        sampling_rate = self.params.sampling_rate
+        return int(round(start_time * sampling_rate)), int(round(end_time * sampling_rate))
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class TriggerDetector:
+    """
+    Incremental rising-edge detector for a trigger channel.
+
+    Blocks of the trigger signal are passed to process() as they arrive and
+    state carries over between blocks, so an edge split across two blocks is
+    still detected once.
+
+    Hysteresis: a trigger fires when the signal rises to `high_threshold`,
+    and the detector is only re-armed once the signal has fallen back to
+    `low_threshold`. Triggers within `refractory_period` of the previous
+    trigger are ignored.
+    """
+
+    def __init__(self,
+                 sampling_rate: float,
+                 high_threshold: float = 2.5,
+                 low_threshold: float = 1.0,
+                 refractory_period: float = 0.5):
+        """
+        Initialize the detector.
+
+        Args:
+            sampling_rate: Number of samples per second
+            high_threshold: Level that fires a trigger, in trigger channel units
+            low_threshold: Level that re-arms the detector
+            refractory_period: Minimum seconds between triggers
+        """
+        if low_threshold > high_threshold:
+            raise ValueError("low_threshold must not be above high_threshold")
+
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.refractory_samples = int(round(refractory_period * sampling_rate))
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all previous samples and triggers."""
+        self._is_armed = True
+        self._was_above = False
+        self._last_trigger_index = None
+
+    def process(self, samples: np.ndarray, first_sample_index: int) -> np.ndarray:
+        """
+        Detect triggers in the next block of the trigger channel.
+
+        Args:
+            samples: 1-D array of trigger channel samples
+            first_sample_index: Sample index of samples[0]
+
+        Returns:
+            np.ndarray of sample indices at which triggers fired
+        """
+        if samples.size == 0:
+            return np.empty(0, dtype=np.int64)
+
+        is_above = samples >= self.high_threshold
+        below_indices = np.flatnonzero(samples <= self.low_threshold)
+
+        # Only samples where the signal first reaches the high threshold can fire
+        was_above = np.empty_like(is_above)
+        was_above[0] = self._was_above
+        was_above[1:] = is_above[:-1]
+        edge_indices = np.flatnonzero(is_above & ~was_above)
+
+        triggers = []
+        rearm_search_start = 0
+
+        for edge in edge_indices:
+            if not self._is_armed:
+                self._is_armed = self._has_fallen_below(below_indices, rearm_search_start, edge)
+                if not self._is_armed:
+                    continue
+
+            self._is_armed = False
+            rearm_search_start = edge
+
+            sample_index = first_sample_index + int(edge)
+            if (self._last_trigger_index is None
+                    or sample_index - self._last_trigger_index >= self.refractory_samples):
+                triggers.append(sample_index)
+                self._last_trigger_index = sample_index
+
+        if not self._is_armed:
+            self._is_armed = self._has_fallen_below(below_indices, rearm_search_start, samples.size)
+
+        self._was_above = bool(is_above[-1])
+
+        return np.array(triggers, dtype=np.int64)
+
+    @staticmethod
+    def _has_fallen_below(below_indices: np.ndarray, start: int, end: int) -> bool:
+        """Return whether any low-threshold sample lies in [start, end)."""
+        position = np.searchsorted(below_indices, start)
+        return position < below_indices.size and below_indices[position] < end
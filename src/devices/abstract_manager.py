@@ -1,12 +1,104 @@
 from abc import ABC, abstractmethod
-import asyncio
-import multiprocessing
-from queue import Queue
+from enum import auto, Enum
+from typing import Callable, List
+
+import numpy as np
+
+from src.utils.latency import LatencyTracker
+from src.utils.ring_buffer import RingBuffer
+from src.utils.tracing import tracer
+
+class StreamState(Enum):
+    STOPPED = auto()
+    RUNNING = auto()
+    PAUSED = auto()
+
 
 class AbstractDeviceManager(ABC):
-    def __init__(self, device_client):
+    DEFAULT_BUFFER_SECONDS = 10.0
+
+    def __init__(self,
+                 device_client,
+                 channel_count: int,
+                 sampling_rate: float,
+                 buffer_seconds: float = DEFAULT_BUFFER_SECONDS):
+        """
+        Args:
+            device_client: Client used to communicate with the device
+            channel_count: Number of channels streamed by the device
+            sampling_rate: Number of samples per second per channel
+            buffer_seconds: Length of streamed history kept in stream_queue
+        """
         self.device_client = device_client
-        self.stream_queue = None
+
+        # Latency of each block from device to screen, per pipeline stage
+        self.latency_tracker = LatencyTracker(type(self).__name__)
+
+        # Streamed samples are written here by the manager and read by consumers
+        self.stream_queue = self._create_stream_queue(channel_count,
+                                                      sampling_rate,
+                                                      buffer_seconds)
+        self.stream_queue.latency_tracker = self.latency_tracker
+
+        # Optional SessionRecorder that streamed blocks are handed off to
+        self.recorder = None
+
+        # Called with (first_sample_index, block, receive_time) after each
+        # block is written to stream_queue. Listeners run on the acquisition
+        # thread.
+        self.block_listeners: List[Callable[[int, np.ndarray, float], None]] = []
+
+    def _create_stream_queue(self,
+                             channel_count: int,
+                             sampling_rate: float,
+                             buffer_seconds: float) -> RingBuffer:
+        """Create the buffer streamed samples are written to."""
+        return RingBuffer(channel_count, sampling_rate, buffer_seconds)
+
+    def add_block_listener(self, listener: Callable[[int, np.ndarray, float], None]) -> None:
+        """Register a callable to receive each streamed block."""
+        self.block_listeners.append(listener)
+
+    def remove_block_listener(self, listener: Callable[[int, np.ndarray, float], None]) -> None:
+        """Unregister a callable added with add_block_listener()."""
+        self.block_listeners.remove(listener)
+
+    def _notify_block_listeners(self,
+                                first_sample_index: int,
+                                block: np.ndarray,
+                                receive_time: float) -> None:
+        for listener in self.block_listeners:
+            listener(first_sample_index, block, receive_time)
+
+    def _publish_block(self, device, block: np.ndarray, receive_time: float) -> None:
+        """
+        Write a streamed block to stream_queue and hand it to block listeners
+        and the recorder.
+
+        Args:
+            device: DeviceTypes member the recorder files the block under
+            block: Array of shape (samples, channels)
+            receive_time: time.perf_counter() when the block was received
+            from the device
+        """
+        start = tracer.begin()
+        first_sample_index = self.stream_queue.total_samples
+        self.stream_queue.write(block)
+        self.latency_tracker.stamp_block(first_sample_index + block.shape[0], receive_time)
+        tracer.end("enqueue", start, device.value)
+
+        start = tracer.begin()
+        self._notify_block_listeners(first_sample_index, block, receive_time)
+        tracer.end("block listeners", start, device.value)
+
+        # Recorder copies the block and writes it on its own thread
+        if self.recorder:
+            start = tracer.begin()
+            self.recorder.submit(device,
+                                 self.stream_queue.sampling_rate,
+                                 first_sample_index,
+                                 block)
+            tracer.end("recorder hand-off", start, device.value)
 
     @abstractmethod
     async def connect(self):
@@ -14,7 +106,7 @@ class AbstractDeviceManager(ABC):
         raise NotImplementedError(f"Concrete class {type(self).__name__} must implement connect() method.")
 
     @abstractmethod
-    async def start_streaming(self, queue: Queue):
+    async def start_streaming(self):
         """Start streaming data."""
         raise NotImplementedError(f"Concrete class {type(self).__name__} must implement start_streaming() method.")
 
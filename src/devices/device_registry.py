@@ -0,0 +1,62 @@
+from functools import lru_cache
+from importlib import import_module
+from typing import Optional
+
+from src.devices.device_types import DeviceTypes
+
+# Module and class name of each device's manager. Manager modules import
+# device SDKs and numpy, so they are only imported once a device is used.
+MANAGER_CLASS_PATHS = {
+    DeviceTypes.TRIGNO: ("src.devices.trigno.trigno_manager", "TrignoManager"),
+    DeviceTypes.QTM: ("src.devices.qtm.qtm_manager", "QTMManager"),
+    DeviceTypes.USBAMP: ("src.devices.usbamp.usbamp_manager", "USBAmpManager"),
+}
+
+# Lab address of the Trigno Base Station and QTM server
+DEFAULT_HOST_IP = "10.229.96.105"
+
+
+@lru_cache(maxsize=None)
+def load_manager_class(device: DeviceTypes) -> type:
+    """
+    Import a device's manager module and return its manager class.
+
+    Args:
+        device: Device whose backend is needed
+
+    Returns:
+        The manager class, e.g. TrignoManager
+
+    Raises:
+        ImportError: If the device's SDK is not installed
+    """
+    module_name, class_name = MANAGER_CLASS_PATHS[device]
+    return getattr(import_module(module_name), class_name)
+
+
+def create_manager(device: DeviceTypes, manager_class: Optional[type] = None):
+    """
+    Create a device's manager with its default client settings.
+
+    Args:
+        device: Device to create the manager of
+        manager_class: Class returned by load_manager_class(device), if
+        already loaded
+
+    Returns:
+        The device's manager, not yet connected
+
+    Raises:
+        ImportError: If the device's SDK is not installed
+    """
+    manager_class = manager_class or load_manager_class(device)
+
+    if device == DeviceTypes.TRIGNO:
+        from src.devices.trigno.trigno_client import TrignoClient
+        return manager_class(TrignoClient, host_ip=DEFAULT_HOST_IP)
+
+    if device == DeviceTypes.QTM:
+        from src.devices.qtm.qtm_client import QTMClient
+        return manager_class(QTMClient(DEFAULT_HOST_IP))
+
+    return manager_class()
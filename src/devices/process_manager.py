@@ -0,0 +1,253 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+from src.devices.abstract_manager import AbstractDeviceManager, StreamState
+from src.devices.device_types import DeviceTypes
+from src.utils.ring_buffer import RingBuffer
+from src.utils.shared_ring_buffer import SharedRingBuffer
+from src.utils.tracing import tracer
+
+
+# Manager methods the parent process may call in the acquisition process
+CONTROL_COMMANDS = ("connect",
+                    "disconnect",
+                    "start_streaming",
+                    "pause_streaming",
+                    "resume_streaming",
+                    "stop_streaming")
+SHUTDOWN_COMMAND = "shutdown"
+
+
+def _run_manager(manager_factory: Callable[[], AbstractDeviceManager],
+                 buffer_name: str,
+                 channel_count: int,
+                 sampling_rate: float,
+                 buffer_seconds: float,
+                 connection: Connection) -> None:
+    """
+    Entry point of the acquisition process.
+
+    Creates the device manager, points its stream_queue at the shared ring
+    buffer and runs control commands received over `connection` until told
+    to shut down. Each command is answered with (succeeded, result or error
+    message).
+    """
+    manager = manager_factory()
+    ring_buffer = SharedRingBuffer(channel_count, sampling_rate, buffer_seconds, name=buffer_name)
+    manager.stream_queue = ring_buffer
+    # Disconnecting twice closes the device sockets twice, so track it here
+    is_connected = False
+
+    try:
+        while True:
+            command, args = connection.recv()
+            if command == SHUTDOWN_COMMAND:
+                break
+
+            try:
+                result = getattr(manager, command)(*args)
+                if command == "connect":
+                    is_connected = result is not False
+                elif command == "disconnect":
+                    is_connected = False
+                if manager.stream_queue is not ring_buffer:
+                    raise RuntimeError("Device stream does not match the shared buffer's "
+                                       "channel count or sampling rate")
+                connection.send((True, result))
+            except Exception as e:
+                connection.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        try:
+            if is_connected:
+                manager.disconnect()
+        except Exception as e:
+            print(f"Failed to disconnect {type(manager).__name__} on shutdown: "
+                  f"{type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            manager.stream_queue = None
+            ring_buffer.close()
+            connection.close()
+
+
+class ProcessDeviceManager(AbstractDeviceManager):
+    """
+    Runs a device manager in its own process.
+
+    Acquisition threads otherwise share the GIL with the GUI, so a slow
+    redraw or a modal dialog can delay device reads long enough for the
+    device's buffer to overflow. Here the real manager runs in a child
+    process and writes into a SharedRingBuffer, which stream_queue in this
+    process reads without copying. Control methods are forwarded over a pipe
+    and block until the child has run them.
+
+    Block listeners and the recorder are still called in this process, from
+    a thread that polls stream_queue for new samples while streaming.
+    """
+
+    COMMAND_TIMEOUT = 10.0  # seconds
+
+    def __init__(self,
+                 manager_factory: Callable[[], AbstractDeviceManager],
+                 device: DeviceTypes,
+                 channel_count: int,
+                 sampling_rate: float,
+                 buffer_seconds: float = AbstractDeviceManager.DEFAULT_BUFFER_SECONDS,
+                 poll_interval: float = 0.005,
+                 ):
+        """
+        Start the acquisition process.
+
+        Args:
+            manager_factory: Picklable callable that creates the manager in
+            the child process, e.g. functools.partial(TrignoManager,
+            TrignoClient, host_ip="10.229.96.105")
+            device: Device the manager streams, used to tag recorded blocks
+            channel_count: Number of channels the device streams
+            sampling_rate: Samples per second the device streams
+            buffer_seconds: Length of streamed history kept in stream_queue
+            poll_interval: Seconds between checks for new blocks to pass to
+            block listeners and the recorder
+        """
+        super().__init__(None,
+                         channel_count=channel_count,
+                         sampling_rate=sampling_rate,
+                         buffer_seconds=buffer_seconds)
+
+        self.device = device
+        self.latency_tracker.name = device.value
+        self.poll_interval = poll_interval
+        self.stream_state = StreamState.STOPPED
+        self.forward_thread = None
+
+        # Spawn rather than fork, since forking a process running Qt is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = context.Pipe()
+        self._command_lock = threading.Lock()
+        self._process = context.Process(target=_run_manager,
+                                        args=(manager_factory,
+                                              self.stream_queue.name,
+                                              channel_count,
+                                              sampling_rate,
+                                              buffer_seconds,
+                                              child_connection),
+                                        name=f"{device.value}Acquisition",
+                                        daemon=True)
+        self._process.start()
+        child_connection.close()
+
+    def _create_stream_queue(self,
+                             channel_count: int,
+                             sampling_rate: float,
+                             buffer_seconds: float) -> RingBuffer:
+        return SharedRingBuffer(channel_count, sampling_rate, buffer_seconds)
+
+    def connect(self):
+        return self._send_command("connect")
+
+    def disconnect(self):
+        if self.stream_state != StreamState.STOPPED:
+            self.stop_streaming()
+        return self._send_command("disconnect")
+
+    def start_streaming(self):
+        if self.stream_state != StreamState.STOPPED:
+            return
+
+        self._send_command("start_streaming")
+        self.stream_state = StreamState.RUNNING
+
+        self.forward_thread = threading.Thread(target=self._forward_blocks,
+                                               name=f"{self.device.value}BlockForwarder",
+                                               daemon=True)
+        self.forward_thread.start()
+
+    def pause_streaming(self):
+        if self.stream_state == StreamState.RUNNING:
+            self._send_command("pause_streaming")
+            self.stream_state = StreamState.PAUSED
+
+    def resume_streaming(self):
+        if self.stream_state == StreamState.PAUSED:
+            self._send_command("resume_streaming")
+            self.stream_state = StreamState.RUNNING
+
+    def stop_streaming(self):
+        self._send_command("stop_streaming")
+        self.stream_state = StreamState.STOPPED
+
+        if self.forward_thread:
+            self.forward_thread.join()
+            self.forward_thread = None
+
+    def close(self) -> None:
+        """Disconnect, end the acquisition process and free the shared buffer."""
+        if self._process.is_alive():
+            with self._command_lock:
+                self._connection.send((SHUTDOWN_COMMAND, ()))
+            self._process.join(self.COMMAND_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+
+        self.stream_state = StreamState.STOPPED
+        self._connection.close()
+        self.stream_queue.close()
+        self.stream_queue.unlink()
+
+    def _send_command(self, command: str, *args) -> Any:
+        """Run a manager method in the acquisition process and return its result."""
+        if command not in CONTROL_COMMANDS:
+            raise ValueError(f"Unsupported command: {command}")
+
+        with self._command_lock, tracer.span(command, self.device.value):
+            self._connection.send((command, args))
+            if not self._connection.poll(self.COMMAND_TIMEOUT):
+                raise TimeoutError(f"{self.device.value} acquisition process did not "
+                                   f"answer '{command}'")
+            succeeded, result = self._connection.recv()
+
+        if not succeeded:
+            raise RuntimeError(f"{self.device.value} {command} failed: {result}")
+        return result
+
+    def _forward_blocks(self) -> None:
+        """Pass new samples to block listeners and the recorder until stopped."""
+        next_index = self.stream_queue.total_samples
+        stamped_index = next_index
+
+        while self.stream_state != StreamState.STOPPED:
+            # Device receive times stay in the child, so blocks are stamped
+            # with the child's write time as they are noticed here
+            end = self.stream_queue.total_samples
+            write_time = self.stream_queue.last_write_time
+            if end < stamped_index:
+                self.latency_tracker.clear_stamps()  # The buffer was cleared
+            elif end > stamped_index:
+                self.latency_tracker.stamp_block(end, write_time)
+            stamped_index = end
+
+            if self.block_listeners or self.recorder:
+                first_sample_index, data = self.stream_queue.read_since(next_index)
+                # Samples written since `end` are left for the next poll, so
+                # write_time is the receive time of every forwarded block
+                data = data[:, :max(0, end - first_sample_index)]
+                if data.shape[1]:
+                    start = tracer.begin()
+                    block = data.T
+                    self._notify_block_listeners(first_sample_index, block, write_time)
+
+                    if self.recorder:
+                        self.recorder.submit(self.device,
+                                             self.stream_queue.sampling_rate,
+                                             first_sample_index,
+                                             block)
+                    next_index = first_sample_index + block.shape[0]
+                    tracer.end("forward block", start, self.device.value)
+            else:
+                next_index = self.stream_queue.total_samples
+
+            time.sleep(self.poll_interval)
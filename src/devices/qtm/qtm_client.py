@@ -1,42 +1,117 @@
 import qtm
 import asyncio
+from concurrent.futures import Future
+import threading
+import time
 import xml.etree.ElementTree as ET
-from typing import Optional, Any, List
+from typing import Optional, Any, Callable, Coroutine, Dict, List, Tuple
+
+import numpy as np
+
+from src.devices.qtm.qtm_parameters import PARAMETER_PARSERS
+from src.utils.qtm_utils import get_event_loop_policy
+from src.utils.tracing import tracer
 
 class ConnectionError(Exception):
     """Custom exception for connection-related errors."""
     pass
 
 class QTMClient:
-    def __init__(self, ip: str, port: int = 22223, version: str = "1.22"):
+    """
+    Client for the QTM real-time server.
+
+    The qtm SDK is asyncio based, and a connection belongs to the event loop
+    it was made on. The client therefore owns one long-lived event loop
+    running on a background thread. Public methods are synchronous and just
+    submit coroutines to that loop.
+
+    While streaming, each packet is decoded on the loop thread into one block
+    per stream, and block listeners are called with (stream, block,
+    dropped_frames, receive_time) for each of them, also on the loop thread.
+    dropped_frames is the number of camera frames QTM skipped before this
+    packet, from the gap in packet frame numbers.
+
+    Parameter groups read with get_parameter_group() are parsed once and
+    cached for the lifetime of the connection. The cache is dropped when QTM
+    reports that its settings may have changed.
+    """
+
+    # Each frame is decoded as one row per sample with these columns:
+    #   3d: x, y, z per marker
+    #   6d: x, y, z and the row-major 3x3 rotation matrix per rigid body
+    #   analog: one column per channel
+    #   force: force, moment and application point (x, y, z each) per plate
+    COMPONENTS = ("analog", "3d", "6d", "force")
+
+    # Analog devices and force plates can each run at their own rate, so
+    # each is a stream of its own, e.g. "analog_1" and "force_2". The 3d and
+    # 6d streams are named after their component.
+    ANALOG_STREAM = "analog_{}"
+    FORCE_STREAM = "force_{}"
+    FORCE_COLUMNS = 9
+    RIGID_BODY_COLUMNS = 12
+
+    # QTM events after which cached parameters may be stale
+    SETTINGS_CHANGED_EVENTS = (qtm.QRTEvent.EventCameraSettingsChanged,
+                               qtm.QRTEvent.EventCalibrationStopped,
+                               qtm.QRTEvent.EventRTfromFileStarted,
+                               qtm.QRTEvent.EventRTfromFileStopped)
+
+    def __init__(self,
+                 ip: str,
+                 port: int = 22223,
+                 version: str = "1.22"):
         self._ip = ip
         self._port = port
         self._version = version
         self._connection = None
         self._connection_lock = asyncio.Lock()
 
+        self.block_listeners: List[Callable[[str, np.ndarray, int, float], None]] = []
+        self._last_frame_number: Optional[int] = None
+
+        # Parsed parameter groups, only accessed on the loop thread
+        self._parameter_cache: Dict[str, Any] = {}
+
+        self._loop = get_event_loop_policy().new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_loop,
+                                             name="QTMClientLoop",
+                                             daemon=True)
+        self._loop_thread.start()
+
     @property
     def connection(self):
         return self._connection
 
-    def connect(self):
+    def submit(self, coroutine: Coroutine) -> Future:
+        """Schedule a coroutine on the client's event loop without waiting."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the client's event loop and wait for its result."""
+        return self.submit(coroutine).result(timeout)
+
+    def connect(self) -> bool:
         """Synchronous wrapper for asynchronous connect method."""
+        with tracer.span("connect", "QTM"):
+            return self.run(self._async_connect())
 
-        async def _async_connect() -> bool:
-            """Asynchronous connection method."""
-            try:
-                self._connection = await qtm.connect(self._ip,
-                                                     port=self._port,
-                                                     version=self._version)
-                                                     
-                return self._connection is not None
-
-            except asyncio.TimeoutError:
-                raise ConnectionError(f"QTM connection timeout")
-            except Exception as e:
-                raise ConnectionError(f"QTM failed to connect: {e}")
-            
-        asyncio.run(_async_connect())
+    async def _async_connect(self) -> bool:
+        """Asynchronous connection method."""
+        self._parameter_cache.clear()
+
+        try:
+            self._connection = await qtm.connect(self._ip,
+                                                 port=self._port,
+                                                 version=self._version,
+                                                 on_event=self._on_event)
+
+            return self._connection is not None
+
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"QTM connection timeout")
+        except Exception as e:
+            raise ConnectionError(f"QTM failed to connect: {e}")
 
     def disconnect(self) -> bool:
         if self._connection is None:
@@ -44,18 +119,35 @@ class QTMClient:
 
         try:
             if hasattr(self._connection, 'disconnect'):
-                self._connection.disconnect()
+                # The connection's transport belongs to the loop thread
+                self._loop.call_soon_threadsafe(self._connection.disconnect)
             self._connection = None
+            self._loop.call_soon_threadsafe(self._parameter_cache.clear)
             return True
 
         except Exception as e:
             print(f"QTM disconnection error: {e}")
             return False
 
+    def close(self) -> None:
+        """Disconnect and stop the event loop thread."""
+        self.disconnect()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+
+    def add_block_listener(self, listener: Callable[[str, np.ndarray, int, float], None]) -> None:
+        """Register a callable to receive each streamed block."""
+        self.block_listeners.append(listener)
+
+    def remove_block_listener(self, listener: Callable[[str, np.ndarray, int, float], None]) -> None:
+        """Unregister a callable added with add_block_listener()."""
+        self.block_listeners.remove(listener)
+
     def get_parameters(self,
                        parameters: Optional[List[str]] = None) -> ET.ElementTree:
         """Synchronous wrapper for asynchronous get_parameters method."""
-        return self._loop.run_until_complete(self._async_get_parameters(parameters))
+        return self.run(self._async_get_parameters(parameters))
 
     async def _async_get_parameters(self,
                                     parameters: Optional[List[str]] = None) -> ET.ElementTree:
@@ -67,10 +159,165 @@ class QTMClient:
             if parameters is None:
                 parameters = ['all']
 
-            xml_settings = await self._connection.get_parameters(parameters)
-            return ET.fromstring(xml_settings)
+            with tracer.span("get parameters", "QTM"):
+                xml_settings = await self._connection.get_parameters(parameters)
+                return ET.fromstring(xml_settings)
 
         except Exception as e:
             raise ConnectionError(f"Error retrieving QTM parameters: {e}")
-        
-   
+
+    def get_parameter_group(self, group: str) -> Any:
+        """
+        Return one parsed parameter group, fetching it only if not cached.
+
+        Args:
+            group: Any key of PARAMETER_PARSERS, e.g. "general" or "analog"
+
+        Returns:
+            The group's parameters dataclass, e.g. GeneralParameters
+        """
+        return self.get_parameter_groups([group])[group]
+
+    def get_parameter_groups(self, groups: List[str]) -> Dict[str, Any]:
+        """Synchronous wrapper for asynchronous get_parameter_groups method."""
+        return self.run(self._async_get_parameter_groups(groups))
+
+    async def _async_get_parameter_groups(self, groups: List[str]) -> Dict[str, Any]:
+        """
+        Return parsed parameter groups, fetching all uncached groups in one request.
+        """
+        unknown = set(groups) - set(PARAMETER_PARSERS)
+        if unknown:
+            raise ValueError(f"Unsupported QTM parameter groups: {sorted(unknown)}")
+
+        missing = [group for group in groups if group not in self._parameter_cache]
+        if missing:
+            settings = await self._async_get_parameters(missing)
+            for group in missing:
+                self._parameter_cache[group] = PARAMETER_PARSERS[group](settings)
+
+        return {group: self._parameter_cache[group] for group in groups}
+
+    def get_stream_layouts(self, components: Optional[List[str]] = None) -> Dict[str, Tuple[int, float]]:
+        """
+        Return the number of columns and sampling rate of every stream of the
+        given components, from QTM's current settings.
+
+        Args:
+            components: Any of COMPONENTS (default: all of them)
+
+        Returns:
+            Dict of stream name to (channel_count, sampling_rate)
+        """
+        components = components or list(self.COMPONENTS)
+        parameters = self.get_parameter_groups(["general", *components])
+        camera_rate = parameters["general"].frequency
+
+        layouts: Dict[str, Tuple[int, float]] = {}
+        if "analog" in components:
+            for device in parameters["analog"].devices:
+                layouts[self.ANALOG_STREAM.format(device.device_id)] = (len(device.channel_names),
+                                                                        device.frequency)
+        if "3d" in components:
+            layouts["3d"] = (3 * len(parameters["3d"].labels), camera_rate)
+        if "6d" in components:
+            layouts["6d"] = (self.RIGID_BODY_COLUMNS * len(parameters["6d"].body_names),
+                             camera_rate)
+        if "force" in components:
+            for plate in parameters["force"].plates:
+                layouts[self.FORCE_STREAM.format(plate.plate_id)] = (self.FORCE_COLUMNS,
+                                                                     plate.frequency)
+        return layouts
+
+    def invalidate_parameters(self) -> None:
+        """Drop all cached parameter groups."""
+        self._loop.call_soon_threadsafe(self._parameter_cache.clear)
+
+    def _on_event(self, event) -> None:
+        """Called on the loop thread for every QTM event."""
+        if event in self.SETTINGS_CHANGED_EVENTS:
+            self._parameter_cache.clear()
+
+    def start_streaming(self, components: Optional[List[str]] = None) -> None:
+        """
+        Start streaming frames to the block listeners.
+
+        Args:
+            components: Any of COMPONENTS (default: all of them)
+        """
+        self.run(self.stream_frames(components or list(self.COMPONENTS)))
+
+    def stop_streaming(self) -> None:
+        """Stop streaming frames."""
+        if self._connection:
+            self.run(self._connection.stream_frames_stop())
+
+    async def stream_frames(self, components: List[str]) -> None:
+        """
+        Ask QTM to stream every frame of the given components.
+        """
+        if not self._connection:
+            raise ConnectionError("No active QTM connection")
+
+        unknown = set(components) - set(self.COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unsupported QTM components: {sorted(unknown)}")
+
+        self._last_frame_number = None
+
+        await self._connection.stream_frames(frames="allframes",
+                                             components=components,
+                                             on_packet=self._on_packet)
+
+    def _on_packet(self, packet) -> None:
+        """Decode a packet and pass each stream's block to the block listeners."""
+        receive_time = time.perf_counter()
+        start = tracer.begin()
+
+        # Frame numbers restart when QTM does, so only count forward gaps
+        dropped_frames = 0
+        if self._last_frame_number is not None:
+            dropped_frames = max(0, packet.framenumber - self._last_frame_number - 1)
+        self._last_frame_number = packet.framenumber
+
+        for stream, block in self._decode_packet(packet).items():
+            if block.size == 0:
+                continue
+            for listener in self.block_listeners:
+                listener(stream, block, dropped_frames, receive_time)
+
+        tracer.end("packet", start, "QTM")
+
+    def _decode_packet(self, packet) -> Dict[str, np.ndarray]:
+        """Return one (samples, columns) block per stream in a packet."""
+        blocks = {}
+
+        if qtm.packet.QRTComponentType.Component3d in packet.components:
+            _, markers = packet.get_3d_markers()
+            blocks["3d"] = np.array(markers, dtype=np.float32).reshape(1, -1)
+
+        if qtm.packet.QRTComponentType.Component6d in packet.components:
+            _, bodies = packet.get_6d()
+            blocks["6d"] = np.array([(*position, *rotation.matrix) for position, rotation in bodies],
+                                    dtype=np.float32).reshape(1, -1)
+
+        if qtm.packet.QRTComponentType.ComponentAnalog in packet.components:
+            # One (device, sample number, channel) entry per channel
+            _, channels = packet.get_analog()
+            device_channels: Dict[int, List] = {}
+            for device, _, channel in channels:
+                device_channels.setdefault(device.id, []).append(channel.samples)
+            for device_id, samples in device_channels.items():
+                blocks[self.ANALOG_STREAM.format(device_id)] = np.array(samples, dtype=np.float32).T
+
+        if qtm.packet.QRTComponentType.ComponentForce in packet.components:
+            _, plates = packet.get_force()
+            for plate, plate_forces in plates:
+                blocks[self.FORCE_STREAM.format(plate.id)] = np.array(plate_forces,
+                                                                      dtype=np.float32).reshape(-1, self.FORCE_COLUMNS)
+
+        return blocks
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
@@ -1,40 +1,187 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.devices.abstract_manager import AbstractDeviceManager, StreamState
+from src.devices.device_types import DeviceTypes
 from src.devices.qtm.qtm_client import QTMClient
+from src.utils.ring_buffer import RingBuffer
+
+class QTMManager(AbstractDeviceManager):
+    """
+    Streams QTM data into one ring buffer per QTM stream.
 
-class QTMManager:
-    def __init__(self, client: QTMClient):
+    QTM sends several streams at once (see QTMClient), but a device manager
+    has a single stream_queue. The primary stream, by default the first
+    analog device, is published through stream_queue like the data of any
+    other device: it is handed to block listeners and the recorder, and its
+    latency is tracked. Every other stream is only written to its buffer in
+    `ring_buffers`, which also holds stream_queue under the primary stream's
+    name.
+
+    Ring buffers are sized from QTM's settings, so stream_queue is replaced
+    on connect(). Frames QTM drops read back as NaN, so sample indices keep
+    following QTM frame numbers. Packets received while paused are dropped
+    the same way.
+    """
+
+    def __init__(self,
+                 client: QTMClient,
+                 primary_stream: str = QTMClient.ANALOG_STREAM.format(1),
+                 buffer_seconds: float = AbstractDeviceManager.DEFAULT_BUFFER_SECONDS):
+        """
+        Args:
+            client: Client connected to the QTM real-time server
+            primary_stream: Stream published through stream_queue, e.g.
+            "analog_1", "3d" or "force_1"
+            buffer_seconds: Length of streamed history kept per stream
+        """
+        # Placeholder until connect() reads the primary stream's layout
+        super().__init__(client,
+                         channel_count=0,
+                         sampling_rate=1.0,
+                         buffer_seconds=buffer_seconds)
         self.client = client
+        self.latency_tracker.name = DeviceTypes.QTM.value
+
+        self.primary_stream = primary_stream
+        self.buffer_seconds = buffer_seconds
+        self.stream_state = StreamState.STOPPED
+
+        # Streamed data, one ring buffer per QTM stream
+        self.ring_buffers: Dict[str, RingBuffer] = {}
+        self._stream_layouts: Dict[str, tuple[int, float]] = {}
+        self._camera_rate = 0.0
+
+        # Streams whose packets no longer match their ring buffer
+        self._mismatched_streams = set()
+
+        self.client.add_block_listener(self._on_block)
+
+    @property
+    def primary_component(self) -> str:
+        """QTM component the primary stream belongs to."""
+        return self.primary_stream.split("_")[0]
 
     def connect(self):
-        """Synchronous connection through manager."""
-        return self.client.connect()
+        """Connect to QTM and size stream_queue for the primary stream."""
+        if self.client.connect() is False:
+            return False
+
+        layouts = self.client.get_stream_layouts([self.primary_component])
+        if self.primary_stream not in layouts:
+            raise ValueError(f"QTM has no {self.primary_stream} stream; "
+                             f"available: {sorted(layouts)}")
+
+        channel_count, sampling_rate = layouts[self.primary_stream]
+        self.stream_queue = self._create_stream_queue(channel_count,
+                                                      sampling_rate,
+                                                      self.buffer_seconds)
+        self.stream_queue.latency_tracker = self.latency_tracker
+        return True
 
     def disconnect(self):
-        """Synchronous disconnection through manager."""
+        """Stop streaming if needed and disconnect from QTM."""
+        if self.stream_state != StreamState.STOPPED:
+            self.stop_streaming()
         return self.client.disconnect()
-    
-    def start_streaming(self):
-        """Start streaming data through the QTM client."""
-        self.client.start_streaming()
+
+    def start_streaming(self, components: Optional[List[str]] = None):
+        """
+        Start streaming data through the QTM client.
+
+        Args:
+            components: Any of QTMClient.COMPONENTS (default: all of them).
+            The primary stream's component is always streamed.
+        """
+        if self.stream_state != StreamState.STOPPED:
+            return
+
+        components = list(components or QTMClient.COMPONENTS)
+        if self.primary_component not in components:
+            components.append(self.primary_component)
+
+        self._stream_layouts = self.client.get_stream_layouts(components)
+        self._camera_rate = self.client.get_parameter_group("general").frequency
+        self._mismatched_streams.clear()
+        self.ring_buffers = {self.primary_stream: self.stream_queue}
+
+        self.stream_state = StreamState.RUNNING
+        try:
+            self.client.start_streaming(components)
+        except Exception:
+            self.stream_state = StreamState.STOPPED
+            raise
+
+    def pause_streaming(self):
+        if self.stream_state == StreamState.RUNNING:
+            self.stream_state = StreamState.PAUSED
+
+    def resume_streaming(self):
+        if self.stream_state == StreamState.PAUSED:
+            self.stream_state = StreamState.RUNNING
 
     def stop_streaming(self):
         """Stop streaming data through the QTM client."""
+        self.stream_state = StreamState.STOPPED
         self.client.stop_streaming()
 
-   
+    def _on_block(self,
+                  stream: str,
+                  block: np.ndarray,
+                  dropped_frames: int,
+                  receive_time: float) -> None:
+        """Write a decoded block to its stream's ring buffer. Runs on the client's loop thread."""
+        if self.stream_state == StreamState.STOPPED:
+            return
+
+        ring_buffer = self._get_ring_buffer(stream, block)
+
+        # Assumes dropped frames held as many samples as this one
+        ring_buffer.skip(dropped_frames * block.shape[0])
+
+        if self.stream_state == StreamState.PAUSED or stream in self._mismatched_streams:
+            ring_buffer.skip(block.shape[0])
+        elif ring_buffer is self.stream_queue:
+            self._publish_block(DeviceTypes.QTM, block, receive_time)
+        else:
+            ring_buffer.write(block)
 
-c = QTMClient("10.229.96.105", 22223, "1.22")
-q = QTMManager(c)
-import time
-q.connect()
-q.disconnect()
-# q.connect()
-# q.disconnect()
-# time.sleep(2)
-# q.client.get_parameters(["analog"])
+    def _get_ring_buffer(self, stream: str, block: np.ndarray) -> RingBuffer:
+        """Return a stream's ring buffer, replacing it if the packet layout changed."""
+        ring_buffer = self.ring_buffers.get(stream)
+        if ring_buffer is not None and ring_buffer.channel_count == block.shape[1]:
+            return ring_buffer
 
+        if stream == self.primary_stream:
+            # Consumers hold on to stream_queue, so its layout must not change
+            if stream not in self._mismatched_streams:
+                self._mismatched_streams.add(stream)
+                print(f"QTM {stream} now has {block.shape[1]} columns instead of "
+                      f"{ring_buffer.channel_count}; its frames are dropped until "
+                      f"QTM is reconnected")
+            return ring_buffer
 
+        if ring_buffer is not None:
+            print(f"QTM {stream} changed from {ring_buffer.channel_count} to "
+                  f"{block.shape[1]} columns; starting a new ring buffer")
 
-# q.disconnect()
+        _, sampling_rate = self._stream_layouts.get(stream,
+                                                    (0, self._camera_rate * block.shape[0]))
+        ring_buffer = RingBuffer(block.shape[1], sampling_rate, self.buffer_seconds)
+        self.ring_buffers[stream] = ring_buffer
+        return ring_buffer
 
 
+if __name__ == "__main__":
+    import time
 
+    c = QTMClient("10.229.96.105", 22223, "1.22")
+    q = QTMManager(c)
+    q.connect()
+    q.start_streaming(["analog", "3d"])
+    time.sleep(2)
+    q.stop_streaming()
+    print({stream: buffer.total_samples for stream, buffer in q.ring_buffers.items()})
+    q.disconnect()
+    c.close()
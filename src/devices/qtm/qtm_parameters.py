@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class GeneralParameters:
+    """QTM 'General' settings."""
+    frequency: float  # Camera frequency in Hz
+    capture_time: float  # Seconds
+    camera_count: int
+
+
+@dataclass
+class AnalogDevice:
+    """One analog board or device from QTM 'Analog' settings."""
+    device_id: int
+    name: str
+    frequency: float  # Hz
+    channel_names: List[str] = field(default_factory=list)
+    channel_units: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AnalogParameters:
+    devices: List[AnalogDevice]
+
+
+@dataclass
+class MarkerParameters:
+    """QTM 'The_3D' settings."""
+    axis_upwards: str
+    labels: List[str]
+
+
+@dataclass
+class RigidBodyParameters:
+    """QTM 'The_6D' settings."""
+    body_names: List[str]
+
+
+@dataclass
+class ForcePlate:
+    plate_id: int
+    name: str
+    frequency: float  # Hz
+    analog_device_id: Optional[int]
+
+
+@dataclass
+class ForceParameters:
+    """QTM 'Force' settings."""
+    length_unit: str
+    force_unit: str
+    plates: List[ForcePlate]
+
+
+def _float(element: ET.Element, path: str, default: float = 0.0) -> float:
+    text = element.findtext(path)
+    return float(text) if text not in (None, "") else default
+
+
+def _int(element: ET.Element, path: str, default: int = 0) -> int:
+    text = element.findtext(path)
+    return int(text) if text not in (None, "") else default
+
+
+def parse_general(root: ET.Element) -> GeneralParameters:
+    general = root.find("General")
+    return GeneralParameters(frequency=_float(general, "Frequency"),
+                             capture_time=_float(general, "Capture_Time"),
+                             camera_count=len(general.findall("Camera")))
+
+
+def parse_analog(root: ET.Element) -> AnalogParameters:
+    devices = []
+    for device in root.findall("Analog/Device"):
+        channels = device.findall("Channel")
+        devices.append(AnalogDevice(device_id=_int(device, "Device_ID"),
+                                    name=device.findtext("Device_Name", ""),
+                                    frequency=_float(device, "Frequency"),
+                                    channel_names=[channel.findtext("Label", "") for channel in channels],
+                                    channel_units=[channel.findtext("Unit", "") for channel in channels]))
+    return AnalogParameters(devices=devices)
+
+
+def parse_3d(root: ET.Element) -> MarkerParameters:
+    the_3d = root.find("The_3D")
+    return MarkerParameters(axis_upwards=the_3d.findtext("AxisUpwards", ""),
+                            labels=[label.findtext("Name", "") for label in the_3d.findall("Label")])
+
+
+def parse_6d(root: ET.Element) -> RigidBodyParameters:
+    return RigidBodyParameters(body_names=[body.findtext("Name", "")
+                                           for body in root.findall("The_6D/Body")])
+
+
+def parse_force(root: ET.Element) -> ForceParameters:
+    force = root.find("Force")
+    plates = []
+    for plate in force.findall("Plate"):
+        analog_device_id = plate.findtext("Analog_Device_ID")
+        plates.append(ForcePlate(plate_id=_int(plate, "Plate_ID"),
+                                 name=plate.findtext("Name", ""),
+                                 frequency=_float(plate, "Frequency"),
+                                 analog_device_id=int(analog_device_id) if analog_device_id else None))
+
+    return ForceParameters(length_unit=force.findtext("Unit_Length", ""),
+                           force_unit=force.findtext("Unit_Force", ""),
+                           plates=plates)
+
+
+# Parameter group names, as used by the QTM 'GetParameters' command
+PARAMETER_PARSERS: Dict[str, Callable[[ET.Element], object]] = {
+    "general": parse_general,
+    "analog": parse_analog,
+    "3d": parse_3d,
+    "6d": parse_6d,
+    "force": parse_force,
+}
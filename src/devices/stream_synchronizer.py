@@ -0,0 +1,200 @@
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.devices.abstract_manager import AbstractDeviceManager
+from src.devices.device_types import DeviceTypes
+from src.utils.ring_buffer import RingBuffer
+
+
+class ClockModel:
+    """
+    Running linear model mapping a device's sample index to host time.
+
+        host_time = offset + sample_index * period
+
+    The fit is a least-squares line through (sample index, host time) stamps
+    with exponential forgetting, so it follows slow drift between the device
+    clock and the host clock. Until two stamps have been seen, the nominal
+    sampling rate is used.
+    """
+
+    def __init__(self, sampling_rate: float, forgetting_factor: float = 0.999):
+        """
+        Initialize the model.
+
+        Args:
+            sampling_rate: Nominal samples per second
+            forgetting_factor: Weight kept by older stamps on each update,
+            between 0 and 1. Lower values follow drift faster but are more
+            sensitive to jitter in block arrival times.
+        """
+        self.nominal_period = 1 / sampling_rate
+        self.forgetting_factor = forgetting_factor
+
+        self.period = self.nominal_period
+        self.offset: Optional[float] = None
+
+        # Stamps are stored relative to the first stamp to keep sums small
+        self._reference_index = 0
+        self._reference_time = 0.0
+        self._sums = np.zeros(5)  # weight, x, y, xx, xy
+
+    @property
+    def drift(self) -> float:
+        """Relative rate error of the device clock, e.g. 1e-5 is 10 ppm fast."""
+        return self.nominal_period / self.period - 1
+
+    def update(self, sample_index: int, host_time: float) -> None:
+        """
+        Add a stamp.
+
+        Args:
+            sample_index: Device sample index
+            host_time: Host monotonic time at which that sample was received
+        """
+        if self.offset is None:
+            self._reference_index = sample_index
+            self._reference_time = host_time
+
+        x = sample_index - self._reference_index
+        y = host_time - self._reference_time
+
+        self._sums *= self.forgetting_factor
+        self._sums += (1, x, y, x * x, x * y)
+        weight, sum_x, sum_y, sum_xx, sum_xy = self._sums
+
+        denominator = weight * sum_xx - sum_x * sum_x
+        if denominator > 0:
+            self.period = (weight * sum_xy - sum_x * sum_y) / denominator
+
+        intercept = (sum_y - self.period * sum_x) / weight
+        self.offset = self._reference_time + intercept - self.period * self._reference_index
+
+    def to_host_time(self, sample_indices: np.ndarray) -> np.ndarray:
+        """Convert device sample indices to host times."""
+        return self.offset + np.asarray(sample_indices) * self.period
+
+    def to_sample_index(self, host_times: np.ndarray) -> np.ndarray:
+        """Convert host times to fractional device sample indices."""
+        return (np.asarray(host_times) - self.offset) / self.period
+
+
+class StreamSynchronizer:
+    """
+    Puts streams from several devices on the host's monotonic time base.
+
+    Every block a registered manager writes is stamped with its last sample
+    index and the time.perf_counter() at which it was received from the
+    device, and fed into a per-device ClockModel. get_aligned() then maps a
+    host time range onto each device's ring buffer and resamples every device
+    to a common rate.
+
+    Streams that do not come from a device manager are registered with
+    add_stream() and stamped by calling stamp_block().
+    """
+
+    def __init__(self):
+        self.clock_models: Dict[DeviceTypes, ClockModel] = {}
+        self.ring_buffers: Dict[DeviceTypes, RingBuffer] = {}
+
+    @staticmethod
+    def now() -> float:
+        """Return the current host time on the synchronizer's time base."""
+        return time.perf_counter()
+
+    def add_device(self, device: DeviceTypes, manager: AbstractDeviceManager) -> None:
+        """
+        Start stamping blocks streamed by a device manager.
+
+        Args:
+            device: Device the manager streams
+            manager: Manager, or FilteredStream, whose stream_queue holds the
+            device's data
+        """
+        self.add_stream(device, manager.stream_queue)
+
+        def stamp(first_sample_index: int, block: np.ndarray, receive_time: float) -> None:
+            self.stamp_block(device, first_sample_index + block.shape[0], receive_time)
+
+        manager.add_block_listener(stamp)
+
+    def add_stream(self, device: DeviceTypes, ring_buffer: RingBuffer) -> None:
+        """
+        Register a device's ring buffer without stamping it.
+
+        The ring buffer's writer must call stamp_block() for each block. A
+        device that is added again starts a new clock model.
+
+        Args:
+            device: Device the ring buffer holds data of
+            ring_buffer: Buffer the device's samples are written to
+        """
+        self.ring_buffers[device] = ring_buffer
+        self.clock_models[device] = ClockModel(ring_buffer.sampling_rate)
+
+    def stamp_block(self, device: DeviceTypes, end_sample_index: int, host_time: float) -> None:
+        """
+        Record when a block was received.
+
+        Called automatically for managers added with add_device(). Streams
+        added with add_stream() must call it directly.
+
+        Args:
+            device: Device the block came from
+            end_sample_index: Sample index one past the block's last sample
+            host_time: time.perf_counter() when the block was received
+        """
+        self.clock_models[device].update(end_sample_index, host_time)
+
+    def get_aligned(self,
+                    start_time: float,
+                    end_time: float,
+                    sampling_rate: float) -> tuple[np.ndarray, Dict[DeviceTypes, np.ndarray]]:
+        """
+        Return every device's data between two host times at a common rate.
+
+        Device data is linearly interpolated onto a shared time grid. Grid
+        points outside a device's buffered data are NaN.
+
+        Args:
+            start_time: Host time of the first output sample
+            end_time: Host time the output ends before
+            sampling_rate: Output samples per second
+
+        Returns:
+            Tuple of (host times of shape (samples,), dict of device to array
+            of shape (channels, samples))
+        """
+        host_times = start_time + np.arange(int((end_time - start_time) * sampling_rate)) / sampling_rate
+
+        aligned: Dict[DeviceTypes, np.ndarray] = {}
+        for device, clock_model in self.clock_models.items():
+            if clock_model.offset is None:
+                continue  # Nothing streamed yet
+
+            sample_positions = clock_model.to_sample_index(host_times)
+            aligned[device] = self._interpolate(self.ring_buffers[device], sample_positions)
+
+        return host_times, aligned
+
+    @staticmethod
+    def _interpolate(ring_buffer: RingBuffer, sample_positions: np.ndarray) -> np.ndarray:
+        """Linearly interpolate all channels at fractional sample indices."""
+        resampled = np.full((ring_buffer.channel_count, sample_positions.size), np.nan)
+        if sample_positions.size == 0:
+            return resampled
+
+        first_needed = max(0, int(np.floor(sample_positions[0])))
+        first_available, data = ring_buffer.read_since(first_needed)
+
+        # Offsets into data of the sample before and after each position
+        positions = sample_positions - first_available
+        before = np.floor(positions).astype(np.int64)
+        is_valid = (before >= 0) & (before + 1 < data.shape[1])
+        before = before[is_valid]
+        fraction = positions[is_valid] - before
+
+        resampled[:, is_valid] = data[:, before] * (1 - fraction) + data[:, before + 1] * fraction
+        return resampled
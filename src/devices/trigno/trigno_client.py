@@ -1,8 +1,14 @@
 from enum import Enum
+import select
 import socket
-import struct
+import time
+from typing import Dict, List, Optional, Sequence
 
-from src.clients.abstract_client import AbstractDeviceClient
+import numpy as np
+
+from src.devices.abstract_client import AbstractDeviceClient
+from src.utils.tracing import tracer
+from src.utils.trigno_utils import DSChannel, EMGSensor, SensorInventory
 
 class NotConnectedException(Exception):
     pass
@@ -24,13 +30,28 @@ class TrignoClient(AbstractDeviceClient):
     
     # AUX_DATA_PORT = 50044  # sends auxiliary data (not typically used)
 
+    # Each EMG frame is one little-endian 4 byte float for each of 16 sensors
+    EMG_CHANNELS = 16
+    EMG_FRAME_SIZE = EMG_CHANNELS * 4
+    EMG_DTYPE = np.dtype("<f4")
+    EMG_SAMPLING_RATE = 2000  # Hz, with UPSAMPLE ON
+
     BASE_STATION_CONFIG_COMMANDS = [
         "ENDIAN LITTLE",
         "BACKWARDS COMPATIBILITY OFF",
         "UPSAMPLE ON",
     ]
 
-    def __init__(self, host_ip: str):
+    SENSOR_SLOTS = range(1, 17)
+
+    # Command packets end with two pairs of <CR><LF>, and so do responses
+    PACKET_END = b"\r\n\r\n"
+
+    # Commands sent before waiting for their responses. Small enough that a
+    # batch never fills the base station's receive buffer.
+    COMMAND_BATCH_SIZE = 64
+
+    def __init__(self, host_ip: str, max_frames_per_read: int = 512):
         self.is_connected = False
         self.host_ip = host_ip
 
@@ -39,27 +60,47 @@ class TrignoClient(AbstractDeviceClient):
         self.emg_data_socket = socket.socket(socket.AF_INET,
                                              socket.SOCK_STREAM)
 
+        # EMG data is received straight into this buffer to avoid allocating
+        # per read. Bytes in [_read_position, _write_position) are pending.
+        self._emg_buffer = bytearray(max_frames_per_read * self.EMG_FRAME_SIZE)
+        self._emg_view = memoryview(self._emg_buffer)
+        self._read_position = 0
+        self._write_position = 0
+
+        # time.perf_counter() when EMG bytes were last received
+        self.last_receive_time = 0.0
+
+        # Bytes received on the command socket but not yet returned
+        self._command_buffer = bytearray()
+
+        # Queried once per connection, see get_sensors()
+        self._sensor_inventory: Optional[SensorInventory] = None
+
     def connect(self):
         if self.is_connected:
             return
         
-        self._connect_socket(self.command_socket, self.COMMAND_PORT)
+        self._command_buffer.clear()
+        self._sensor_inventory = None
+
+        with tracer.span("connect", "Trigno"):
+            self._connect_socket(self.command_socket, self.COMMAND_PORT)
 
-        # Connecting the command socket causes a response from the base station
-        # This response must be received before continuing.
-        self._receive_command_response()
+            # Connecting the command socket causes a response from the base station
+            # This response must be received before continuing.
+            self._receive_command_response()
 
-        self._connect_socket(self.emg_data_socket, self.EMG_DATA_PORT)
+            self._connect_socket(self.emg_data_socket, self.EMG_DATA_PORT)
 
-        self.is_connected = True
-        print("Trigno connection successful.")
-        self.configure()
+            self.is_connected = True
+            self.configure()
 
     def disconnect(self):
         self.stop_streaming()
         if self.is_connected:
             self._send_command("QUIT")
             self.is_connected = False
+            self._sensor_inventory = None
         self.command_socket.close()
         self.emg_data_socket.close()
 
@@ -88,21 +129,113 @@ class TrignoClient(AbstractDeviceClient):
     def _receive_command_response(self,
                                   max_packet_length: int = 1024,
                                   is_raw: bool = False):
-        response = self.command_socket.recv(max_packet_length)
+        """
+        Return the next response from the command socket.
+
+        Responses are framed by PACKET_END rather than by recv() calls, so
+        several responses arriving together are returned one at a time.
+        """
+        while True:
+            packet_end = self._command_buffer.find(self.PACKET_END)
+            if packet_end >= 0:
+                break
+
+            received = self.command_socket.recv(max_packet_length)
+            if not received:
+                raise NotConnectedException("Base station closed the command connection")
+            self._command_buffer += received
+
+        response = bytes(self._command_buffer[:packet_end])
+        del self._command_buffer[:packet_end + len(self.PACKET_END)]
+
         if is_raw:
             return response
-        return response.strip().decode() 
+        return response.strip().decode()
     
-    def receive_emg_frame(self, frame_size: int = 16 * 4) -> tuple[float, ...]:
+    def receive_emg_frame(self) -> tuple[float, ...]:
         """
-        For receiving from the EMG_DATA_PORT.
-        Data is a 4 byte float across 16 devices, so frame size is 4 * 16.
+        For receiving a single frame from the EMG_DATA_PORT.
+
+        Thin wrapper around receive_emg_frames() kept for callers that
+        process one frame at a time.
         """
-        data_buffer = b""
-        
-        while len(data_buffer) < frame_size:
-            data_buffer += self.emg_data_socket.recv(frame_size - len(data_buffer))
-        return struct.unpack("<ffffffffffffffff", data_buffer)
+        return tuple(self.receive_emg_frames(max_frames=1)[0].tolist())
+
+    def receive_emg_frames(self, max_frames: int | None = None) -> np.ndarray:
+        """
+        For receiving a block of frames from the EMG_DATA_PORT.
+
+        Blocks until at least one complete frame is available, then drains
+        whatever else the socket already has ready without blocking again.
+        A partial trailing frame is kept and completed on the next call.
+
+        The returned (n_frames, 16) float32 array is a view onto the
+        client's receive buffer. It is only valid until the next call, so
+        copy it if it needs to be kept.
+
+        Args:
+            max_frames: Maximum number of frames to return (default: as many
+            as are buffered)
+
+        Returns:
+            np.ndarray of shape (n_frames, EMG_CHANNELS)
+        """
+        start = tracer.begin()
+        self._release_consumed_bytes()
+
+        while self._pending_bytes() < self.EMG_FRAME_SIZE:
+            self._receive_into_buffer()
+
+        # Drain anything else that is ready without blocking
+        while (self._write_position < len(self._emg_buffer)
+               and self._emg_socket_is_readable()):
+            self._receive_into_buffer()
+
+        frame_count = self._pending_bytes() // self.EMG_FRAME_SIZE
+        if max_frames is not None:
+            frame_count = min(frame_count, max_frames)
+
+        frames = np.frombuffer(self._emg_buffer,
+                               dtype=self.EMG_DTYPE,
+                               count=frame_count * self.EMG_CHANNELS,
+                               offset=self._read_position)
+        self._read_position += frame_count * self.EMG_FRAME_SIZE
+
+        tracer.end("socket read", start, "Trigno")
+        return frames.reshape(frame_count, self.EMG_CHANNELS)
+
+    def _pending_bytes(self) -> int:
+        return self._write_position - self._read_position
+
+    def _release_consumed_bytes(self) -> None:
+        """
+        Reclaim buffer space used by frames returned on the previous call.
+
+        This must only happen at the start of a read since the previously
+        returned array is a view onto that space.
+        """
+        pending = self._pending_bytes()
+
+        if pending == 0:
+            self._read_position = 0
+            self._write_position = 0
+
+        # Only move pending bytes to the front when a full frame no longer fits
+        elif len(self._emg_buffer) - self._write_position < self.EMG_FRAME_SIZE:
+            self._emg_buffer[:pending] = self._emg_buffer[self._read_position:self._write_position]
+            self._read_position = 0
+            self._write_position = pending
+
+    def _receive_into_buffer(self) -> None:
+        received = self.emg_data_socket.recv_into(self._emg_view[self._write_position:])
+        if received == 0:
+            raise NotConnectedException("Base station closed the EMG data connection")
+        self._write_position += received
+        self.last_receive_time = time.perf_counter()
+
+    def _emg_socket_is_readable(self) -> bool:
+        readable, _, _ = select.select([self.emg_data_socket], [], [], 0)
+        return bool(readable)
     
     def _send_command(self, command: str) -> bytes:
         """
@@ -110,23 +243,47 @@ class TrignoClient(AbstractDeviceClient):
         The base station expects command packets to end with two pairs of 
         <CR> and <LF>, so those are appended to the end of the packet.
         """
-        packet_end = b"\r\n\r\n"
-        self.command_socket.send(command.encode() + packet_end)
+        return self._send_commands([command])[0]
+
+    def _send_commands(self, commands: Sequence[str]) -> List[str]:
+        """
+        Send commands without waiting for each response in between.
+
+        The base station answers commands in the order they were sent, so
+        commands are written in batches of COMMAND_BATCH_SIZE and the
+        responses are matched to them in order. A batch costs one round trip
+        instead of one per command.
+
+        Returns:
+            Response to each command
+        """
+        responses = []
+        for batch_start in range(0, len(commands), self.COMMAND_BATCH_SIZE):
+            batch = commands[batch_start:batch_start + self.COMMAND_BATCH_SIZE]
 
-        response = self._receive_command_response()
+            start = tracer.begin()
+            self.command_socket.sendall(b"".join(command.encode() + self.PACKET_END
+                                                 for command in batch))
+            batch_responses = [self._receive_command_response() for _ in batch]
+            tracer.end(batch[0] if len(batch) == 1 else "command batch", start, "Trigno command")
 
-        if response == CommandResponses.INVALID:
+            for command, response in zip(batch, batch_responses):
+                self._check_response(command, response)
+            responses.extend(batch_responses)
+
+        return responses
+
+    @staticmethod
+    def _check_response(command: str, response: str) -> None:
+        if response == CommandResponses.INVALID.value:
             raise InvalidCommandException(f"<{command}> is not a valid Trigno command. Base station response: {response}")
-        elif response == CommandResponses.CANT_COMPLETE:
+        elif response == CommandResponses.CANT_COMPLETE.value:
             raise InvalidCommandException(f"<{command}> command can't be completed at this time. Base station response: {response}")
-        
-        return response
     
     def configure(self):
-        responses = {}
-        for command in self.BASE_STATION_CONFIG_COMMANDS:
-            responses[command] = self._send_command(command)
-        print("Base station config successful")
+        with tracer.span("configure", "Trigno"):
+            responses = dict(zip(self.BASE_STATION_CONFIG_COMMANDS,
+                                 self._send_commands(self.BASE_STATION_CONFIG_COMMANDS)))
         self._verify_base_station_config(responses)
         
     def _verify_base_station_config(self, responses: dict[str, str]):
@@ -136,17 +293,71 @@ class TrignoClient(AbstractDeviceClient):
             if response != "OK":
                 raise InvalidCommandException(f"<{command}> is not a valid Trigno Command. Base station response: {response}")
 
-    def get_sensors(self):
+    def get_sensors(self, refresh: bool = False) -> SensorInventory:
+        """
+        Return the paired and active sensors and the properties of each
+        paired sensor.
+
+        The inventory is queried in three pipelined batches (pairing, sensor
+        properties, channel properties) and cached until the client
+        disconnects.
+
+        Args:
+            refresh: Query the base station again, e.g. after pairing a sensor
+        """
         if not self.is_connected:
             raise NotConnectedException("Cannot find paired sensors - Base station not connected to server")
-        
-        paired_sensors = self._get_paired_sensors()
-        print(f"Paired: {paired_sensors}")
 
-        print(f"Active: {self._get_active_sensors()}")
+        if self._sensor_inventory is None or refresh:
+            with tracer.span("get sensors", "Trigno"):
+                self._sensor_inventory = self._query_sensor_inventory()
+        return self._sensor_inventory
 
-    def _get_paired_sensors(self):
-        return [i for i in range(1, 17) if self._send_command(f"SENSOR {i} PAIRED?") == "YES"]
-    
-    def _get_active_sensors(self):
-        return [i for i in range(1, 17) if self._send_command(f"SENSOR {i} ACTIVE?") == "YES"]
+    def _query_sensor_inventory(self) -> SensorInventory:
+        status_queries = [f"SENSOR {slot} {query}"
+                          for slot in self.SENSOR_SLOTS
+                          for query in ("PAIRED?", "ACTIVE?")]
+        status = iter(self._send_commands(status_queries))
+
+        paired, active = [], []
+        for slot in self.SENSOR_SLOTS:
+            if next(status) == "YES":
+                paired.append(slot)
+            if next(status) == "YES":
+                active.append(slot)
+
+        sensor_queries = ("TYPE?", "SERIAL?", "MODE?", "FIRMWARE?", "EMGCHANNELCOUNT?",
+                          "AUXCHANNELCOUNT?", "STARTINDEX?", "CHANNELCOUNT?")
+        responses = iter(self._send_commands([f"SENSOR {slot} {query}"
+                                              for slot in paired
+                                              for query in sensor_queries]))
+        properties: Dict[int, List[str]] = {slot: [next(responses) for _ in sensor_queries]
+                                            for slot in paired}
+        channel_counts = {slot: int(properties[slot][-1]) for slot in paired}
+
+        channel_queries = ("GAIN?", "SAMPLES?", "RATE?", "UNITS?")
+        responses = iter(self._send_commands([f"SENSOR {slot} CHANNEL {channel} {query}"
+                                              for slot in paired
+                                              for channel in range(1, channel_counts[slot] + 1)
+                                              for query in channel_queries]))
+
+        sensors: Dict[int, EMGSensor] = {}
+        for slot in paired:
+            sensor_type, serial, mode, firmware, emg_channels, aux_channels, start_index, \
+                _ = properties[slot]
+            channels = [DSChannel(gain=float(next(responses)),
+                                  samples=int(next(responses)),
+                                  rate=float(next(responses)),
+                                  units=next(responses))
+                        for _ in range(channel_counts[slot])]
+            sensors[slot] = EMGSensor(type=sensor_type,
+                                      serial=serial,
+                                      mode=int(mode),
+                                      firmware=firmware,
+                                      emg_channels=int(emg_channels),
+                                      aux_channels=int(aux_channels),
+                                      start_idx=int(start_index),
+                                      channel_count=channel_counts[slot],
+                                      channels=channels)
+
+        return SensorInventory(paired=paired, active=active, sensors=sensors)
@@ -1,37 +1,34 @@
-from enum import auto, Enum
-import logging
-from queue import Queue
 import threading
 import time
 import xml.etree.ElementTree as ET
 
-from src.devices.abstract_manager import DeviceManager
-from src.clients.trigno.trigno_client import TrignoClient
-
-class StreamState(Enum):
-    STOPPED = auto()
-    RUNNING = auto()
-    PAUSED = auto()
-
-
-class TrignoManager(DeviceManager):
-    logging.basicConfig(filename="test_log.log", level=logging.INFO, format="%(asctime)s [%(threadName)s] %(message)s")
+from src.devices.abstract_manager import AbstractDeviceManager, StreamState
+from src.devices.device_types import DeviceTypes
+from src.devices.trigno.trigno_client import TrignoClient
 
+class TrignoManager(AbstractDeviceManager):
     def __init__(self, 
                  client: TrignoClient,
                  host_ip: str = "10.229.96.105",
+                 buffer_seconds: float = AbstractDeviceManager.DEFAULT_BUFFER_SECONDS,
                  ):
         self.client = client(host_ip)
+        super().__init__(self.client,
+                         channel_count=client.EMG_CHANNELS,
+                         sampling_rate=client.EMG_SAMPLING_RATE,
+                         buffer_seconds=buffer_seconds)
+        self.latency_tracker.name = DeviceTypes.TRIGNO.value
 
-        self.streamed_data_queue = Queue()
         self.stream_state = StreamState.STOPPED
         self.stream_thread = None
 
+        # Cached by the client; refresh with client.get_sensors(refresh=True)
+        self.sensor_inventory = None
+
     def connect(self):
-        """Establish a connection to the Trigno server"""
+        """Establish a connection to the Trigno server and read its sensors"""
         self.client.connect()
-
-        # query devices
+        self.sensor_inventory = self.client.get_sensors()
 
     def disconnect(self):
         """
@@ -57,7 +54,6 @@ class TrignoManager(DeviceManager):
                                             #   daemon=True
                                               )
         self.stream_thread.start()
-        print("Start streaming ddone")
 
     def pause_streaming(self):
         if self.stream_state == StreamState.RUNNING:
@@ -94,17 +90,16 @@ class TrignoManager(DeviceManager):
         while self.stream_state != StreamState.STOPPED:
             if self.stream_state == StreamState.RUNNING:
                 try:
-                    frame = self.client.receive_emg_frame()
-                    logging.info(frame)
-                    print("logging")
-                    self.streamed_data_queue.put(frame)
+                    frames = self.client.receive_emg_frames()
+                    self._publish_block(DeviceTypes.TRIGNO,
+                                        frames,
+                                        self.client.last_receive_time)
                 except Exception as e:
                     print(f"Streaming Error: {e}")
                     self.stop_streaming()
                     break
 
             else:
-                print("in else")
                 # Yield CPU time while paused
                 time.sleep(0.01)
 
@@ -0,0 +1,289 @@
+import argparse
+import socket
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class TrignoSimulator:
+    """
+    A simulated Trigno base station for testing without Delsys hardware.
+
+    Listens on the command and EMG data ports and implements the subset of
+    the command protocol used by TrignoClient. While started, it streams
+    synthetic little-endian float32 frames to the EMG data connection at a
+    fixed rate.
+
+    Each channel carries a sine wave with a little noise. If
+    `embed_frame_counter` is set, the last channel carries the frame index
+    instead so that receivers can detect dropped or reordered frames.
+    """
+
+    COMMAND_PORT = 50040
+    EMG_DATA_PORT = 50043
+
+    GREETING = "Delsys Trigno System Digital Protocol Version 3.6.0 (simulated)"
+    PACKET_END = b"\r\n\r\n"
+    POLL_INTERVAL = 0.1  # seconds
+
+    def __init__(self,
+                 host_ip: str = "127.0.0.1",
+                 command_port: int = COMMAND_PORT,
+                 emg_data_port: int = EMG_DATA_PORT,
+                 sampling_rate: float = 2000,
+                 channel_count: int = 16,
+                 paired_sensors: Optional[list[int]] = None,
+                 frames_per_packet: int = 27,
+                 embed_frame_counter: bool = False):
+        """
+        Initialize the simulator. Call start() to begin listening.
+
+        Args:
+            host_ip: Address to listen on
+            command_port: Command port (0 picks a free port)
+            emg_data_port: EMG data port (0 picks a free port)
+            sampling_rate: Frames per second streamed
+            channel_count: Number of float32 values per frame
+            paired_sensors: Sensor numbers reported as paired and active
+            (default: one per channel)
+            frames_per_packet: Number of frames sent per socket write
+            embed_frame_counter: Replace the last channel with the frame index
+        """
+        self.host_ip = host_ip
+        self.sampling_rate = sampling_rate
+        self.channel_count = channel_count
+        self.paired_sensors = paired_sensors if paired_sensors is not None \
+            else list(range(1, channel_count + 1))
+        self.frames_per_packet = frames_per_packet
+        self.embed_frame_counter = embed_frame_counter
+
+        # perf_counter() time of START; frame i is due at start + i / rate
+        self.stream_start_time = 0.0
+        self.frames_sent = 0
+        self.is_streaming = False
+        self.is_running = False
+
+        self._command_server = self._create_server(command_port)
+        self._emg_data_server = self._create_server(emg_data_port)
+        self.command_port = self._command_server.getsockname()[1]
+        self.emg_data_port = self._emg_data_server.getsockname()[1]
+
+        self._emg_connection: Optional[socket.socket] = None
+        self._threads: list[threading.Thread] = []
+        self._rng = np.random.default_rng()
+
+    def start(self) -> None:
+        """Start accepting connections on the command and data ports."""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        for target in (self._serve_commands, self._serve_emg_data, self._stream_data):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop streaming, close all sockets and join the server threads."""
+        self.is_streaming = False
+        self.is_running = False
+
+        self._command_server.close()
+        self._emg_data_server.close()
+        if self._emg_connection:
+            self._emg_connection.close()
+
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads.clear()
+
+    def handle_command(self, command: str) -> str:
+        """
+        Return the base station's response to a command.
+
+        Args:
+            command: Command without the trailing <CR><LF> pairs
+
+        Returns:
+            str: Response without the trailing <CR><LF> pairs
+        """
+        command = command.strip().upper()
+
+        if command == "START":
+            self.frames_sent = 0
+            self.stream_start_time = time.perf_counter()
+            self.is_streaming = True
+            return "OK"
+        if command == "STOP":
+            self.is_streaming = False
+            return "OK"
+        if command == "QUIT":
+            self.is_streaming = False
+            return "BYE"
+        if command in ("ENDIAN LITTLE", "BACKWARDS COMPATIBILITY OFF", "UPSAMPLE ON"):
+            return "OK"
+
+        parts = command.split()
+        if len(parts) >= 3 and parts[0] == "SENSOR":
+            return self._handle_sensor_query(parts[1], parts[2:])
+
+        return "INVALID COMMAND"
+
+    def _handle_sensor_query(self, sensor: str, query: list[str]) -> str:
+        """Answer SENSOR n ...? queries as if every sensor were a one-channel EMG sensor."""
+        try:
+            sensor = int(sensor)
+        except ValueError:
+            return "INVALID COMMAND"
+
+        if query == ["PAIRED?"] or query == ["ACTIVE?"]:
+            return "YES" if sensor in self.paired_sensors else "NO"
+        if sensor not in self.paired_sensors:
+            return "CANNOT COMPLETE"
+
+        sensor_properties = {"TYPE?": "O",
+                             "SERIAL?": f"SIM{sensor:05d}",
+                             "MODE?": "40",
+                             "FIRMWARE?": "1.0.0",
+                             "EMGCHANNELCOUNT?": "1",
+                             "AUXCHANNELCOUNT?": "0",
+                             "STARTINDEX?": str(sensor),
+                             "CHANNELCOUNT?": "1"}
+        if len(query) == 1 and query[0] in sensor_properties:
+            return sensor_properties[query[0]]
+
+        channel_properties = {"GAIN?": "300",
+                              "SAMPLES?": str(self.frames_per_packet),
+                              "RATE?": f"{self.sampling_rate:g}",
+                              "UNITS?": "V"}
+        if len(query) == 3 and query[0] == "CHANNEL" and query[1] == "1" \
+                and query[2] in channel_properties:
+            return channel_properties[query[2]]
+
+        return "INVALID COMMAND"
+
+    def _create_server(self, port: int) -> socket.socket:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.host_ip, port))
+        server.listen(1)
+
+        # Accept polls so stop() is noticed; closing alone won't wake accept()
+        server.settimeout(self.POLL_INTERVAL)
+        return server
+
+    def _serve_commands(self) -> None:
+        while self.is_running:
+            try:
+                connection, _ = self._command_server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Server socket closed
+
+            with connection:
+                connection.settimeout(self.POLL_INTERVAL)
+                # Pipelined commands get one small response each; don't hold
+                # them back waiting for ACKs
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                connection.sendall(self.GREETING.encode() + self.PACKET_END)
+                self._handle_command_connection(connection)
+
+    def _handle_command_connection(self, connection: socket.socket) -> None:
+        received = b""
+
+        while self.is_running:
+            try:
+                data = connection.recv(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+
+            received += data
+            while self.PACKET_END in received:
+                packet, received = received.split(self.PACKET_END, 1)
+                response = self.handle_command(packet.decode())
+                connection.sendall(response.encode() + self.PACKET_END)
+
+                if response == "BYE":
+                    return
+
+    def _serve_emg_data(self) -> None:
+        while self.is_running:
+            try:
+                connection, _ = self._emg_data_server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Server socket closed
+
+            connection.settimeout(None)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._emg_connection = connection
+
+    def _stream_data(self) -> None:
+        """
+        Send frames paced against the wall clock so the average rate does not
+        drift, even if individual sends are delayed.
+        """
+        packet_interval = self.frames_per_packet / self.sampling_rate
+
+        while self.is_running:
+            if not (self.is_streaming and self._emg_connection):
+                time.sleep(0.01)
+                continue
+
+            elapsed = time.perf_counter() - self.stream_start_time
+            frames_due = int(elapsed * self.sampling_rate)
+            frame_count = frames_due - self.frames_sent
+
+            if frame_count > 0:
+                try:
+                    self._emg_connection.sendall(self._make_frames(frame_count).tobytes())
+                except OSError:
+                    self._emg_connection = None
+                    continue
+                self.frames_sent += frame_count
+
+            time.sleep(packet_interval)
+
+    def _make_frames(self, frame_count: int) -> np.ndarray:
+        frame_indices = np.arange(self.frames_sent, self.frames_sent + frame_count)
+        times = frame_indices / self.sampling_rate
+
+        # A different frequency per channel makes channel mix-ups visible
+        frequencies = np.arange(1, self.channel_count + 1) * 5.0
+        frames = 0.001 * np.sin(2 * np.pi * np.outer(times, frequencies))
+        frames += self._rng.normal(0, 0.0001, frames.shape)
+
+        if self.embed_frame_counter:
+            frames[:, -1] = frame_indices
+
+        return frames.astype("<f4")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a simulated Trigno base station.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--rate", type=float, default=2000, help="Frames per second")
+    parser.add_argument("--channels", type=int, default=16, help="Floats per frame")
+    parser.add_argument("--counter", action="store_true", help="Put the frame index in the last channel")
+    args = parser.parse_args()
+
+    simulator = TrignoSimulator(args.host,
+                                sampling_rate=args.rate,
+                                channel_count=args.channels,
+                                embed_frame_counter=args.counter)
+    simulator.start()
+    print(f"Simulated base station listening on {args.host}:{simulator.command_port} and :{simulator.emg_data_port}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
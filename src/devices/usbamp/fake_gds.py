@@ -0,0 +1,109 @@
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+
+class FakeChannel:
+    def __init__(self):
+        self.Acquire = False
+
+
+class FakeGDS:
+    """
+    A stand-in for pygds.GDS for testing without a g.USBamp.
+
+    Implements the subset of the pygds API used by USBAmpClient. GetData
+    produces float32 blocks of sine waves with a little noise, paced at the
+    configured sampling rate so consumers see realistic block timing.
+
+    Like the driver, the array passed to the GetData callback is reused for
+    every block.
+
+    If `embed_scan_counter` is set, the last channel carries the scan index
+    instead so that receivers can detect dropped or reordered scans.
+    """
+
+    # Sampling rate (Hz) -> recommended scans per block, as reported by pygds
+    SUPPORTED_SAMPLING_RATES = {32: 1, 64: 2, 128: 4, 256: 8, 512: 16, 600: 32,
+                                1200: 64, 2400: 128, 4800: 256, 9600: 512,
+                                19200: 1024, 38400: 2048}
+
+    def __init__(self,
+                 channel_count: int = 16,
+                 real_time: bool = True,
+                 embed_scan_counter: bool = False):
+        """
+        Open the fake device.
+
+        Args:
+            channel_count: Number of channels
+            real_time: Pace blocks at the sampling rate instead of producing
+            them as fast as possible
+            embed_scan_counter: Replace the last channel with the scan index
+        """
+        self.Channels = [FakeChannel() for _ in range(channel_count)]
+        self.SamplingRate = 1200
+        self.NumberOfScans = self.SUPPORTED_SAMPLING_RATES[self.SamplingRate]
+        self.real_time = real_time
+        self.embed_scan_counter = embed_scan_counter
+
+        # perf_counter() time scan 0 was due, when paced in real time
+        self.stream_start_time = 0.0
+        self.scans_sent = 0
+        self.is_open = True
+        self._rng = np.random.default_rng()
+
+    def GetSupportedSamplingRates(self) -> list:
+        return [dict(self.SUPPORTED_SAMPLING_RATES)]
+
+    def SetConfiguration(self) -> None:
+        if self.SamplingRate not in self.SUPPORTED_SAMPLING_RATES:
+            raise ValueError(f"Unsupported sampling rate: {self.SamplingRate}")
+
+    def N_ch_calc(self) -> int:
+        return sum(channel.Acquire for channel in self.Channels)
+
+    def GetData(self,
+                scanCount: int,
+                more: Optional[Callable[[np.ndarray], bool]] = None) -> np.ndarray:
+        """
+        Acquire blocks of scanCount scans.
+
+        Without `more`, returns a single block. Otherwise calls `more` with
+        each block until it returns False, then returns the last block.
+        """
+        if not self.is_open:
+            raise RuntimeError("Device is closed")
+
+        block = np.empty((scanCount, self.N_ch_calc()), dtype=np.float32)
+        self.stream_start_time = time.perf_counter() - self.scans_sent / self.SamplingRate
+
+        while True:
+            self._fill_block(block)
+
+            if self.real_time:
+                due_time = self.stream_start_time + self.scans_sent / self.SamplingRate
+                delay = due_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            if more is None or not more(block):
+                return block
+
+    def Close(self) -> None:
+        self.is_open = False
+
+    def _fill_block(self, block: np.ndarray) -> None:
+        scan_count, channel_count = block.shape
+        scan_indices = np.arange(self.scans_sent, self.scans_sent + scan_count)
+        t = scan_indices / self.SamplingRate
+
+        frequencies = 5 + np.arange(channel_count)
+        block[:] = 1e-4 * np.sin(2 * np.pi * np.outer(t, frequencies))
+        block += self._rng.normal(0, 1e-5, block.shape)
+
+        if self.embed_scan_counter and channel_count:
+            block[:, -1] = scan_indices
+
+        self.scans_sent += scan_count
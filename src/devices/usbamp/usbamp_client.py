@@ -1,48 +1,71 @@
+from typing import Callable, Optional
 
-import pygds as g
+import numpy as np
 
-from src.clients.abstract_client import AbstractDeviceClient
+from src.devices.abstract_client import AbstractDeviceClient
+from src.utils.tracing import tracer
 
 class USBAmpClient(AbstractDeviceClient):
-    # sampling rate, channels
-    def __init__(self):
+    DEFAULT_CHANNELS = 16
+    DEFAULT_SAMPLING_RATE = 1200  # Hz
+    DTYPE = np.dtype("<f4")
+
+    def __init__(self,
+                 sampling_rate: int = DEFAULT_SAMPLING_RATE,
+                 scans_per_block: Optional[int] = None,
+                 gds_class=None):
+        """
+        Initialize the client.
+
+        Args:
+            sampling_rate: Requested samples per second. If the amplifier
+            does not support it, the lowest supported rate is used.
+            scans_per_block: Scans per GetData block (default: the number
+            pygds recommends for the sampling rate)
+            gds_class: Class used to open the device (default: pygds.GDS).
+            Pass FakeGDS to run without an amplifier.
+        """
+        super().__init__()
+        self.gds_class = gds_class
         self.connection = None
+        self.requested_sampling_rate = sampling_rate
         self.sampling_rate = None
+        self.requested_scans_per_block = scans_per_block
+        self.scans_per_block = None
         self.is_streaming = False
 
     def connect(self):
         try:
-            self.connection = g.GDS()
-            rates = self.connection.GetSupportedSamplingRates()[0]
-            self.sampling_rate = sorted(rates.items())[0][0]
-            
-            # Configure channels
-            for ch in self.connection.Channels:
-                ch.Acquire = True
-            
+            if self.gds_class is None:
+                # Imported here so the client can be used with FakeGDS
+                # without the g.tec driver installed
+                import pygds
+                self.gds_class = pygds.GDS
+
+            with tracer.span("connect", "USBAmp"):
+                self.connection = self.gds_class()
+                self.configure()
+
             print(f"USBAmp connected. Sampling Rate: {self.sampling_rate}")
             return True
         except Exception as e:
             print(f"USBAmp connection failed: {e}")
             return False
-        
+
     def disconnect(self):
         if self.connection:
             self.connection.Close()
             self.connection = None
             self.is_streaming = False
-        
+
     def stop_streaming(self):
         """
         Set is_streaming bool to False.
 
-        The API only provides a GetData method, which only returns a single
-        frame. The only way to 'stream' data would be to thread this
-        operation. However, that would better be managed by USBAmpManager.
-        
-        As such, this class merely keeps track of a streaming bool, but that
-        may not be useful and may be removed. However, this method needs to be
-        implemented to satisfy the AbstractDeviceClient requirements.Start streaming data from the server."""
+        Blocks are acquired by stream_blocks(), which returns once its
+        callback returns False. USBAmpManager owns that loop, so this
+        only keeps track of the streaming bool.
+        """
         if self.is_streaming:
             self.is_streaming = False
 
@@ -50,30 +73,55 @@ class USBAmpClient(AbstractDeviceClient):
         """
         Set is_streaming bool to True.
 
-        The API only provides a GetData method, which only returns a single
-        frame. The only way to 'stream' data would be to thread this
-        operation. However, that would better be managed by USBAmpManager.
-        
-        As such, this class merely keeps track of a streaming bool, but that
-        may not be useful and may be removed. However, this method needs to be
-        implemented to satisfy the AbstractDeviceClient requirements.
+        See stop_streaming().
         """
         if not self.is_streaming:
             self.is_streaming = True
 
     def configure(self):
+        """Apply the sampling rate and block size and acquire every channel."""
+        start = tracer.begin()
+
+        # Supported rates map to the number of scans pygds recommends for them
+        rates = self.connection.GetSupportedSamplingRates()[0]
+        if self.requested_sampling_rate in rates:
+            self.sampling_rate = self.requested_sampling_rate
+        else:
+            self.sampling_rate = sorted(rates)[0]
+        self.scans_per_block = self.requested_scans_per_block or rates[self.sampling_rate]
+
+        self.connection.SamplingRate = self.sampling_rate
+        self.connection.NumberOfScans = self.scans_per_block
+        for ch in self.connection.Channels:
+            ch.Acquire = True
+
         # TODO:
-        # - set sample rate
         # - set filters
         # - other config options
-        pass
+        self.connection.SetConfiguration()
+        tracer.end("configure", start, "USBAmp")
+
+    def stream_blocks(self, on_block: Callable[[np.ndarray], bool]) -> None:
+        """
+        Acquire blocks continuously until on_block returns False.
+
+        Blocks until acquisition ends, so it is meant to run on the
+        manager's acquisition thread.
 
-    def get_data(self):    
+        Args:
+            on_block: Called with each (scans_per_block, channels) float32
+            array. The array may be reused by the driver after the call
+            returns.
+        """
+        if not self.connection:
+            raise ConnectionError("USBAmp is not connected")
+        self.connection.GetData(self.scans_per_block, on_block)
+
+    def get_data(self):
+        """Acquire a single block of scans_per_block scans."""
         if not self.connection:
             self.connect()
-        return self.connection.GetData(self.sampling_rate)
+        return self.connection.GetData(self.scans_per_block)
 
     def get_number_of_channels(self):
         return len(self.connection.Channels) if self.connection else 0
-    
-
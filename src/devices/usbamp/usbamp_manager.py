@@ -0,0 +1,128 @@
+import threading
+import time
+
+import numpy as np
+
+from src.devices.abstract_manager import AbstractDeviceManager, StreamState
+from src.devices.device_types import DeviceTypes
+from src.devices.usbamp.usbamp_client import USBAmpClient
+
+class USBAmpManager(AbstractDeviceManager):
+    """
+    Streams g.USBamp data on a dedicated acquisition thread.
+
+    The thread sits in pygds's GetData loop, which calls _handle_block() for
+    every (scans, channels) block. Each block is written straight into
+    stream_queue and handed to block listeners and the recorder.
+
+    The amplifier keeps acquiring while paused; blocks received while paused
+    are discarded so that resuming does not need to reconfigure the device.
+    """
+
+    def __init__(self,
+                 client: USBAmpClient = USBAmpClient,
+                 sampling_rate: int = USBAmpClient.DEFAULT_SAMPLING_RATE,
+                 scans_per_block: int = None,
+                 gds_class=None,
+                 buffer_seconds: float = AbstractDeviceManager.DEFAULT_BUFFER_SECONDS,
+                 ):
+        """
+        Args:
+            client: Client class to instantiate
+            sampling_rate: Requested samples per second
+            scans_per_block: Scans per acquired block (default: pygds's
+            recommendation for the sampling rate)
+            gds_class: Passed to the client, e.g. FakeGDS
+            buffer_seconds: Length of streamed history kept in stream_queue
+        """
+        self.client = client(sampling_rate=sampling_rate,
+                             scans_per_block=scans_per_block,
+                             gds_class=gds_class)
+        super().__init__(self.client,
+                         channel_count=client.DEFAULT_CHANNELS,
+                         sampling_rate=sampling_rate,
+                         buffer_seconds=buffer_seconds)
+        self.latency_tracker.name = DeviceTypes.USBAMP.value
+
+        self.buffer_seconds = buffer_seconds
+        self.stream_state = StreamState.STOPPED
+        self.stream_thread = None
+
+    def connect(self):
+        """
+        Open and configure the amplifier.
+
+        stream_queue is recreated if the device's channel count or sampling
+        rate differ from the requested ones, so consumers should take a
+        reference to it after connecting.
+        """
+        if not self.client.connect():
+            return False
+
+        channel_count = self.client.get_number_of_channels()
+        if (channel_count != self.stream_queue.channel_count
+                or self.client.sampling_rate != self.stream_queue.sampling_rate):
+            self.stream_queue = self._create_stream_queue(channel_count,
+                                                          self.client.sampling_rate,
+                                                          self.buffer_seconds)
+            self.stream_queue.latency_tracker = self.latency_tracker
+            self.latency_tracker.clear_stamps()
+        return True
+
+    def disconnect(self):
+        """Stop streaming, if needed, and close the amplifier."""
+        if self.stream_state != StreamState.STOPPED:
+            self.stop_streaming()
+
+        self.client.disconnect()
+
+    def start_streaming(self):
+        """Start streaming data."""
+        # Resuming after pause does not need to recreate a thread.
+        if self.stream_state != StreamState.STOPPED:
+            return
+
+        self.client.start_streaming()
+
+        self.stream_state = StreamState.RUNNING
+        self.stream_thread = threading.Thread(target=self._stream_data,
+                                              name="USBAmpAcquisition")
+        self.stream_thread.start()
+
+    def pause_streaming(self):
+        if self.stream_state == StreamState.RUNNING:
+            self.stream_state = StreamState.PAUSED
+
+    def resume_streaming(self):
+        if self.stream_state == StreamState.PAUSED:
+            self.stream_state = StreamState.RUNNING
+
+    def stop_streaming(self):
+        """
+        Stop streaming and join the acquisition thread.
+
+        GetData returns after the block in progress, once _handle_block()
+        sees the STOPPED state, so this waits at most one block.
+        """
+        self.stream_state = StreamState.STOPPED
+
+        if self.stream_thread and self.stream_thread is not threading.current_thread():
+            self.stream_thread.join()
+            self.stream_thread = None
+
+        self.client.stop_streaming()
+
+    def _stream_data(self):
+        try:
+            self.client.stream_blocks(self._handle_block)
+        except Exception as e:
+            print(f"Streaming Error: {e}")
+            self.stream_state = StreamState.STOPPED
+
+    def _handle_block(self, block: np.ndarray) -> bool:
+        """GetData callback. Returns whether acquisition should continue."""
+        if self.stream_state == StreamState.RUNNING:
+            # pygds calls back as soon as the block has been read
+            self._publish_block(DeviceTypes.USBAMP, block, time.perf_counter())
+
+        return self.stream_state != StreamState.STOPPED
@@ -0,0 +1,304 @@
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+from scipy import signal
+
+from src.utils.latency import LatencyStage
+from src.utils.ring_buffer import RingBuffer
+from src.utils.tracing import tracer
+
+
+class FilterStage(ABC):
+    """
+    One step of a FilterPipeline.
+
+    Stages receive blocks of shape (samples, channels) in stream order and
+    return a filtered block of the same shape. Any state needed to continue
+    filtering at the next block is kept between calls.
+    """
+
+    @abstractmethod
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Filter the next block."""
+        raise NotImplementedError(f"Concrete class {type(self).__name__} must implement process() method.")
+
+    def reset(self) -> None:
+        """Forget all previous blocks."""
+        pass
+
+
+class SosFilterStage(FilterStage):
+    """
+    IIR filter in second-order sections, applied to all channels at once.
+
+    The filter state is carried from block to block, so filtering a stream
+    block by block gives the same output as filtering it all at once with
+    scipy.signal.sosfilt.
+    """
+
+    def __init__(self, sos: np.ndarray, channel_count: int):
+        """
+        Args:
+            sos: Second-order sections of shape (sections, 6)
+            channel_count: Number of channels in each block
+        """
+        self.sos = np.atleast_2d(sos)
+        self.channel_count = channel_count
+        self.reset()
+
+    def reset(self) -> None:
+        # sosfilt along axis 0 wants (sections, 2, channels)
+        self._zi = np.zeros((self.sos.shape[0], 2, self.channel_count))
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        # sosfilt cannot filter an empty block
+        if block.shape[0] == 0:
+            return block
+        filtered, self._zi = signal.sosfilt(self.sos, block, axis=0, zi=self._zi)
+        return filtered
+
+
+class BandPassStage(SosFilterStage):
+    """Butterworth band-pass filter."""
+
+    def __init__(self,
+                 sampling_rate: float,
+                 channel_count: int,
+                 low_cutoff: float = 20.0,
+                 high_cutoff: float = 450.0,
+                 order: int = 4):
+        """
+        Args:
+            sampling_rate: Samples per second
+            channel_count: Number of channels in each block
+            low_cutoff: Lower -3 dB frequency in Hz
+            high_cutoff: Upper -3 dB frequency in Hz
+            order: Filter order
+        """
+        sos = signal.butter(order, [low_cutoff, high_cutoff],
+                            btype="bandpass", fs=sampling_rate, output="sos")
+        super().__init__(sos, channel_count)
+
+
+class NotchStage(SosFilterStage):
+    """Notch filter for power line interference and optionally its harmonics."""
+
+    def __init__(self,
+                 sampling_rate: float,
+                 channel_count: int,
+                 line_frequency: float = 50.0,
+                 quality_factor: float = 30.0,
+                 harmonics: int = 1):
+        """
+        Args:
+            sampling_rate: Samples per second
+            channel_count: Number of channels in each block
+            line_frequency: Power line frequency in Hz, 50 or 60
+            quality_factor: Notch centre frequency divided by its bandwidth
+            harmonics: Number of multiples of line_frequency to remove,
+            starting with line_frequency itself. Multiples at or above the
+            Nyquist frequency are skipped.
+        """
+        sections = []
+        for harmonic in range(1, harmonics + 1):
+            frequency = harmonic * line_frequency
+            if frequency >= sampling_rate / 2:
+                break
+            b, a = signal.iirnotch(frequency, quality_factor, fs=sampling_rate)
+            sections.append(signal.tf2sos(b, a))
+
+        super().__init__(np.vstack(sections), channel_count)
+
+
+class RectifyStage(FilterStage):
+    """Full-wave rectification."""
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        return np.abs(block)
+
+
+class EnvelopeStage(SosFilterStage):
+    """
+    Butterworth low-pass filter, giving the linear envelope of a rectified
+    signal.
+    """
+
+    def __init__(self,
+                 sampling_rate: float,
+                 channel_count: int,
+                 cutoff: float = 6.0,
+                 order: int = 2):
+        """
+        Args:
+            sampling_rate: Samples per second
+            channel_count: Number of channels in each block
+            cutoff: -3 dB frequency in Hz
+            order: Filter order
+        """
+        sos = signal.butter(order, cutoff, btype="lowpass", fs=sampling_rate, output="sos")
+        super().__init__(sos, channel_count)
+
+
+class FilterPipeline:
+    """
+    Runs blocks through a sequence of FilterStages.
+
+    If `channels` is given, only those columns of each block are filtered
+    and the rest, such as a trigger channel, pass through unchanged.
+    """
+
+    def __init__(self,
+                 stages: Sequence[FilterStage],
+                 channels: Optional[Sequence[int]] = None):
+        """
+        Args:
+            stages: Stages to apply, in order. Their channel counts must
+            match the number of filtered channels.
+            channels: Indices of the channels to filter (default: all)
+        """
+        self.stages = list(stages)
+        self.channels = None if channels is None else np.asarray(channels, dtype=np.intp)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Filter the next block.
+
+        Args:
+            block: Array of shape (samples, channels)
+
+        Returns:
+            New float32 array of the same shape
+        """
+        filtered = block if self.channels is None else block[:, self.channels]
+        for stage in self.stages:
+            filtered = stage.process(filtered)
+
+        if self.channels is None:
+            return filtered.astype(np.float32, copy=False)
+
+        output = block.astype(np.float32, copy=True)
+        output[:, self.channels] = filtered
+        return output
+
+    def reset(self) -> None:
+        """Reset every stage, e.g. after a gap in the stream."""
+        for stage in self.stages:
+            stage.reset()
+
+
+def create_emg_pipeline(sampling_rate: float,
+                        channel_count: int,
+                        line_frequency: Optional[float] = 50.0,
+                        band: Optional[tuple[float, float]] = (20.0, 450.0),
+                        envelope_cutoff: Optional[float] = None,
+                        channels: Optional[Sequence[int]] = None) -> FilterPipeline:
+    """
+    Build the usual EMG chain: band-pass, notch, then optionally rectification
+    and envelope.
+
+    Args:
+        sampling_rate: Samples per second
+        channel_count: Number of channels in each block
+        line_frequency: Power line frequency to notch out, or None to skip
+        band: Band-pass cutoffs in Hz, or None to skip. The upper cutoff is
+        clipped below the Nyquist frequency.
+        envelope_cutoff: Envelope low-pass cutoff in Hz, or None to output
+        the band-passed signal
+        channels: Indices of the channels to filter (default: all)
+
+    Returns:
+        FilterPipeline
+    """
+    filtered_count = channel_count if channels is None else len(channels)
+    stages: List[FilterStage] = []
+
+    if band is not None:
+        low_cutoff, high_cutoff = band
+        high_cutoff = min(high_cutoff, 0.45 * sampling_rate)
+        stages.append(BandPassStage(sampling_rate, filtered_count, low_cutoff, high_cutoff))
+
+    if line_frequency is not None:
+        stages.append(NotchStage(sampling_rate, filtered_count, line_frequency))
+
+    if envelope_cutoff is not None:
+        stages.append(RectifyStage())
+        stages.append(EnvelopeStage(sampling_rate, filtered_count, envelope_cutoff))
+
+    return FilterPipeline(stages, channels)
+
+
+class FilteredStream:
+    """
+    Filters a device manager's blocks into a ring buffer of its own.
+
+    It registers as a block listener on the source manager, and offers the
+    same stream_queue and block listener interface itself, so it can be
+    passed to consumers such as RealTimePlotter.set_ring_buffer(),
+    EpochSegmenter or StreamSynchronizer.add_device() in place of the
+    manager. Filtering is causal and keeps the sample count, so sample
+    indices match the source stream. Samples before the first block received
+    read back as NaN.
+    """
+
+    def __init__(self,
+                 source,
+                 pipeline: FilterPipeline,
+                 buffer_seconds: Optional[float] = None):
+        """
+        Args:
+            source: Device manager, or another FilteredStream
+            pipeline: Pipeline applied to each block
+            buffer_seconds: Length of filtered history kept (default: same
+            as the source)
+        """
+        self.source = source
+        self.pipeline = pipeline
+
+        source_queue = source.stream_queue
+        if buffer_seconds is None:
+            buffer_seconds = source_queue.capacity / source_queue.sampling_rate
+        self.stream_queue = RingBuffer(source_queue.channel_count,
+                                       source_queue.sampling_rate,
+                                       buffer_seconds)
+        # Sample indices match, so the source's block receive times apply
+        self.stream_queue.latency_tracker = source_queue.latency_tracker
+        self.block_listeners: List[Callable[[int, np.ndarray, float], None]] = []
+
+        source.add_block_listener(self.process_block)
+
+    def detach(self) -> None:
+        """Stop receiving blocks from the source."""
+        self.source.remove_block_listener(self.process_block)
+
+    def add_block_listener(self, listener: Callable[[int, np.ndarray, float], None]) -> None:
+        """Register a callable to receive each filtered block."""
+        self.block_listeners.append(listener)
+
+    def remove_block_listener(self, listener: Callable[[int, np.ndarray, float], None]) -> None:
+        """Unregister a callable added with add_block_listener()."""
+        self.block_listeners.remove(listener)
+
+    def process_block(self,
+                      first_sample_index: int,
+                      block: np.ndarray,
+                      receive_time: float) -> None:
+        """Filter a source block, store it and pass it on to listeners."""
+        # The filter state only describes contiguous data
+        if first_sample_index != self.stream_queue.total_samples:
+            self.pipeline.reset()
+            if first_sample_index < self.stream_queue.total_samples:
+                self.stream_queue.clear()  # The source was restarted
+            self.stream_queue.skip(first_sample_index - self.stream_queue.total_samples)
+
+        start = tracer.begin()
+        filtered = self.pipeline.process(block)
+        self.stream_queue.write(filtered)
+        tracer.end("filter", start, "filter")
+
+        latency_tracker = self.stream_queue.latency_tracker
+        if latency_tracker is not None and block.shape[0]:
+            latency_tracker.record(LatencyStage.FILTER, first_sample_index + block.shape[0] - 1)
+
+        for listener in self.block_listeners:
+            listener(first_sample_index, filtered, receive_time)
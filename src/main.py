@@ -1,9 +1,13 @@
+import atexit
+import os
+from pathlib import Path
 import sys
 
 from PySide6.QtWidgets import QApplication, QStyleFactory
 
 from src.managers.config_manager import ConfigManager
 from src.managers.window_manager import WindowManager
+from src.utils.tracing import tracer
 
 
 # class MainApplicationWindow(QMainWindow):
@@ -14,6 +18,10 @@ from src.managers.window_manager import WindowManager
 #         self.setCentralWidget(self.central_widget)
 
 if __name__ == "__main__":
+    if tracer.enabled:
+        atexit.register(tracer.export_chrome_trace,
+                        Path(os.environ.get("TRACE_FILE", "trace.json")))
+
     app = QApplication([])
     QApplication.setStyle(QStyleFactory.create("Fusion"))
 
@@ -2,11 +2,14 @@ from datetime import datetime
 from dataclasses import dataclass, field
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, TYPE_CHECKING
 
 from PySide6.QtCore import QObject
 from src.utils.message_utils import MessageUtils
 
+if TYPE_CHECKING:
+    from src.utils.sensor_map import SensorMap
+
 
 @dataclass
 class ConfigData:
@@ -40,11 +43,15 @@ class ConfigManager(QObject):
     """
     Manages config data, including importing, exporting, and setting config 
     attributes.
+
+    The sensor map file is compiled into a SensorMap once, when it is
+    uploaded or the config is set, and kept in sensor_map.
     """
 
     def __init__(self) -> None:
         super().__init__()
         self.config_data: Optional[ConfigData] = None
+        self.sensor_map: Optional["SensorMap"] = None
 
     def export_config(self) -> None:
         """Converts config data to JSON and writes to 'config.json'."""
@@ -154,3 +161,34 @@ class ConfigManager(QObject):
                 "Missing Configuration Field",
                 f"Configuration data is missing the required field: {e}"
             )
+            return
+
+        if self.sensor_map is None or self.sensor_map.path != self.config_data.sensor_map_path:
+            self.load_sensor_map(self.config_data.sensor_map_path)
+
+    def load_sensor_map(self, sensor_map_path: Path) -> bool:
+        """
+        Compiles a sensor map file and keeps it in sensor_map.
+
+        Args:
+            sensor_map_path (Path): Path to the sensor map CSV.
+
+        Returns:
+            bool: True if the sensor map was loaded, False otherwise.
+        """
+        # Imported here since it pulls in numpy, which startup doesn't need
+        from src.utils.sensor_map import load_sensor_map
+
+        try:
+            self.sensor_map = load_sensor_map(sensor_map_path)
+            return True
+
+        except (OSError, ValueError) as e:
+            self.sensor_map = None
+            MessageUtils.show_error_message(
+                None,
+                "Sensor Map Error",
+                "Failed to Load Sensor Map",
+                str(e)
+            )
+            return False
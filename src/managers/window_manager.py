@@ -4,7 +4,7 @@ from PySide6.QtCore import QObject
 from PySide6.QtWidgets import QMainWindow
 
 from src.managers.config_manager import ConfigManager
-from src.controllers.config_window import ConfigMainWindow
+from src.windows.config_window import ConfigMainWindow
 
 class WindowManager(QObject):
     def __init__(self, config_manager: ConfigManager):
@@ -1,12 +1,18 @@
 import math
 import sys
-from typing import List
+from typing import List, Optional
 
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QApplication, QMainWindow
 from PySide6.QtGui import QPen
-from pyqtgraph import GraphicsLayoutWidget, PlotDataItem, PlotItem, mkPen, InfiniteLine
+from pyqtgraph import FillBetweenItem, PlotCurveItem, PlotDataItem, PlotItem, mkBrush, mkPen, InfiniteLine
 import numpy as np
 
+from src.detectors.detection_params import DetectionParameters
+from src.detectors.epoch_averager import AveragingMode, EpochAverager
+from src.detectors.epoch_segmenter import Epoch
+from src.detectors.peak_detector import PeakDetector
+from src.plotters.paint_timed_layout_widget import PaintTimedLayoutWidget
 from src.utils.colors import LabColors, DetectionWindowColors
 
 # TODO: Dynamic detection algorithm
@@ -21,9 +27,24 @@ class DetectedPeakPlotter(QMainWindow):
     2) For bilateral plots, left side is listed first
     3) Plots in the same row share the same color
     4) All plots have the same y-axis label
+    5) Subplots are in the same order as the epoch's channels
+
+    Epochs can be sent from any thread through signal_epoch_ready; they are
+    plotted on the GUI thread along with their detected M and H values.
+
+    Each subplot also shows the running mean of the trial's epochs and a
+    band of one standard deviation around it. The statistics are updated
+    incrementally by an EpochAverager, so each epoch costs the same to add
+    however long the trial gets. Call reset_average() at the start of each
+    trial.
     """
+    signal_epoch_ready = Signal(object)
 
     PENS: List[QPen] = [mkPen(color) for color in LabColors.get_all_colors()]
+    MEAN_PENS: List[QPen] = [mkPen(color, width=2) for color in LabColors.get_all_colors()]
+
+    # Alpha of the standard deviation band
+    BAND_ALPHA = 60
     
     # This is used to space elements of displayed plot titles
     SPACING = "&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;"
@@ -34,7 +55,11 @@ class DetectedPeakPlotter(QMainWindow):
                  y_axis_unit: str,
                  sampling_rate: int,
                  x_axis_max: float = 3.0,
-                 plots_are_bilateral: bool = True):
+                 plots_are_bilateral: bool = True,
+                 detection_params: Optional[DetectionParameters] = None,
+                 averaging_mode: AveragingMode = AveragingMode.CUMULATIVE,
+                 averaging_window: int = 10,
+                 averaging_smoothing: float = 0.1):
         """
         Initialize the real-time plotter.
 
@@ -45,9 +70,24 @@ class DetectedPeakPlotter(QMainWindow):
             sampling_rate: Number of samples per second
             x_axis_max: Maximum time range for x-axis (default 3 seconds)
             plots_are_bilateral: Whether plots are arranged in two columns
+            detection_params: Parameters for peak detection (default:
+            DetectionParameters at sampling_rate)
+            averaging_mode: How epochs are weighted in the mean and band
+            averaging_window: Number of epochs averaged in WINDOW mode
+            averaging_smoothing: Weight of the newest epoch in EXPONENTIAL mode
         """
         super().__init__()
 
+        self.detection_params = detection_params or DetectionParameters(sampling_rate)
+        self.peak_detector = PeakDetector(self.detection_params)
+
+        self.averaging_mode = averaging_mode
+        self.averaging_window = averaging_window
+        self.averaging_smoothing = averaging_smoothing
+
+        # Created from the first epoch, once its shape is known
+        self.averager: Optional[EpochAverager] = None
+
         # Assuming labels are in the same order in which they should be plotted
         self.plot_titles = plot_titles
         self.y_axis_text = y_axis_text
@@ -64,17 +104,95 @@ class DetectedPeakPlotter(QMainWindow):
         # Ops on labels, title, axes range, etc. are done on these objects
         self.subplots = self._create_subplots()
 
-        self.main_plot = GraphicsLayoutWidget()
+        self.main_plot = PaintTimedLayoutWidget(trace_category="DetectedPeakPlotter")
         self._arrange_subplots()
 
         # Subplot data objects represent the data for the subplots
         # Updating plot with new data is done on these objects
         self.subplot_data = self._init_subplot_data(sampling_rate, x_axis_max)
-
+        self.mean_curves, self.band_edges = self._init_average_data()
 
         self.setWindowTitle("Detected Peak Plotter")
         self.setCentralWidget(self.main_plot)
 
+        self.signal_epoch_ready.connect(self.plot_epoch)
+
+    def plot_epoch(self, epoch: Epoch) -> None:
+        """
+        Plot an epoch and show its detected M and H latencies and amplitudes.
+
+        Args:
+            epoch: Epoch with channels in subplot order
+        """
+        trigger_offset = epoch.trigger_index - epoch.first_sample_index
+        results = self.peak_detector.detect(epoch.data, trigger_offset)
+
+        # Detection windows are relative to the trigger
+        x_values = (np.arange(epoch.data.shape[1]) - trigger_offset) / epoch.sampling_rate
+
+        for index, (curve, y_values) in enumerate(zip(self.subplot_data, epoch.data)):
+            curve.setData(x=x_values, y=y_values)
+            self.subplots[index].setTitle(self._format_title(self.plot_titles[index],
+                                                             results.m_latency[index],
+                                                             results.m_amplitude[index],
+                                                             results.h_latency[index],
+                                                             results.h_amplitude[index]))
+
+        self._update_average(x_values, epoch.data)
+
+    def reset_average(self) -> None:
+        """Clear the mean and band, e.g. at the start of a trial."""
+        if self.averager:
+            self.averager.reset()
+
+        for curve, (lower, upper) in zip(self.mean_curves, self.band_edges):
+            curve.setData(x=[], y=[])
+            lower.setData(x=[], y=[])
+            upper.setData(x=[], y=[])
+
+    def set_averaging(self,
+                      mode: AveragingMode,
+                      window: Optional[int] = None,
+                      smoothing: Optional[float] = None) -> None:
+        """
+        Change how epochs are weighted. Clears the current average.
+
+        Args:
+            mode: How epochs are weighted
+            window: Number of epochs averaged in WINDOW mode (default: unchanged)
+            smoothing: Weight of the newest epoch in EXPONENTIAL mode
+            (default: unchanged)
+        """
+        self.averaging_mode = mode
+        if window is not None:
+            self.averaging_window = window
+        if smoothing is not None:
+            self.averaging_smoothing = smoothing
+
+        self.averager = None
+        self.reset_average()
+
+    def _update_average(self, x_values: np.ndarray, data: np.ndarray) -> None:
+        """Add an epoch to the running statistics and redraw the mean and band."""
+        channel_count, sample_count = data.shape
+        if (self.averager is None
+                or self.averager.channel_count != channel_count
+                or self.averager.sample_count != sample_count):
+            self.averager = EpochAverager(channel_count,
+                                          sample_count,
+                                          self.averaging_mode,
+                                          self.averaging_window,
+                                          self.averaging_smoothing)
+
+        self.averager.add(data)
+        mean = self.averager.mean
+        std = self.averager.std
+
+        for index, (curve, (lower, upper)) in enumerate(zip(self.mean_curves, self.band_edges)):
+            curve.setData(x=x_values, y=mean[index])
+            lower.setData(x=x_values, y=mean[index] - std[index])
+            upper.setData(x=x_values, y=mean[index] + std[index])
+
     def _create_subplots(self) -> List[PlotItem]:
         """
         Create subplots for each plot title.
@@ -91,16 +209,16 @@ class DetectedPeakPlotter(QMainWindow):
         return subplots
     
     def _create_detection_windows(self):
-        m_response_start = self._create_detection_line(0.045,
+        m_response_start = self._create_detection_line(self.detection_params.m_start,
                                                        DetectionWindowColors.PURPLE.value,
                                                        "|>")
-        m_response_end = self._create_detection_line(0.058,
+        m_response_end = self._create_detection_line(self.detection_params.m_end,
                                                      DetectionWindowColors.PURPLE.value,
                                                      "<|")
-        h_response_start = self._create_detection_line(0.065,
+        h_response_start = self._create_detection_line(self.detection_params.h_start,
                                                       DetectionWindowColors.BLUE.value,
                                                       "|>")
-        h_response_end = self._create_detection_line(0.085,
+        h_response_end = self._create_detection_line(self.detection_params.h_end,
                                                       DetectionWindowColors.BLUE.value,
                                                       "<|")
         detection_window = [m_response_start, m_response_end, h_response_start, h_response_end]
@@ -120,10 +238,7 @@ class DetectedPeakPlotter(QMainWindow):
         Returns:
             Configured PlotItem
         """
-        styled_title = f"<b>{plot_title}</b>{self.SPACING}"\
-                    f"<span style='font-size: 12pt; color: {DetectionWindowColors.PURPLE.value}'>ML={0:0.1f} ms, MA={0:0.3f} mV{self.SPACING}"\
-                    f"<span style='color: {DetectionWindowColors.BLUE.value}'>HL={0:0.1f} ms, HA={0:0.3f} mV</span>"
-        plot = PlotItem(title=styled_title)
+        plot = PlotItem(title=self._format_title(plot_title, 0, 0, 0, 0))
         
         # Disable auto range for trigger plot
         if "trigger" not in plot_title.casefold():
@@ -134,6 +249,22 @@ class DetectedPeakPlotter(QMainWindow):
 
         return plot
     
+    def _format_title(self,
+                      plot_title: str,
+                      m_latency: float,
+                      m_amplitude: float,
+                      h_latency: float,
+                      h_amplitude: float) -> str:
+        """
+        Style a plot title with M and H values.
+
+        Latencies are given in seconds and amplitudes in volts, but they
+        are displayed in ms and mV.
+        """
+        return f"<b>{plot_title}</b>{self.SPACING}"\
+            f"<span style='font-size: 12pt; color: {DetectionWindowColors.PURPLE.value}'>ML={m_latency * 1000:0.1f} ms, MA={m_amplitude * 1000:0.3f} mV{self.SPACING}"\
+            f"<span style='color: {DetectionWindowColors.BLUE.value}'>HL={h_latency * 1000:0.1f} ms, HA={h_amplitude * 1000:0.3f} mV</span>"
+
     def _configure_axes(self, plot: PlotItem):
         plot.getAxis("left").setLabel(text=self.y_axis_text,
                                       units=self.y_axis_unit)
@@ -196,8 +327,34 @@ class DetectedPeakPlotter(QMainWindow):
                                                pen=self.PENS[row_index])
             subplot_data.append(curve)
         return subplot_data
-    
-   
+
+    def _init_average_data(self) -> tuple[List[PlotDataItem], List[tuple[PlotCurveItem, PlotCurveItem]]]:
+        """
+        Add a mean curve and a standard deviation band to each subplot.
+
+        Returns:
+            Tuple of (mean curves, (lower, upper) band edge curves)
+        """
+        mean_curves: List[PlotDataItem] = []
+        band_edges: List[tuple[PlotCurveItem, PlotCurveItem]] = []
+
+        for index, subplot in enumerate(self.subplots):
+            row_index = int(index / self.column_quantity)
+            color = self.PENS[row_index].color()
+            color.setAlpha(self.BAND_ALPHA)
+
+            lower = PlotCurveItem(pen=mkPen(color))
+            upper = PlotCurveItem(pen=mkPen(color))
+            band = FillBetweenItem(lower, upper, brush=mkBrush(color))
+            subplot.addItem(lower)
+            subplot.addItem(upper)
+            subplot.addItem(band)
+
+            mean_curves.append(subplot.plot(pen=self.MEAN_PENS[row_index]))
+            band_edges.append((lower, upper))
+
+        return mean_curves, band_edges
+
 
     def _create_detection_line(self,
                                position,
@@ -215,8 +372,8 @@ class DetectedPeakPlotter(QMainWindow):
         return line
 
     def _detection_window_updated(self, updated_line):
-        print("Line moved")
-        print(updated_line.name())
+        # TODO: Update detection_params from the moved line
+        pass
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,32 @@
+from typing import Callable, Optional
+
+from pyqtgraph import GraphicsLayoutWidget
+
+from src.utils.tracing import tracer
+
+
+class PaintTimedLayoutWidget(GraphicsLayoutWidget):
+    """
+    GraphicsLayoutWidget that traces each paint and reports when it has
+    finished.
+    """
+
+    def __init__(self,
+                 on_painted: Optional[Callable[[], None]] = None,
+                 trace_category: str = "plot"):
+        """
+        Args:
+            on_painted: Called after each paint
+            trace_category: Category of the paint spans, e.g. the plotter
+        """
+        super().__init__()
+        self.on_painted = on_painted
+        self.trace_category = trace_category
+
+    def paintEvent(self, event) -> None:
+        start = tracer.begin()
+        super().paintEvent(event)
+        tracer.end("paint", start, self.trace_category)
+
+        if self.on_painted is not None:
+            self.on_painted()
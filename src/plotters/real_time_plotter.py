@@ -1,13 +1,28 @@
+from enum import Enum
 import math
 import sys
-from typing import List
+from typing import List, Optional, Sequence, TYPE_CHECKING
 
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QPen
 from PySide6.QtWidgets import QApplication, QMainWindow
-from pyqtgraph import GraphicsLayoutWidget, PlotDataItem, PlotItem, mkPen
+from pyqtgraph import PlotDataItem, PlotItem, mkPen
 import numpy as np
 
+from src.plotters.paint_timed_layout_widget import PaintTimedLayoutWidget
 from src.utils.colors import LabColors
+from src.utils.decimation import MinMaxDecimator
+from src.utils.latency import LatencyStage
+from src.utils.tracing import tracer
+from src.utils.ring_buffer import RingBuffer
+
+if TYPE_CHECKING:
+    from src.utils.sensor_map import SensorMap
+
+class DisplayMode(Enum):
+    SWEEP = "Sweep"  # Oscilloscope style: new samples overwrite at a moving cursor
+    SCROLL = "Scroll"  # Newest sample is always at the right edge
+
 
 # TODO: Make sampling rate configurable in GUI
 # TODO: Make x_axis range dynamic (longer/shorter than 3 seconds)
@@ -22,6 +37,20 @@ class RealTimePlotter(QMainWindow):
     2) For bilateral plots, left side is listed first
     3) Plots in the same row share the same color
     4) All plots have the same y-axis label
+    5) Subplots are in the same order as the ring buffer's channels, unless
+    channel_index says which channel each subplot draws
+
+    Plots are redrawn by a timer at a fixed frame rate rather than on every
+    incoming block. Each redraw takes the last x_axis_max seconds from the
+    ring buffer and reduces it to a min/max envelope about one bin per pixel
+    wide, which keeps peaks visible while drawing far fewer points.
+
+    Display arrays are allocated when the window or plot width changes, not
+    per redraw. In scroll mode the window is a view onto the ring buffer. In
+    sweep mode only new samples are copied into a fixed display array.
+
+    If the ring buffer has a latency tracker, the newest sample of each
+    redraw is recorded at the DEQUEUE, PLOT_PREPARE and PAINT stages.
     """
 
     PENS: List[QPen] = [mkPen(color) for color in LabColors.get_all_colors()]
@@ -32,7 +61,11 @@ class RealTimePlotter(QMainWindow):
                  y_axis_unit: str,
                  sampling_rate: int,
                  x_axis_max: float = 3.0,
-                 plots_are_bilateral: bool = True):
+                 plots_are_bilateral: bool = True,
+                 ring_buffer: Optional[RingBuffer] = None,
+                 frame_rate: float = 30,
+                 display_mode: DisplayMode = DisplayMode.SCROLL,
+                 channel_index: Optional[Sequence[int]] = None):
         """
         Initialize the real-time plotter.
 
@@ -43,9 +76,32 @@ class RealTimePlotter(QMainWindow):
             sampling_rate: Number of samples per second
             x_axis_max: Maximum time range for x-axis (default 3 seconds)
             plots_are_bilateral: Whether plots are arranged in two columns
+            ring_buffer: Buffer of streamed data to plot (default: set later
+            with set_ring_buffer())
+            frame_rate: Number of redraws per second (default 30)
+            display_mode: Whether new data sweeps or scrolls (default scroll)
+            channel_index: Ring buffer channel drawn in each subplot
+            (default: the first len(plot_titles) channels, in order)
         """
         super().__init__()
 
+        self.sampling_rate = sampling_rate
+        self.x_axis_max = x_axis_max
+        self.window_length = int(x_axis_max * sampling_rate)
+        self.ring_buffer = ring_buffer
+        self.display_mode = display_mode
+        self.channel_index = None if channel_index is None else np.asarray(channel_index, dtype=np.intp)
+
+        # Allocated by _reset_display_data() and _rebuild_x_axis()
+        self._display_data: Optional[np.ndarray] = None
+        self._next_sample_index = 0
+        self._decimator: Optional[MinMaxDecimator] = None
+        self._x_values: Optional[np.ndarray] = None
+
+        # Newest sample drawn so far, and the one waiting to be painted
+        self._last_drawn_index = -1
+        self._pending_paint_index: Optional[int] = None
+
         # Assuming labels are in the same order in which they should be plotted
         self.plot_titles = plot_titles
         self.y_axis_text = y_axis_text
@@ -60,7 +116,7 @@ class RealTimePlotter(QMainWindow):
         # Ops on labels, title, axes range, etc. are done on these objects
         self.subplots = self._create_subplots()
 
-        self.main_plot = GraphicsLayoutWidget()
+        self.main_plot = PaintTimedLayoutWidget(self._frame_painted, "RealTimePlotter")
         self._arrange_subplots()
 
         # Subplot data objects represent the data for the subplots
@@ -70,6 +126,201 @@ class RealTimePlotter(QMainWindow):
         self.setWindowTitle("Real Time Plot")
         self.setCentralWidget(self.main_plot)
 
+        self.update_timer = QTimer(self)
+        self.update_timer.timeout.connect(self._update_plots)
+        self.set_frame_rate(frame_rate)
+
+    @classmethod
+    def from_sensor_map(cls,
+                        sensor_map: "SensorMap",
+                        y_axis_text: str,
+                        y_axis_unit: str,
+                        sampling_rate: int,
+                        **kwargs) -> "RealTimePlotter":
+        """
+        Create a plotter laid out by a sensor map.
+
+        Subplot titles, columns and the Trigno channel drawn in each subplot
+        all come from the compiled sensor map.
+
+        Args:
+            sensor_map: Compiled sensor map of the device plotted
+            y_axis_text: Text label for y-axis
+            y_axis_unit: Unit for y-axis values
+            sampling_rate: Number of samples per second
+            **kwargs: Other RealTimePlotter arguments
+        """
+        return cls(sensor_map.plot_titles,
+                   y_axis_text,
+                   y_axis_unit,
+                   sampling_rate,
+                   plots_are_bilateral=sensor_map.plots_are_bilateral,
+                   channel_index=sensor_map.channel_index,
+                   **kwargs)
+
+    def set_ring_buffer(self, ring_buffer: RingBuffer) -> None:
+        """Set the buffer that plots are drawn from."""
+        self.ring_buffer = ring_buffer
+        self._decimator = None
+        self._last_drawn_index = -1
+        self._reset_display_data()
+
+    def set_display_mode(self, display_mode: DisplayMode) -> None:
+        """Switch between sweep and scroll display."""
+        self.display_mode = display_mode
+        self._reset_display_data()
+
+    def set_x_axis_max(self, x_axis_max: float) -> None:
+        """Set the time range displayed, in seconds."""
+        self.x_axis_max = x_axis_max
+        self._set_window_length()
+
+    def set_sampling_rate(self, sampling_rate: int) -> None:
+        """Set the sampling rate of the plotted data."""
+        self.sampling_rate = sampling_rate
+        self._set_window_length()
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """Set the number of redraws per second."""
+        self.update_timer.setInterval(round(1000 / frame_rate))
+
+    def start_updates(self) -> None:
+        """Start redrawing plots from the ring buffer."""
+        self.update_timer.start()
+
+    def stop_updates(self) -> None:
+        """Stop redrawing plots."""
+        self.update_timer.stop()
+
+    def closeEvent(self, event) -> None:
+        self.stop_updates()
+        super().closeEvent(event)
+
+    def _set_window_length(self) -> None:
+        self.window_length = int(self.x_axis_max * self.sampling_rate)
+        self._decimator = None
+        self._reset_display_data()
+
+    def _reset_display_data(self) -> None:
+        """Allocate a blank display array for the current window length."""
+        if self.ring_buffer is None:
+            return
+
+        self._display_data = np.zeros((self.ring_buffer.channel_count, self.window_length),
+                                      dtype=np.float32)
+
+        # Sweep mode starts by filling in the most recent window
+        self._next_sample_index = max(0, self.ring_buffer.total_samples - self.window_length)
+
+    def _rebuild_x_axis(self, bin_count: int) -> None:
+        """
+        Rebuild the decimator and x values.
+
+        Only needed when the window length or plot width changes.
+        """
+        self._decimator = MinMaxDecimator(self.ring_buffer.channel_count,
+                                          self.window_length,
+                                          bin_count)
+        self._x_values = self._decimator.sample_indices / self.sampling_rate
+
+    def _update_plots(self) -> None:
+        """Redraw every subplot from the ring buffer."""
+        if self.ring_buffer is None:
+            return
+
+        if self._display_data is None:
+            self._reset_display_data()
+
+        start = tracer.begin()
+        bin_count = self._get_bin_count()
+        if self._decimator is None or self._decimator.bin_count != bin_count:
+            self._rebuild_x_axis(bin_count)
+
+        # Read before the samples, so a block written in between does not
+        # make latencies look shorter than they are
+        newest_index = self.ring_buffer.total_samples - 1
+        if self.display_mode == DisplayMode.SWEEP:
+            window = self._get_sweep_window()
+            newest_index = self._next_sample_index - 1
+        else:
+            window = self._get_scroll_window()
+
+        latency_tracker = self.ring_buffer.latency_tracker
+        if newest_index < 0 or newest_index == self._last_drawn_index:
+            latency_tracker = None  # Nothing new to measure
+        elif latency_tracker is not None:
+            latency_tracker.record(LatencyStage.DEQUEUE, newest_index)
+
+        decimated = self._decimator.decimate(window)
+        if self.channel_index is not None:
+            # Reorder the small decimated array rather than the window
+            decimated = decimated[self.channel_index]
+
+        for curve, y_values in zip(self.subplot_data, decimated):
+            curve.setData(x=self._x_values, y=y_values)
+        tracer.end("prepare", start, "RealTimePlotter")
+
+        if latency_tracker is not None:
+            latency_tracker.record(LatencyStage.PLOT_PREPARE, newest_index)
+            self._last_drawn_index = newest_index
+            self._pending_paint_index = newest_index
+
+    def _frame_painted(self) -> None:
+        """Record the paint latency of the newest sample just drawn."""
+        if self._pending_paint_index is None or self.ring_buffer is None:
+            return
+
+        latency_tracker = self.ring_buffer.latency_tracker
+        if latency_tracker is not None:
+            latency_tracker.record(LatencyStage.PAINT, self._pending_paint_index)
+        self._pending_paint_index = None
+
+    def _get_scroll_window(self) -> np.ndarray:
+        """
+        Return the last window of data, newest sample at x_axis_max.
+
+        This is a view onto the ring buffer once it holds a full window.
+        """
+        window = self.ring_buffer.latest(self.window_length)
+        sample_count = window.shape[1]
+
+        if sample_count == self.window_length:
+            return window
+
+        # Right-align the data in the display array while the buffer fills
+        self._display_data[:, :self.window_length - sample_count] = 0
+        self._display_data[:, self.window_length - sample_count:] = window
+        return self._display_data
+
+    def _get_sweep_window(self) -> np.ndarray:
+        """
+        Copy samples received since the last redraw into the display array.
+
+        Sample i is always drawn at position i % window_length, so the cursor
+        keeps moving at the right speed even if samples were missed.
+        """
+        start, new_data = self.ring_buffer.read_since(self._next_sample_index)
+        sample_count = new_data.shape[1]
+        self._next_sample_index = start + sample_count
+
+        # Only the last window of new samples can be seen
+        if sample_count > self.window_length:
+            start += sample_count - self.window_length
+            new_data = new_data[:, -self.window_length:]
+            sample_count = self.window_length
+
+        cursor = start % self.window_length
+        first_length = min(sample_count, self.window_length - cursor)
+
+        self._display_data[:, cursor:cursor + first_length] = new_data[:, :first_length]
+        self._display_data[:, :sample_count - first_length] = new_data[:, first_length:]
+
+        return self._display_data
+
+    def _get_bin_count(self) -> int:
+        """Return the number of decimation bins, one per pixel of plot width."""
+        return max(1, int(self.subplots[0].getViewBox().width()))
+
     def _create_subplots(self) -> List[PlotItem]:
         """
         Create subplots for each plot title.
@@ -120,7 +371,6 @@ class RealTimePlotter(QMainWindow):
                                        col=column_index,
                                        colspan=2)
             else:
-                print(subplot.titleLabel.text.casefold())
                 self.main_plot.addItem(subplot,
                                        row=row_index,
                                        col=column_index)
@@ -0,0 +1,236 @@
+from enum import Enum
+import sys
+import time
+from typing import List, Optional, Sequence
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QApplication, QMainWindow
+from pyqtgraph import BarGraphItem, PlotDataItem, PlotItem, mkBrush, mkPen
+import numpy as np
+
+from src.plotters.paint_timed_layout_widget import PaintTimedLayoutWidget
+from src.utils.colors import LabColors
+from src.utils.latency import LatencyStage
+from src.utils.moving_window import MovingWindowAverage
+from src.utils.ring_buffer import RingBuffer
+from src.utils.tracing import tracer
+
+class TaskMetric(Enum):
+    RMS = "RMS"
+    ENVELOPE = "Envelope"  # Moving average of the rectified signal
+
+
+class TaskPlotter(QMainWindow):
+    """
+    A biofeedback plotter showing one bar per muscle and its target level.
+
+    Each bar is the moving RMS or envelope of one ring buffer channel over
+    the last `window_seconds`. Values are updated incrementally on every
+    redraw, so the cost per redraw only depends on the number of new samples.
+    Bars turn green while within `target_tolerance` of their target.
+
+    Subjects react to this display, so redraws use a precise timer. If the
+    ring buffer has a latency tracker, the newest sample of each redraw is
+    recorded at the DEQUEUE, PLOT_PREPARE and PAINT stages, and the PAINT
+    latency from socket receive is shown in the status bar. It does not
+    include the monitor's refresh.
+    """
+
+    BAR_WIDTH = 0.6
+    BAR_BRUSH = mkBrush(LabColors.LIGHT_BLUE.value)
+    ON_TARGET_BRUSH = mkBrush(LabColors.GREEN.value)
+    TARGET_PEN = mkPen(LabColors.RED.value, width=3)
+
+    STATUS_INTERVAL = 0.5  # seconds between latency readouts
+
+    def __init__(self,
+                 bar_titles: List[str],
+                 y_axis_text: str,
+                 y_axis_unit: str,
+                 channels: Optional[Sequence[int]] = None,
+                 ring_buffer: Optional[RingBuffer] = None,
+                 task_metric: TaskMetric = TaskMetric.RMS,
+                 window_seconds: float = 0.2,
+                 targets: Optional[Sequence[float]] = None,
+                 target_tolerance: float = 0.1,
+                 frame_rate: float = 60):
+        """
+        Initialize the task plotter.
+
+        Args:
+            bar_titles: Muscle name shown under each bar
+            y_axis_text: Text label for y-axis
+            y_axis_unit: Unit for y-axis values
+            channels: Ring buffer channel of each bar (default: the first
+            len(bar_titles) channels)
+            ring_buffer: Buffer of streamed data (default: set later with
+            set_ring_buffer())
+            task_metric: Whether bars show moving RMS or envelope
+            window_seconds: Length of the moving window
+            targets: Target level of each bar, in y-axis units (default: none)
+            target_tolerance: Fraction of a target within which a bar counts
+            as on target
+            frame_rate: Number of redraws per second (default 60)
+        """
+        super().__init__()
+
+        self.bar_titles = bar_titles
+        self.channels = list(channels) if channels is not None else list(range(len(bar_titles)))
+        self.task_metric = task_metric
+        self.window_seconds = window_seconds
+        self.target_tolerance = target_tolerance
+        self.targets = np.full(len(bar_titles), np.nan)
+
+        self.ring_buffer: Optional[RingBuffer] = None
+        self._moving_average: Optional[MovingWindowAverage] = None
+
+        # Newest sample of the frame waiting to be painted
+        self._pending_paint_index: Optional[int] = None
+        self._last_status_time = 0.0
+
+        self.plot = PlotItem(title=f'<span style="color: #FFF;">{task_metric.value}</span>')
+        self.plot.getAxis("left").setLabel(text=y_axis_text, units=y_axis_unit)
+        self.plot.getAxis("bottom").setTicks([list(enumerate(bar_titles))])
+        self.plot.setXRange(-0.5, len(bar_titles) - 0.5)
+        self.plot.setMouseEnabled(x=False, y=False)
+
+        self._x_values = np.arange(len(bar_titles), dtype=float)
+        self.bars = BarGraphItem(x=self._x_values,
+                                 height=np.zeros(len(bar_titles)),
+                                 width=self.BAR_WIDTH,
+                                 brush=self.BAR_BRUSH)
+        self.plot.addItem(self.bars)
+
+        # One horizontal segment over each bar, drawn as disconnected pairs
+        self.target_lines = PlotDataItem(pen=self.TARGET_PEN, connect="pairs")
+        self.plot.addItem(self.target_lines)
+
+        self.main_plot = PaintTimedLayoutWidget(self._frame_painted, "TaskPlotter")
+        self.main_plot.addItem(self.plot)
+
+        self.setWindowTitle("Task Plot")
+        self.setCentralWidget(self.main_plot)
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.update_timer.timeout.connect(self._update_bars)
+        self.set_frame_rate(frame_rate)
+
+        if targets is not None:
+            self.set_targets(targets)
+        if ring_buffer is not None:
+            self.set_ring_buffer(ring_buffer)
+
+    def set_ring_buffer(self, ring_buffer: RingBuffer) -> None:
+        """Set the buffer that bars are computed from."""
+        self.ring_buffer = ring_buffer
+        self._reset_moving_average()
+
+    def set_task_metric(self, task_metric: TaskMetric) -> None:
+        """Switch between moving RMS and envelope."""
+        self.task_metric = task_metric
+        self.plot.setTitle(f'<span style="color: #FFF;">{task_metric.value}</span>')
+        self._reset_moving_average()
+
+    def set_window_seconds(self, window_seconds: float) -> None:
+        """Set the length of the moving window."""
+        self.window_seconds = window_seconds
+        self._reset_moving_average()
+
+    def set_targets(self, targets: Sequence[float]) -> None:
+        """
+        Set the target level of each bar.
+
+        Args:
+            targets: One value per bar in y-axis units; NaN hides a target
+        """
+        self.targets = np.asarray(targets, dtype=float)
+
+        half_width = self.BAR_WIDTH / 2
+        x_values = np.column_stack((self._x_values - half_width,
+                                    self._x_values + half_width)).ravel()
+        y_values = np.repeat(self.targets, 2)
+        is_shown = ~np.isnan(y_values)
+        self.target_lines.setData(x=x_values[is_shown], y=y_values[is_shown])
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """Set the number of redraws per second."""
+        self.update_timer.setInterval(round(1000 / frame_rate))
+
+    def start_updates(self) -> None:
+        """Start redrawing bars from the ring buffer."""
+        self.update_timer.start()
+
+    def stop_updates(self) -> None:
+        """Stop redrawing bars."""
+        self.update_timer.stop()
+
+    def closeEvent(self, event) -> None:
+        self.stop_updates()
+        super().closeEvent(event)
+
+    def _reset_moving_average(self) -> None:
+        if self.ring_buffer is None:
+            return
+
+        window_length = max(1, round(self.window_seconds * self.ring_buffer.sampling_rate))
+        power = 2 if self.task_metric == TaskMetric.RMS else 1
+        self._moving_average = MovingWindowAverage(self.ring_buffer,
+                                                   window_length,
+                                                   self.channels,
+                                                   power)
+
+    def _update_bars(self) -> None:
+        """Take in new samples and redraw the bars."""
+        if self._moving_average is None:
+            return
+
+        # Read before the samples, so a block written in between does not
+        # make latencies look shorter than they are
+        newest_index = self.ring_buffer.total_samples - 1
+        start = tracer.begin()
+        if self._moving_average.update() == 0:
+            return
+
+        latency_tracker = self.ring_buffer.latency_tracker
+        if latency_tracker is not None:
+            latency_tracker.record(LatencyStage.DEQUEUE, newest_index)
+
+        values = self._moving_average.values
+        is_on_target = np.abs(values - self.targets) <= self.target_tolerance * np.abs(self.targets)
+        brushes = [self.ON_TARGET_BRUSH if on_target else self.BAR_BRUSH
+                   for on_target in is_on_target]
+        self.bars.setOpts(height=values, brushes=brushes)
+        tracer.end("prepare", start, "TaskPlotter")
+
+        if latency_tracker is not None:
+            latency_tracker.record(LatencyStage.PLOT_PREPARE, newest_index)
+            # PAINT is recorded once this frame has been painted
+            self._pending_paint_index = newest_index
+
+    def _frame_painted(self) -> None:
+        """Record the paint latency of the newest sample just drawn."""
+        if self._pending_paint_index is None or self.ring_buffer is None:
+            return
+
+        latency_tracker = self.ring_buffer.latency_tracker
+        if latency_tracker is None:
+            return
+
+        now = time.perf_counter()
+        latency_tracker.record(LatencyStage.PAINT, self._pending_paint_index, now)
+        self._pending_paint_index = None
+
+        if now - self._last_status_time >= self.STATUS_INTERVAL:
+            self._last_status_time = now
+            latency = latency_tracker.histograms[LatencyStage.PAINT].get_percentiles()
+            if latency["p50"] is not None:
+                self.statusBar().showMessage(f"Latency: {latency['p50']:.0f} ms "
+                                             f"(p95 {latency['p95']:.0f} ms)")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = TaskPlotter(["TA", "SOL", "GM"], "EMG", "V", targets=[1e-4, 2e-4, np.nan])
+    window.show()
+    sys.exit(app.exec())
@@ -0,0 +1,259 @@
+"""
+Headless recording for long unattended sessions.
+
+Connects the selected devices, streams them straight to a SessionRecorder
+and prints throughput and drop statistics, with no Qt event loop or
+plotting. Ctrl+C stops streaming, finishes writing and converts the
+recording to the session layout in src.recorders.session_format.
+
+    python -m src.record <subject_dir>/config.json --devices Trigno USBAmp QTM
+
+config.json is the file written by ConfigManager.export_config(). If it
+names a sensor map, Trigno channels are stored in sensor map order and named
+after their sensors. Only QTM's primary stream (--qtm-stream) is recorded.
+"""
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import signal
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.devices.abstract_manager import AbstractDeviceManager
+from src.devices.device_types import DeviceTypes
+from src.recorders.session_format import SessionWriter, get_session_dir
+from src.recorders.session_recorder import SessionRecorder
+from src.utils.sensor_map import SensorMap, load_sensor_map
+
+RECORDING_FILE_NAME = "recording.dsck"
+
+# Devices whose managers hand blocks to a recorder
+RECORDABLE_DEVICES = (DeviceTypes.TRIGNO, DeviceTypes.USBAMP, DeviceTypes.QTM)
+
+
+def load_subject_dir(config_path: Path) -> Path:
+    """
+    Return the subject directory named in an exported config.json.
+
+    Args:
+        config_path: File written by ConfigManager.export_config()
+    """
+    config = _read_config(config_path)
+
+    if "subject_dir" in config:
+        return Path(config["subject_dir"])
+    return Path(config["save_directory"]) / config["subject_id"]
+
+
+def load_config_sensor_map(config_path: Path) -> Optional[SensorMap]:
+    """
+    Compile the Trigno sensor map named in an exported config.json.
+
+    Args:
+        config_path: File written by ConfigManager.export_config()
+
+    Returns:
+        SensorMap, or None if the config names no sensor map
+    """
+    sensor_map_path = _read_config(config_path).get("sensor_map_path")
+    if not sensor_map_path:
+        return None
+    return load_sensor_map(Path(sensor_map_path))
+
+
+def _read_config(config_path: Path) -> Dict:
+    with open(config_path, "r") as file:
+        return json.load(file)
+
+
+def create_manager(device: DeviceTypes, args: argparse.Namespace) -> AbstractDeviceManager:
+    """
+    Create the manager of a device. Device modules are imported here so that
+    only the SDKs of the selected devices are needed.
+    """
+    if device == DeviceTypes.TRIGNO:
+        from src.devices.trigno.trigno_client import TrignoClient
+        from src.devices.trigno.trigno_manager import TrignoManager
+        return TrignoManager(TrignoClient, host_ip=args.trigno_host)
+
+    if device == DeviceTypes.USBAMP:
+        from src.devices.usbamp.usbamp_manager import USBAmpManager
+        gds_class = None
+        if args.fake_usbamp:
+            from src.devices.usbamp.fake_gds import FakeGDS
+            gds_class = FakeGDS
+        return USBAmpManager(sampling_rate=args.usbamp_rate, gds_class=gds_class)
+
+    if device == DeviceTypes.QTM:
+        from src.devices.qtm.qtm_client import QTMClient
+        from src.devices.qtm.qtm_manager import QTMManager
+        return QTMManager(QTMClient(args.qtm_host), primary_stream=args.qtm_stream)
+
+    raise ValueError(f"{device.value} cannot be recorded headless")
+
+
+class HeadlessSession:
+    """
+    Streams device managers to a SessionRecorder until stopped.
+
+    stop() may be called from any thread or a signal handler; run() then
+    stops streaming, writes any pending blocks and disconnects.
+    """
+
+    def __init__(self,
+                 managers: Dict[DeviceTypes, AbstractDeviceManager],
+                 recording_path: Path,
+                 stats_interval: float = 10.0):
+        """
+        Args:
+            managers: Manager of each device to record
+            recording_path: File the SessionRecorder writes to
+            stats_interval: Seconds between statistics lines
+        """
+        self.managers = managers
+        self.recorder = SessionRecorder(recording_path)
+        self.stats_interval = stats_interval
+
+        self._stop_requested = threading.Event()
+        self._start_time = 0.0
+        self._last_stats_time = 0.0
+        self._last_sample_counts: Dict[DeviceTypes, int] = {}
+
+    def stop(self) -> None:
+        """Ask run() to finish."""
+        self._stop_requested.set()
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """
+        Record until stop() is called or `duration` seconds have passed.
+
+        Args:
+            duration: Seconds to record for (default: until stopped)
+        """
+        connected: List[AbstractDeviceManager] = []
+        started: List[AbstractDeviceManager] = []
+        try:
+            for device, manager in self.managers.items():
+                if manager.connect() is False:
+                    raise ConnectionError(f"{device.value} failed to connect")
+                connected.append(manager)
+                manager.recorder = self.recorder
+                print(f"{device.value} connected")
+
+            self.recorder.start()
+            for manager in self.managers.values():
+                manager.start_streaming()
+                started.append(manager)
+
+            self._start_time = self._last_stats_time = time.perf_counter()
+            self._last_sample_counts = {device: manager.stream_queue.total_samples
+                                        for device, manager in self.managers.items()}
+
+            while not self._stop_requested.is_set():
+                timeout = self.stats_interval
+                if duration is not None:
+                    remaining = self._start_time + duration - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    timeout = min(timeout, remaining)
+
+                if not self._stop_requested.wait(timeout):
+                    self._print_stats()
+
+        finally:
+            for manager in started:
+                manager.stop_streaming()
+            try:
+                # Raises if the recorder's writer failed
+                self.recorder.stop()
+            finally:
+                for manager in connected:
+                    manager.disconnect()
+
+                if started:
+                    self._print_stats()
+
+    def _print_stats(self) -> None:
+        now = time.perf_counter()
+        interval = max(now - self._last_stats_time, 1e-9)
+        elapsed = now - self._start_time
+
+        parts = [f"[{elapsed:8.1f} s]"]
+        for device, manager in self.managers.items():
+            stream_queue = manager.stream_queue
+            sample_count = stream_queue.total_samples
+            rate = (sample_count - self._last_sample_counts.get(device, 0)) / interval
+            # Samples the device should have sent by now but hasn't
+            behind = max(0, round(elapsed * stream_queue.sampling_rate) - sample_count)
+            parts.append(f"{device.value}: {rate:7.0f} Hz "
+                         f"({sample_count} samples, {behind} behind)")
+            self._last_sample_counts[device] = sample_count
+
+        megabytes = self.recorder.file_path.stat().st_size / 1e6 \
+            if self.recorder.file_path.exists() else 0.0
+        parts.append(f"recorder: {self.recorder.written_blocks} blocks, "
+                     f"{self.recorder.dropped_blocks} dropped, {megabytes:.1f} MB")
+
+        print(" | ".join(parts), flush=True)
+        self._last_stats_time = now
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record devices without the GUI.")
+    parser.add_argument("config", type=Path, help="config.json exported by the config window")
+    parser.add_argument("--devices", nargs="+", default=[DeviceTypes.TRIGNO.value],
+                        choices=[device.value for device in RECORDABLE_DEVICES])
+    parser.add_argument("--session-name", default=None,
+                        help="Session directory name (default: the start time)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Seconds to record for (default: until Ctrl+C)")
+    parser.add_argument("--stats-interval", type=float, default=10.0,
+                        help="Seconds between statistics lines")
+    parser.add_argument("--trigno-host", default="10.229.96.105")
+    parser.add_argument("--qtm-host", default="10.229.96.105")
+    parser.add_argument("--qtm-stream", default="analog_1",
+                        help="QTM stream to record, e.g. analog_1, 3d or force_1")
+    parser.add_argument("--usbamp-rate", type=int, default=1200)
+    parser.add_argument("--fake-usbamp", action="store_true",
+                        help="Record simulated USBAmp data")
+    parser.add_argument("--keep-recording", action="store_true",
+                        help="Keep the raw recording after converting it")
+    args = parser.parse_args(argv)
+
+    # Compiled before recording, so a bad sensor map fails straight away
+    sensor_maps: Dict[DeviceTypes, SensorMap] = {}
+    if DeviceTypes.TRIGNO.value in args.devices:
+        sensor_map = load_config_sensor_map(args.config)
+        if sensor_map is not None:
+            sensor_maps[DeviceTypes.TRIGNO] = sensor_map
+
+    session_name = args.session_name or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    session_dir = get_session_dir(load_subject_dir(args.config), session_name)
+    session_dir.mkdir(parents=True, exist_ok=True)
+    recording_path = session_dir / RECORDING_FILE_NAME
+
+    managers = {DeviceTypes(name): create_manager(DeviceTypes(name), args) for name in args.devices}
+    session = HeadlessSession(managers, recording_path, args.stats_interval)
+
+    def handle_interrupt(signal_number, frame):
+        print("Stopping...", flush=True)
+        session.stop()
+        # A second Ctrl+C interrupts immediately
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, handle_interrupt)
+    print(f"Recording to {session_dir}. Press Ctrl+C to stop.", flush=True)
+    session.run(args.duration)
+
+    writer = SessionWriter(session_dir)
+    writer.import_recording(recording_path, sensor_maps)
+    writer.close()
+    if not args.keep_recording:
+        recording_path.unlink()
+    print(f"Session written to {session_dir}")
+
+
+if __name__ == "__main__":
+    main()
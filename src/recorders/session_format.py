@@ -0,0 +1,329 @@
+"""
+On-disk session layout.
+
+Sessions are stored under the subject directory from ConfigData:
+
+    <subject_dir>/
+        config.json
+        <session_name>/
+            session.json     Session index (see below)
+            Trigno.f32       One raw data file per device
+            USBAmp.f32
+            ...
+
+Each device data file is a headerless array of little-endian float32 values
+in (samples, channels) order. Row i is the device's sample
+first_sample_index + i, where first_sample_index is the device sample index
+recording started at (e.g. when a recorder is attached to a device that is
+already streaming). Samples lost while recording are filled with NaN so that
+this always holds. The number of samples is derived from the file size.
+
+session.json holds everything needed to interpret the data files:
+
+    {
+        "format_version": 1,
+        "devices": {
+            "Trigno": {
+                "file": "Trigno.f32",
+                "dtype": "<f4",
+                "channel_count": 16,
+                "sampling_rate": 2000,
+                "first_sample_index": 0,
+                "channel_names": ["L TA", "R TA", ...]
+            }
+        },
+        "trials": [
+            {"name": "trial_1", "start_time": 0.0, "end_time": 12.5,
+             "stimulus_intensity": 12.0}
+        ]
+    }
+
+Trial boundaries are in seconds on each device's sample clock, i.e. sample
+index / sampling_rate, so the same trial maps to the right rows of every
+device file. "first_sample_index" is 0 if missing. "stimulus_intensity" is
+optional and holds the stimulator setting used throughout the trial, e.g. in
+mA.
+"""
+import json
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+from src.devices.device_types import DeviceTypes
+from src.recorders.session_recorder import read_chunks
+
+if TYPE_CHECKING:
+    from src.utils.sensor_map import SensorMap
+
+
+FORMAT_VERSION = 1
+INDEX_FILE_NAME = "session.json"
+SAMPLE_DTYPE = np.dtype("<f4")
+
+
+def get_session_dir(subject_dir: Path, session_name: str) -> Path:
+    """Return the directory a session is stored in."""
+    return Path(subject_dir) / session_name
+
+
+class SessionWriter:
+    """
+    Writes device data and trial boundaries in the session layout.
+    """
+
+    def __init__(self, session_dir: Path):
+        """
+        Create the session directory.
+
+        Args:
+            session_dir: Directory to write the session to
+        """
+        self.session_dir = Path(session_dir)
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+
+        self.devices: Dict[str, Dict] = {}
+        self.trials: List[Dict] = []
+
+        self._files: Dict[str, BinaryIO] = {}
+        self._sample_counts: Dict[str, int] = {}
+
+    def add_device(self,
+                   device: DeviceTypes,
+                   channel_count: int,
+                   sampling_rate: float,
+                   channel_names: Optional[List[str]] = None,
+                   first_sample_index: Optional[int] = None) -> None:
+        """
+        Register a device and create its data file.
+
+        Args:
+            device: Device to add
+            channel_count: Number of channels per sample
+            sampling_rate: Number of samples per second
+            channel_names: Optional channel labels, in column order
+            first_sample_index: Device sample index of the first row
+            (default: that of the first block appended)
+        """
+        file_name = f"{device.value}.f32"
+        self.devices[device.value] = {
+            "file": file_name,
+            "dtype": SAMPLE_DTYPE.str,
+            "channel_count": channel_count,
+            "sampling_rate": sampling_rate,
+            "first_sample_index": first_sample_index,
+            "channel_names": channel_names or [],
+        }
+        self._files[device.value] = open(self.session_dir / file_name, "wb")
+        self._sample_counts[device.value] = 0
+
+    def append(self,
+               device: DeviceTypes,
+               block: np.ndarray,
+               first_sample_index: Optional[int] = None) -> None:
+        """
+        Append a block of samples to a device's data file.
+
+        Args:
+            device: Device the samples came from
+            block: Array of shape (samples, channels)
+            first_sample_index: Device sample index of the first sample. Any
+            gap since the last block is filled with NaN. Blocks that overlap
+            already written samples are trimmed.
+        """
+        device_info = self.devices[device.value]
+        if device_info["first_sample_index"] is None:
+            # Rows start at the first block rather than at sample 0
+            device_info["first_sample_index"] = first_sample_index or 0
+
+        written = device_info["first_sample_index"] + self._sample_counts[device.value]
+        if first_sample_index is None:
+            first_sample_index = written
+
+        block = np.asarray(block, dtype=SAMPLE_DTYPE)
+
+        gap = first_sample_index - written
+        if gap > 0:
+            self._write(device, np.full((gap, block.shape[1]), np.nan, dtype=SAMPLE_DTYPE))
+        elif gap < 0:
+            block = block[-gap:]
+            if block.shape[0] == 0:
+                return
+
+        self._write(device, block)
+
+    def add_trial(self,
+                  name: str,
+                  start_time: float,
+                  end_time: float,
+                  stimulus_intensity: Optional[float] = None) -> None:
+        """
+        Record a trial boundary.
+
+        Args:
+            name: Trial name
+            start_time: Seconds on the devices' sample clocks
+            end_time: Seconds on the devices' sample clocks
+            stimulus_intensity: Stimulator setting used during the trial
+        """
+        trial = {"name": name,
+                 "start_time": start_time,
+                 "end_time": end_time}
+        if stimulus_intensity is not None:
+            trial["stimulus_intensity"] = stimulus_intensity
+        self.trials.append(trial)
+
+    def import_recording(self,
+                         recording_path: Path,
+                         sensor_maps: Optional[Dict[DeviceTypes, "SensorMap"]] = None) -> None:
+        """
+        Append every chunk of a SessionRecorder file to the session.
+
+        Devices are added the first time one of their chunks is seen.
+
+        Args:
+            recording_path: Path of the file written by SessionRecorder
+            sensor_maps: Sensor map of each device whose channels should be
+            stored in plot order and named after their sensors. Channels not
+            in the map are left out.
+        """
+        sensor_maps = sensor_maps or {}
+
+        for chunk in read_chunks(recording_path):
+            sensor_map = sensor_maps.get(chunk.device)
+            samples = chunk.samples if sensor_map is None else sensor_map.route(chunk.samples)
+
+            if chunk.device.value not in self.devices:
+                self.add_device(chunk.device,
+                                samples.shape[1],
+                                chunk.sampling_rate,
+                                None if sensor_map is None else sensor_map.plot_titles)
+            self.append(chunk.device, samples, chunk.first_sample_index)
+
+    def close(self) -> None:
+        """Close the data files and write the session index."""
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+        # Devices that never received a block
+        for device_info in self.devices.values():
+            if device_info["first_sample_index"] is None:
+                device_info["first_sample_index"] = 0
+
+        index = {
+            "format_version": FORMAT_VERSION,
+            "devices": self.devices,
+            "trials": self.trials,
+        }
+        with open(self.session_dir / INDEX_FILE_NAME, "w") as file:
+            json.dump(index, file, indent=4)
+
+    def _write(self, device: DeviceTypes, block: np.ndarray) -> None:
+        self._files[device.value].write(np.ascontiguousarray(block).tobytes())
+        self._sample_counts[device.value] += block.shape[0]
+
+
+class SessionReader:
+    """
+    Random-access reader for sessions in the session layout.
+
+    Device data files are opened with np.memmap, so slicing a time range or
+    trial only reads the pages that are touched, regardless of session size.
+    """
+
+    def __init__(self, session_dir: Path):
+        """
+        Open a session.
+
+        Args:
+            session_dir: Directory the session was written to
+        """
+        self.session_dir = Path(session_dir)
+
+        with open(self.session_dir / INDEX_FILE_NAME, "r") as file:
+            index = json.load(file)
+
+        if index["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session format version: {index['format_version']}")
+
+        self.devices: Dict[str, Dict] = index["devices"]
+        self.trials: List[Dict] = index["trials"]
+        self._data: Dict[str, np.ndarray] = {}
+
+    def get_device_data(self, device: DeviceTypes) -> np.ndarray:
+        """
+        Return all of a device's samples as a read-only memory-mapped array.
+
+        Args:
+            device: Device to read
+
+        Returns:
+            np.memmap of shape (samples, channels)
+        """
+        if device.value not in self._data:
+            self._data[device.value] = self._open_device_file(device)
+        return self._data[device.value]
+
+    def get_first_sample_index(self, device: DeviceTypes) -> int:
+        """Return the device sample index stored in row 0 of its data."""
+        return self.devices[device.value].get("first_sample_index", 0)
+
+    def get_time_range(self,
+                       device: DeviceTypes,
+                       start_time: float,
+                       end_time: float) -> np.ndarray:
+        """
+        Return a device's samples between two times.
+
+        Args:
+            device: Device to read
+            start_time: Seconds on the device's sample clock
+            end_time: Seconds on the device's sample clock
+
+        Returns:
+            Memory-mapped view of shape (samples, channels). Samples from
+            before recording started are left out.
+        """
+        sampling_rate = self.devices[device.value]["sampling_rate"]
+        origin = self.get_first_sample_index(device)
+        start_index = max(0, int(round(start_time * sampling_rate)) - origin)
+        end_index = max(start_index, int(round(end_time * sampling_rate)) - origin)
+
+        return self.get_device_data(device)[start_index:end_index]
+
+    def get_trial(self, device: DeviceTypes, trial_name: str) -> np.ndarray:
+        """
+        Return a device's samples for a trial.
+
+        Args:
+            device: Device to read
+            trial_name: Name of the trial
+
+        Returns:
+            Memory-mapped view of shape (samples, channels)
+        """
+        for trial in self.trials:
+            if trial["name"] == trial_name:
+                return self.get_time_range(device,
+                                           trial["start_time"],
+                                           trial["end_time"])
+
+        raise KeyError(f"Session has no trial named {trial_name}")
+
+    def _open_device_file(self, device: DeviceTypes) -> np.ndarray:
+        device_info = self.devices[device.value]
+        file_path = self.session_dir / device_info["file"]
+        dtype = np.dtype(device_info["dtype"])
+        channel_count = device_info["channel_count"]
+
+        sample_count = file_path.stat().st_size // (dtype.itemsize * channel_count)
+
+        # np.memmap cannot map an empty file
+        if sample_count == 0:
+            return np.empty((0, channel_count), dtype=dtype)
+
+        return np.memmap(file_path,
+                         dtype=dtype,
+                         mode="r",
+                         shape=(sample_count, channel_count))
@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Full, Queue
+import struct
+import threading
+import time
+from typing import BinaryIO, Iterator, Optional
+
+import numpy as np
+
+from src.devices.device_types import DeviceTypes
+from src.utils.tracing import tracer
+
+
+# Every chunk starts with this header, followed by the sample payload.
+#   magic              4s  b"DSCK"
+#   device             16s DeviceTypes value, UTF-8, null padded
+#   channel_count      H   number of channels per sample
+#   sample_count       I   number of samples in the chunk
+#   sampling_rate      d   samples per second
+#   first_sample_index Q   device sample index of the first sample
+#   host_timestamp     d   time.time() when the block was handed off
+# The payload is sample_count * channel_count little-endian float32 values
+# in (samples, channels) order.
+CHUNK_HEADER = struct.Struct("<4s16sHIdQd")
+CHUNK_MAGIC = b"DSCK"
+SAMPLE_DTYPE = np.dtype("<f4")
+
+
+@dataclass
+class RecordedChunk:
+    """A chunk of samples read back from a session recording."""
+    device: DeviceTypes
+    sampling_rate: float
+    first_sample_index: int
+    host_timestamp: float
+    samples: np.ndarray  # (samples, channels)
+
+
+class SessionRecorder:
+    """
+    Writes sample blocks from device managers to a chunked binary file.
+
+    Blocks are handed off with submit(), which never blocks on disk I/O. A
+    writer thread drains the hand-off queue and writes each block as one
+    chunk. If the writer falls more than `max_pending_blocks` behind, new
+    blocks are dropped and counted in `dropped_blocks` rather than stalling
+    acquisition.
+
+    If writing fails, the writer thread stops, later blocks are dropped and
+    stop() raises the error.
+    """
+
+    STOP_POLL_INTERVAL = 0.1  # seconds
+
+    def __init__(self, file_path: Path, max_pending_blocks: int = 1024):
+        """
+        Initialize the recorder.
+
+        Args:
+            file_path: Path of the recording file (overwritten if it exists)
+            max_pending_blocks: Maximum number of blocks waiting to be written
+        """
+        self.file_path = Path(file_path)
+        self.dropped_blocks = 0
+        self.written_blocks = 0
+
+        # Exception that stopped the writer thread, if any
+        self.writer_error: Optional[BaseException] = None
+
+        self._pending_blocks: Queue = Queue(maxsize=max_pending_blocks)
+        self._file: Optional[BinaryIO] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._is_recording = False
+
+    @property
+    def is_recording(self) -> bool:
+        return self._is_recording
+
+    def start(self) -> None:
+        """Open the recording file and start the writer thread."""
+        if self._is_recording:
+            return
+
+        # Opened here rather than on the writer thread so errors reach the caller
+        self._file = open(self.file_path, "wb")
+
+        self.writer_error = None
+        self._is_recording = True
+        self._writer_thread = threading.Thread(target=self._write_blocks,
+                                               name="SessionRecorder",
+                                               daemon=True)
+        self._writer_thread.start()
+
+    def stop(self) -> None:
+        """
+        Write any pending blocks, then stop the writer thread.
+
+        Raises:
+            RuntimeError: If the writer thread failed while recording
+        """
+        if not self._is_recording:
+            return
+
+        self._is_recording = False
+
+        # Sentinel tells the writer thread to finish once the queue is
+        # drained. A dead writer would never make room for it in a full queue.
+        while self._writer_thread.is_alive():
+            try:
+                self._pending_blocks.put(None, timeout=self.STOP_POLL_INTERVAL)
+                break
+            except Full:
+                pass
+        self._writer_thread.join()
+        self._writer_thread = None
+
+        # Blocks left behind by a failed writer won't be written
+        while not self._pending_blocks.empty():
+            self._pending_blocks.get_nowait()
+
+        self._file.close()
+        self._file = None
+
+        if self.writer_error is not None:
+            raise RuntimeError(f"Recording to {self.file_path} failed after "
+                               f"{self.written_blocks} blocks") from self.writer_error
+
+    def submit(self,
+               device: DeviceTypes,
+               sampling_rate: float,
+               first_sample_index: int,
+               block: np.ndarray) -> bool:
+        """
+        Hand off a block of samples to be written.
+
+        The block is copied, so the caller may reuse its buffer immediately.
+
+        Args:
+            device: Device the samples came from
+            sampling_rate: Device sampling rate
+            first_sample_index: Device sample index of the first sample
+            block: Array of shape (samples, channels)
+
+        Returns:
+            bool: True if the block was queued, False if it was dropped.
+        """
+        if not self._is_recording:
+            return False
+
+        if self.writer_error is not None:
+            self.dropped_blocks += 1
+            return False
+
+        chunk = (device,
+                 sampling_rate,
+                 first_sample_index,
+                 time.time(),
+                 np.array(block, dtype=SAMPLE_DTYPE, order="C"))
+
+        try:
+            self._pending_blocks.put_nowait(chunk)
+            return True
+
+        except Full:
+            self.dropped_blocks += 1
+            return False
+
+    def _write_blocks(self) -> None:
+        try:
+            while True:
+                chunk = self._pending_blocks.get()
+                if chunk is None:
+                    break
+
+                start = tracer.begin()
+                self._write_chunk(self._file, *chunk)
+                self.written_blocks += 1
+                tracer.end("write chunk", start, "recorder")
+
+                # Only flush once the writer has caught up
+                if self._pending_blocks.empty():
+                    self._file.flush()
+
+        except Exception as e:
+            self.writer_error = e  # Raised by stop()
+
+    @staticmethod
+    def _write_chunk(file: BinaryIO,
+                     device: DeviceTypes,
+                     sampling_rate: float,
+                     first_sample_index: int,
+                     host_timestamp: float,
+                     samples: np.ndarray) -> None:
+        sample_count, channel_count = samples.shape
+        header = CHUNK_HEADER.pack(CHUNK_MAGIC,
+                                   device.value.encode(),
+                                   channel_count,
+                                   sample_count,
+                                   sampling_rate,
+                                   first_sample_index,
+                                   host_timestamp)
+        file.write(header)
+        file.write(memoryview(samples).cast("B"))
+
+
+def read_chunks(file_path: Path) -> Iterator[RecordedChunk]:
+    """
+    Read chunks back from a file written by SessionRecorder.
+
+    Args:
+        file_path: Path of the recording file
+
+    Yields:
+        RecordedChunk for each chunk in the file, in write order
+    """
+    with open(file_path, "rb") as file:
+        while header := file.read(CHUNK_HEADER.size):
+            if len(header) < CHUNK_HEADER.size:
+                break  # Truncated recording
+
+            (magic, device, channel_count, sample_count, sampling_rate,
+             first_sample_index, host_timestamp) = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Invalid chunk header in {file_path}")
+
+            payload = file.read(sample_count * channel_count * SAMPLE_DTYPE.itemsize)
+            samples = np.frombuffer(payload, dtype=SAMPLE_DTYPE)
+            if samples.size < sample_count * channel_count:
+                break  # Truncated recording
+
+            yield RecordedChunk(DeviceTypes(device.rstrip(b"\0").decode()),
+                                sampling_rate,
+                                first_sample_index,
+                                host_timestamp,
+                                samples.reshape(sample_count, channel_count))
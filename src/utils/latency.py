@@ -0,0 +1,217 @@
+from enum import Enum
+import json
+import math
+from pathlib import Path
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class LatencyStage(Enum):
+    """
+    Pipeline stages at which a block's latency is measured.
+
+    Every latency is measured from SOCKET_RECEIVE, the time the newest sample
+    of a block was received from the device.
+    """
+    SOCKET_RECEIVE = "Socket receive"
+    ENQUEUE = "Enqueue"  # Written to the device ring buffer
+    DEQUEUE = "Dequeue"  # Read from the ring buffer by a plotter
+    FILTER = "Filter"  # Written to a FilteredStream's ring buffer
+    PLOT_PREPARE = "Plot prepare"  # Decimated and handed to pyqtgraph
+    PAINT = "Paint"  # Painted on screen
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of latencies.
+
+    Buckets are logarithmically spaced, BUCKETS_PER_DECADE to a decade from
+    MIN_LATENCY to MAX_LATENCY, with underflow and overflow buckets at either
+    end. Recording only increments a count, so it never allocates, and
+    percentiles are accurate to the bucket width (about 12%).
+    """
+
+    MIN_LATENCY = 1e-5  # seconds
+    MAX_LATENCY = 100.0  # seconds
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self):
+        decade_count = math.log10(self.MAX_LATENCY / self.MIN_LATENCY)
+        self.bucket_count = int(round(decade_count * self.BUCKETS_PER_DECADE)) + 2
+
+        # Bucket i > 0 holds latencies up to upper_edges[i]
+        exponents = np.arange(self.bucket_count) / self.BUCKETS_PER_DECADE
+        self.upper_edges = self.MIN_LATENCY * 10 ** exponents
+        self.upper_edges[-1] = np.inf
+
+        self.counts = np.zeros(self.bucket_count, dtype=np.int64)
+        self.count = 0
+
+    def record(self, latency: float) -> None:
+        """Add one latency in seconds."""
+        if latency <= self.MIN_LATENCY:
+            index = 0
+        else:
+            index = min(math.ceil(math.log10(latency / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE),
+                        self.bucket_count - 1)
+        self.counts[index] += 1
+        self.count += 1
+
+    def reset(self) -> None:
+        self.counts.fill(0)
+        self.count = 0
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Return the upper edge of the bucket holding a percentile, in seconds.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None if nothing was recorded
+        """
+        if self.count == 0:
+            return None
+
+        rank = math.ceil(percent / 100 * self.count)
+        index = int(np.searchsorted(np.cumsum(self.counts), max(rank, 1)))
+        return float(min(self.upper_edges[index], self.MAX_LATENCY))
+
+    def get_percentiles(self) -> Dict[str, Optional[float]]:
+        """Return p50, p95 and p99 in milliseconds."""
+        return {name: None if value is None else value * 1000
+                for name, value in (("p50", self.percentile(50)),
+                                    ("p95", self.percentile(95)),
+                                    ("p99", self.percentile(99)))}
+
+
+class LatencyTracker:
+    """
+    Per-device latency histograms for each LatencyStage.
+
+    The acquisition thread calls stamp_block() with the time each block was
+    received from the device. Later stages only know sample indices, so
+    record() looks up the receive time of the block holding a sample and adds
+    the time since then to that stage's histogram.
+
+    Stamps are kept in preallocated arrays covering the last STAMP_CAPACITY
+    blocks, so nothing is allocated per block.
+    """
+
+    STAMP_CAPACITY = 4096  # blocks
+
+    def __init__(self, name: str = ""):
+        """
+        Args:
+            name: Label used in dumps, e.g. the device name
+        """
+        self.name = name
+        self.histograms: Dict[LatencyStage, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in LatencyStage if stage != LatencyStage.SOCKET_RECEIVE
+        }
+
+        self._end_indices = np.zeros(self.STAMP_CAPACITY, dtype=np.int64)
+        self._receive_times = np.zeros(self.STAMP_CAPACITY)
+        self._stamp_count = 0
+        self._lock = threading.Lock()
+
+    def stamp_block(self, end_sample_index: int, receive_time: float) -> None:
+        """
+        Record when a block was received and count its ENQUEUE latency.
+
+        Args:
+            end_sample_index: Sample index one past the block's last sample
+            receive_time: time.perf_counter() when the block was received
+        """
+        position = self._stamp_count % self.STAMP_CAPACITY
+        with self._lock:
+            self._end_indices[position] = end_sample_index
+            self._receive_times[position] = receive_time
+            self._stamp_count += 1
+
+        self.histograms[LatencyStage.ENQUEUE].record(time.perf_counter() - receive_time)
+
+    def get_receive_time(self, sample_index: int) -> Optional[float]:
+        """
+        Return the receive time of the block holding a sample.
+
+        Returns:
+            time.perf_counter() value, or None if the block is not stamped
+        """
+        with self._lock:
+            newest = self._stamp_count - 1
+            oldest = max(0, self._stamp_count - self.STAMP_CAPACITY)
+            if newest < 0 or sample_index >= self._end_indices[newest % self.STAMP_CAPACITY]:
+                return None
+
+            # Most lookups are for the newest block
+            if newest == oldest or sample_index >= self._end_indices[(newest - 1) % self.STAMP_CAPACITY]:
+                return float(self._receive_times[newest % self.STAMP_CAPACITY])
+
+            # Binary search for the first block ending after sample_index
+            low, high = oldest, newest
+            while low < high:
+                middle = (low + high) // 2
+                if self._end_indices[middle % self.STAMP_CAPACITY] > sample_index:
+                    high = middle
+                else:
+                    low = middle + 1
+            return float(self._receive_times[low % self.STAMP_CAPACITY])
+
+    def record(self,
+               stage: LatencyStage,
+               sample_index: int,
+               now: Optional[float] = None) -> None:
+        """
+        Count the latency of a sample reaching a stage.
+
+        Args:
+            stage: Stage the sample just passed
+            sample_index: Index of the sample, usually the newest one handled
+            now: time.perf_counter() at the stage (default: now)
+        """
+        receive_time = self.get_receive_time(sample_index)
+        if receive_time is None:
+            return
+
+        if now is None:
+            now = time.perf_counter()
+        self.histograms[stage].record(now - receive_time)
+
+    def reset(self) -> None:
+        """Clear every histogram."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def clear_stamps(self) -> None:
+        """Forget block receive times, e.g. when sample indices restart."""
+        with self._lock:
+            self._stamp_count = 0
+
+    def get_percentiles(self) -> Dict[LatencyStage, Dict[str, Optional[float]]]:
+        """Return p50, p95 and p99 in milliseconds for every stage."""
+        return {stage: histogram.get_percentiles() for stage, histogram in self.histograms.items()}
+
+    def dump(self, file_path: Path) -> None:
+        """
+        Write every stage's percentiles and bucket counts to a JSON file.
+
+        Args:
+            file_path: File to write
+        """
+        stages = {}
+        for stage, histogram in self.histograms.items():
+            stages[stage.value] = {
+                "count": histogram.count,
+                "percentiles_ms": histogram.get_percentiles(),
+                # Upper edges in seconds; the last bucket is unbounded
+                "bucket_upper_edges_s": histogram.upper_edges[:-1].tolist() + [None],
+                "bucket_counts": histogram.counts.tolist(),
+            }
+
+        with open(file_path, "w") as file:
+            json.dump({"name": self.name, "stages": stages}, file, indent=4)
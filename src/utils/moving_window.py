@@ -0,0 +1,115 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.utils.ring_buffer import RingBuffer
+
+
+class MovingWindowAverage:
+    """
+    Moving RMS or moving mean absolute value of ring buffer channels.
+
+    Keeps a running sum of |x| ** power over the last `window_length`
+    samples. Each update() adds the samples written since the last call and
+    subtracts the ones that left the window, which are still in the ring
+    buffer, so the work per new sample is constant regardless of window
+    length.
+
+    With power 2 the result is the moving RMS. With power 1 it is the
+    average rectified value, a simple linear envelope.
+
+    The sums are recomputed from the window every RESYNC_INTERVAL samples,
+    after a gap, and when NaN samples are involved, so rounding errors do not
+    accumulate.
+    """
+
+    RESYNC_INTERVAL = 100_000  # samples
+
+    def __init__(self,
+                 ring_buffer: RingBuffer,
+                 window_length: int,
+                 channels: Optional[Sequence[int]] = None,
+                 power: int = 2):
+        """
+        Args:
+            ring_buffer: Buffer to read samples from
+            window_length: Number of samples averaged over
+            channels: Indices of the channels to track (default: all)
+            power: 2 for RMS, 1 for mean absolute value
+        """
+        if window_length > ring_buffer.capacity:
+            raise ValueError("window_length must not exceed the ring buffer's capacity")
+
+        self.ring_buffer = ring_buffer
+        self.window_length = window_length
+        self.channels = np.arange(ring_buffer.channel_count) if channels is None \
+            else np.asarray(channels, dtype=np.intp)
+        self.power = power
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Restart from the current end of the ring buffer."""
+        self._sums = np.zeros(self.channels.size)
+        self._next_index = self.ring_buffer.total_samples
+        self._samples_since_resync = self.RESYNC_INTERVAL  # Resync on first update
+
+    @property
+    def values(self) -> np.ndarray:
+        """Current RMS or mean absolute value of each tracked channel."""
+        sample_count = min(self._next_index, self.window_length)
+        if sample_count == 0:
+            return np.zeros(self.channels.size)
+
+        means = np.maximum(self._sums, 0) / sample_count
+        return np.sqrt(means) if self.power == 2 else means
+
+    def update(self) -> int:
+        """
+        Take in all samples written since the last update.
+
+        Returns:
+            Number of new samples
+        """
+        window_start = max(0, self._next_index - self.window_length)
+        start, data = self.ring_buffer.read_since(window_start)
+        end = start + data.shape[1]
+        new_count = end - self._next_index
+
+        if new_count <= 0:
+            if end < self._next_index:
+                self.reset()  # The ring buffer was cleared
+            return 0
+
+        self._samples_since_resync += new_count
+        if start != window_start or new_count >= self.window_length \
+                or self._samples_since_resync >= self.RESYNC_INTERVAL:
+            self._resync()
+            return new_count
+
+        entering = self._transform(data[self.channels, -new_count:])
+        leaving_count = max(0, end - self.window_length - start)
+        leaving = self._transform(data[self.channels, :leaving_count])
+
+        self._sums += entering.sum(axis=1, dtype=np.float64)
+        self._sums -= leaving.sum(axis=1, dtype=np.float64)
+        self._next_index = end
+
+        if not np.isfinite(self._sums).all():
+            self._resync()
+        return new_count
+
+    def _resync(self) -> None:
+        """Recompute the sums from the samples currently in the window."""
+        start, window = self.ring_buffer.read_since(self.ring_buffer.total_samples - self.window_length)
+        self._next_index = start + window.shape[1]
+
+        # A block may have been written between the two calls
+        window = window[:, -self.window_length:] if window.shape[1] else window
+
+        self._sums = np.nan_to_num(self._transform(window[self.channels]),
+                                   nan=0.0).sum(axis=1, dtype=np.float64)
+        self._samples_since_resync = 0
+
+    def _transform(self, samples: np.ndarray) -> np.ndarray:
+        return np.abs(samples) if self.power == 1 else np.square(samples, dtype=np.float64)
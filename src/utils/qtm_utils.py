@@ -1,5 +1,6 @@
 import asyncio
 from enum import Enum
+import platform
 
 class OperatingSystem(Enum):
     WINDOWS = "Windows"
@@ -7,12 +8,22 @@ class OperatingSystem(Enum):
     MACOS = "Darwin"
     UNKNOWN = "Unknown"
 
-# Event loop policy determines how events are selected for exectution.
-# Selecting an OS-specific policy makes this selection more efficient.
-# Currently, only Windows is set to use the non-default option.
-event_loop_policies = {
-    OperatingSystem.WINDOWS: asyncio.WindowsSelectorEventLoopPolicy(),
-    OperatingSystem.LINUX: asyncio.DefaultEventLoopPolicy(),
-    OperatingSystem.MACOS: asyncio.DefaultEventLoopPolicy(),
-    OperatingSystem.UNKNOWN: asyncio.DefaultEventLoopPolicy()
-}
+def get_event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """
+    Return the event loop policy for the current operating system.
+
+    Event loop policy determines how events are selected for exectution.
+    Selecting an OS-specific policy makes this selection more efficient.
+    Currently, only Windows is set to use the non-default option.
+
+    WindowsSelectorEventLoopPolicy only exists on Windows, so policies are
+    created on demand rather than looked up from a module-level dict.
+    """
+    try:
+        operating_system = OperatingSystem(platform.system())
+    except ValueError:
+        operating_system = OperatingSystem.UNKNOWN
+
+    if operating_system == OperatingSystem.WINDOWS:
+        return asyncio.WindowsSelectorEventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
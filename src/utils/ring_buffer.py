@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    A thread-safe, fixed-capacity, per-channel sample buffer.
+
+    Samples are stored channel-major as float32. Every sample is written
+    twice, once in each half of the backing array, so that any window of up
+    to `capacity` samples is contiguous and can be returned as a view
+    instead of a copy.
+
+    Each written sample is assigned a monotonic index. Consumers can keep
+    the index they last read and resume from it with read_since().
+
+    Views returned by the read methods point into the live buffer. They
+    stay valid until the writer wraps around onto them, so copy them if
+    they need to be kept longer than a display or processing cycle.
+    """
+
+    def __init__(self,
+                 channel_count: int,
+                 sampling_rate: float,
+                 capacity_seconds: float = 10.0):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            channel_count: Number of channels stored per sample
+            sampling_rate: Number of samples per second
+            capacity_seconds: Length of history kept (default 10 seconds)
+        """
+        self.channel_count = channel_count
+        self.sampling_rate = sampling_rate
+        self.capacity = math.ceil(capacity_seconds * sampling_rate)
+
+        self._data = np.zeros((channel_count, 2 * self.capacity),
+                              dtype=np.float32)
+        self._total_samples = 0
+        self._lock = threading.Lock()
+
+        # time.perf_counter() when the last block was written, for latency
+        # measurements downstream
+        self.last_write_time = 0.0
+
+        # Optional LatencyTracker of the device the samples come from, which
+        # consumers record their stage latencies in
+        self.latency_tracker = None
+
+    @property
+    def total_samples(self) -> int:
+        """Monotonic count of samples written since creation or clear()."""
+        return self._total_samples
+
+    def write(self, block: np.ndarray) -> None:
+        """
+        Write a block of samples.
+
+        If the block is longer than the buffer, only its newest `capacity`
+        samples are kept, but the sample counter still advances by the full
+        block length.
+
+        Args:
+            block: Array of shape (samples, channel_count)
+        """
+        block_length = block.shape[0]
+        if block_length == 0:
+            return
+
+        kept = block[-self.capacity:].T
+
+        with self._lock:
+            start = (self._total_samples + block_length - kept.shape[1]) % self.capacity
+
+            # Split the block where it wraps past the end of the buffer
+            first_length = min(kept.shape[1], self.capacity - start)
+            self._write_segment(start, kept[:, :first_length])
+            self._write_segment(0, kept[:, first_length:])
+
+            self._total_samples += block_length
+            self.last_write_time = time.perf_counter()
+
+    def skip(self, sample_count: int) -> None:
+        """
+        Advance the sample counter over samples that were never received.
+
+        The skipped samples read back as NaN.
+
+        Args:
+            sample_count: Number of samples to skip
+        """
+        if sample_count <= 0:
+            return
+
+        with self._lock:
+            kept = min(sample_count, self.capacity)
+            start = (self._total_samples + sample_count - kept) % self.capacity
+
+            first_length = min(kept, self.capacity - start)
+            for segment_start, length in ((start, first_length), (0, kept - first_length)):
+                for half_start in (segment_start, segment_start + self.capacity):
+                    self._data[:, half_start:half_start + length] = np.nan
+
+            self._total_samples += sample_count
+
+    def latest(self, sample_count: int) -> np.ndarray:
+        """
+        Return the most recent samples without copying.
+
+        Args:
+            sample_count: Number of samples requested. Clipped to the number of
+            samples available.
+
+        Returns:
+            View of shape (channel_count, samples), oldest sample first
+        """
+        with self._lock:
+            return self._window(self._total_samples, sample_count)
+
+    def read_since(self, sample_index: int) -> tuple[int, np.ndarray]:
+        """
+        Return every sample written from `sample_index` onwards.
+
+        If the requested samples have already been overwritten, the returned
+        start index is later than the one requested. The difference is the
+        number of samples the consumer missed.
+
+        Args:
+            sample_index: Index of the first sample wanted
+
+        Returns:
+            Tuple of (index of the first returned sample, view of shape
+            (channel_count, samples))
+        """
+        with self._lock:
+            end = self._total_samples
+            oldest_available = max(0, end - self.capacity)
+            start = min(max(sample_index, oldest_available), end)
+
+            return start, self._window(end, end - start)
+
+    def clear(self) -> None:
+        """Discard all samples and reset the sample counter."""
+        with self._lock:
+            self._data.fill(0)
+            self._total_samples = 0
+
+    def _write_segment(self, start: int, segment: np.ndarray) -> None:
+        """Write a non-wrapping segment to both halves of the buffer."""
+        end = start + segment.shape[1]
+        self._data[:, start:end] = segment
+        self._data[:, start + self.capacity:end + self.capacity] = segment
+
+    def _window(self, end_index: int, sample_count: int) -> np.ndarray:
+        """Return a view of `sample_count` samples ending at `end_index`."""
+        sample_count = max(0, min(sample_count, end_index, self.capacity))
+
+        # Reading from the second half keeps the window contiguous
+        end = end_index % self.capacity + self.capacity
+        return self._data[:, end - sample_count:end]
@@ -0,0 +1,145 @@
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils.trigno_utils import EMGSensorMeta
+
+
+TRIGGER_MUSCLE_NAME = "Trigger"
+SLOT_COUNT = 16  # Trigno Base Station sensor slots, numbered from 1
+SIDES = {"l": "L", "left": "L", "r": "R", "right": "R", "": ""}
+
+
+@dataclass
+class SensorMap:
+    """
+    Sensor placement compiled into plot order.
+
+    Position i of every per-plot attribute describes column i of a routed
+    block. Routing a (samples, 16) Trigno block is a single fancy index with
+    channel_index, so no per-frame lookups are needed.
+
+    Plots are ordered by muscle in order of first appearance in the file, left
+    side first, with the trigger channel last. This is the order
+    RealTimePlotter and DetectedPeakPlotter expect their titles in.
+    """
+    path: Path
+    channel_index: np.ndarray  # (plots,) Trigno column routed to each plot position
+    plot_titles: List[str]  # e.g. "L TA", and "Trigger" for the trigger channel
+    sensor_meta: List[EMGSensorMeta]  # Muscle and side of each plot position
+    bilateral_pairs: np.ndarray  # (pairs, 2) plot positions of left and right sides
+    trigger_channel: Optional[int]  # Plot position of the trigger channel
+
+    @property
+    def plots_are_bilateral(self) -> bool:
+        """Whether every muscle has a sensor on each side."""
+        muscle_count = len(self.plot_titles) - (self.trigger_channel is not None)
+        return muscle_count == 2 * len(self.bilateral_pairs)
+
+    def route(self, block: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Reorder a block of Trigno data into plot order.
+
+        Args:
+            block: Array of shape (samples, 16)
+            out: Optional array of shape (samples, plots) to write into, so
+            that routing allocates nothing
+
+        Returns:
+            Array of shape (samples, plots)
+        """
+        return np.take(block, self.channel_index, axis=1, out=out)
+
+
+def load_sensor_map(path: Path) -> SensorMap:
+    """
+    Parse a sensor map CSV into a SensorMap.
+
+    The file has a header row and one row per sensor:
+
+        slot,muscle,side
+        1,TA,L
+        2,TA,R
+        9,Trigger,
+
+    slot is the Trigno sensor slot (1-16) and side is L or R, or empty for
+    a muscle measured on one side only. The row whose muscle is "Trigger"
+    marks the trigger channel.
+
+    Args:
+        path: CSV file to read
+
+    Returns:
+        SensorMap
+
+    Raises:
+        ValueError: If the file is malformed or uses a slot twice
+    """
+    muscle_slots: Dict[str, Dict[str, int]] = {}  # muscle -> side -> slot
+    trigger_slot: Optional[int] = None
+    used_slots = set()
+
+    with open(path, "r", newline="") as file:
+        reader = csv.DictReader(file, skipinitialspace=True)
+        if reader.fieldnames is None or not {"slot", "muscle", "side"} <= set(reader.fieldnames):
+            raise ValueError(f"{path} needs slot, muscle and side columns")
+
+        for line_number, row in enumerate(reader, start=2):
+            try:
+                slot = int(row["slot"])
+            except (TypeError, ValueError):
+                raise ValueError(f"{path}:{line_number}: slot must be a number") from None
+            if not 1 <= slot <= SLOT_COUNT:
+                raise ValueError(f"{path}:{line_number}: slot must be between 1 and {SLOT_COUNT}")
+            if slot in used_slots:
+                raise ValueError(f"{path}:{line_number}: slot {slot} is used twice")
+            used_slots.add(slot)
+
+            muscle = (row["muscle"] or "").strip()
+            side = SIDES.get((row["side"] or "").strip().lower())
+            if not muscle:
+                raise ValueError(f"{path}:{line_number}: muscle is empty")
+            if side is None:
+                raise ValueError(f"{path}:{line_number}: side must be L, R or empty")
+
+            if muscle.lower() == TRIGGER_MUSCLE_NAME.lower():
+                if trigger_slot is not None:
+                    raise ValueError(f"{path}:{line_number}: more than one trigger channel")
+                trigger_slot = slot
+                continue
+
+            sides = muscle_slots.setdefault(muscle, {})
+            # A muscle is either one unsided sensor or an L and/or R sensor
+            if side in sides or (sides and (side == "") != ("" in sides)):
+                raise ValueError(f"{path}:{line_number}: {muscle} sides are ambiguous")
+            sides[side] = slot
+
+    slots: List[int] = []
+    plot_titles: List[str] = []
+    sensor_meta: List[EMGSensorMeta] = []
+    bilateral_pairs: List[List[int]] = []
+
+    for muscle, sides in muscle_slots.items():
+        if "L" in sides and "R" in sides:
+            bilateral_pairs.append([len(slots), len(slots) + 1])
+        for side in sorted(sides):  # "" < "L" < "R"
+            slots.append(sides[side])
+            plot_titles.append(f"{side} {muscle}" if side else muscle)
+            sensor_meta.append(EMGSensorMeta(muscle_name=muscle, side=side))
+
+    trigger_channel = None
+    if trigger_slot is not None:
+        trigger_channel = len(slots)
+        slots.append(trigger_slot)
+        plot_titles.append(TRIGGER_MUSCLE_NAME)
+        sensor_meta.append(EMGSensorMeta(muscle_name=TRIGGER_MUSCLE_NAME))
+
+    return SensorMap(path=Path(path),
+                     channel_index=np.asarray(slots, dtype=np.intp) - 1,
+                     plot_titles=plot_titles,
+                     sensor_meta=sensor_meta,
+                     bilateral_pairs=np.asarray(bilateral_pairs, dtype=np.intp).reshape(-1, 2),
+                     trigger_channel=trigger_channel)
@@ -0,0 +1,115 @@
+import math
+from multiprocessing import shared_memory
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.utils.ring_buffer import RingBuffer
+
+
+class SharedRingBuffer(RingBuffer):
+    """
+    A RingBuffer whose samples live in a multiprocessing.shared_memory block.
+
+    One process creates the buffer and passes its `name` to others, which
+    attach to it with the same channel count, sampling rate and capacity.
+    Reads in any process return views into the shared block, so the reading
+    process gets samples without copies or pickling.
+
+    Only one process may write. The writer stores samples before publishing
+    the new sample count, so readers never see a count that includes
+    unwritten samples. As with RingBuffer, views stay valid until the writer
+    wraps around onto them.
+
+    The creating process owns the block and should call unlink() once every
+    process has called close().
+    """
+
+    # The sample count and last write time sit at the start of the block,
+    # data follows them
+    HEADER_SIZE = 64  # bytes, keeps the data cache-line aligned
+
+    def __init__(self,
+                 channel_count: int,
+                 sampling_rate: float,
+                 capacity_seconds: float = 10.0,
+                 name: Optional[str] = None):
+        """
+        Create a shared buffer, or attach to an existing one.
+
+        Args:
+            channel_count: Number of channels stored per sample
+            sampling_rate: Number of samples per second
+            capacity_seconds: Length of history kept (default 10 seconds)
+            name: Name of an existing buffer to attach to (default: create
+            a new one)
+        """
+        self.channel_count = channel_count
+        self.sampling_rate = sampling_rate
+        self.capacity_seconds = capacity_seconds
+        self.capacity = math.ceil(capacity_seconds * sampling_rate)
+
+        data_size = channel_count * 2 * self.capacity * np.dtype(np.float32).itemsize
+        self.is_owner = name is None
+        self._shared_memory = shared_memory.SharedMemory(name=name,
+                                                         create=self.is_owner,
+                                                         size=self.HEADER_SIZE + data_size)
+
+        self._header = np.ndarray((1,), dtype=np.int64, buffer=self._shared_memory.buf)
+        self._write_time = np.ndarray((1,), dtype=np.float64, buffer=self._shared_memory.buf,
+                                      offset=self._header.nbytes)
+        self._data = np.ndarray((channel_count, 2 * self.capacity),
+                                dtype=np.float32,
+                                buffer=self._shared_memory.buf,
+                                offset=self.HEADER_SIZE)
+        if self.is_owner:
+            self._header[0] = 0
+            self._write_time[0] = 0.0
+            self._data.fill(0)
+
+        # Only serializes threads within this process
+        self._lock = threading.Lock()
+
+        # Per process, not shared
+        self.latency_tracker = None
+
+    @property
+    def name(self) -> str:
+        """Name other processes attach with."""
+        return self._shared_memory.name
+
+    @property
+    def _total_samples(self) -> int:
+        return int(self._header[0])
+
+    @_total_samples.setter
+    def _total_samples(self, value: int) -> None:
+        self._header[0] = value
+
+    @property
+    def last_write_time(self) -> float:
+        """
+        time.perf_counter() of the writer when it last wrote. perf_counter()
+        is system-wide on Linux and Windows, so it compares across processes.
+        """
+        return float(self._write_time[0])
+
+    @last_write_time.setter
+    def last_write_time(self, value: float) -> None:
+        self._write_time[0] = value
+
+    def close(self) -> None:
+        """
+        Detach this process from the shared block.
+
+        Views returned by earlier reads must not be used afterwards.
+        """
+        self._header = None
+        self._write_time = None
+        self._data = None
+        self._shared_memory.close()
+
+    def unlink(self) -> None:
+        """Free the shared block. Only the creating process should call this."""
+        self._shared_memory.unlink()
@@ -0,0 +1,172 @@
+from array import array
+from contextlib import contextmanager
+import itertools
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Dict, Iterator, List
+
+
+class Tracer:
+    """
+    Records timed spans into a preallocated in-memory buffer.
+
+    Spans are kept in fixed-size arrays used as a ring, so a long session
+    keeps its most recent `capacity` spans. The arrays are allocated when
+    tracing is first enabled. Names and categories are stored as integer
+    ids. Recording is lock-free: each span claims a slot from an atomic
+    counter.
+
+    Tracing is off by default. While it is off, begin() and end() do
+    nothing but check a flag, so hot paths can be instrumented permanently:
+
+        start = tracer.begin()
+        frames = client.receive_emg_frames()
+        tracer.end("socket read", start, "trigno")
+
+    span() is the more readable form for code that runs a few times per
+    frame or less:
+
+        with tracer.span("configure", "trigno"):
+            ...
+
+    export_chrome_trace() writes the spans as Chrome trace-event JSON, which
+    trace viewers such as chrome://tracing or ui.perfetto.dev can open.
+    """
+
+    DEFAULT_CAPACITY = 1_000_000  # spans
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = False):
+        """
+        Args:
+            capacity: Number of spans kept
+            enabled: Whether to start recording immediately
+        """
+        self.capacity = capacity
+        self.enabled = False
+
+        self._starts = array("d")
+        self._durations = array("d")
+        self._name_ids = array("i")
+        self._category_ids = array("i")
+        self._thread_ids = array("Q")
+        self._counter = itertools.count()
+        self._span_count = 0
+
+        # Interned names and categories, looked up by id on export
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._intern_lock = threading.Lock()
+        self._thread_names: Dict[int, str] = {}
+
+        if enabled:
+            self.enable()
+
+    def enable(self) -> None:
+        if not self._starts:
+            for buffer in (self._starts, self._durations, self._name_ids,
+                           self._category_ids, self._thread_ids):
+                buffer.extend(itertools.repeat(0, self.capacity))
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        """Discard every recorded span."""
+        self._counter = itertools.count()
+        self._span_count = 0
+
+    def begin(self) -> float:
+        """Return the start time of a span, or 0 while tracing is off."""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def end(self, name: str, start: float, category: str = "") -> None:
+        """
+        Record a span that started at a time returned by begin().
+
+        Args:
+            name: What the span covers, e.g. "socket read"
+            start: Value returned by begin()
+            category: Group of the span, e.g. the device
+        """
+        if not self.enabled or start == 0.0:
+            return
+
+        end = time.perf_counter()
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+
+        index = next(self._counter)
+        position = index % self.capacity
+        self._starts[position] = start
+        self._durations[position] = end - start
+        self._name_ids[position] = self._intern(name)
+        self._category_ids[position] = self._intern(category)
+        self._thread_ids[position] = thread_id
+        self._span_count = max(self._span_count, index + 1)
+
+    @contextmanager
+    def span(self, name: str, category: str = "") -> Iterator[None]:
+        """Record the time spent in a with block as a span."""
+        start = self.begin()
+        try:
+            yield
+        finally:
+            self.end(name, start, category)
+
+    @property
+    def span_count(self) -> int:
+        """Number of spans held, at most `capacity`."""
+        return min(self._span_count, self.capacity)
+
+    def export_chrome_trace(self, file_path: Path) -> None:
+        """
+        Write the recorded spans as Chrome trace-event JSON.
+
+        Args:
+            file_path: File to write
+        """
+        # Oldest span first once the ring has wrapped
+        positions = [index % self.capacity
+                     for index in range(self._span_count - self.span_count, self._span_count)]
+
+        process_id = os.getpid()
+        events = [{"name": "thread_name",
+                   "ph": "M",
+                   "pid": process_id,
+                   "tid": thread_id,
+                   "args": {"name": thread_name}}
+                  for thread_id, thread_name in list(self._thread_names.items())]
+
+        for position in positions:
+            events.append({"name": self._strings[self._name_ids[position]],
+                           "cat": self._strings[self._category_ids[position]],
+                           "ph": "X",
+                           # Microseconds, as the format expects
+                           "ts": self._starts[position] * 1e6,
+                           "dur": self._durations[position] * 1e6,
+                           "pid": process_id,
+                           "tid": self._thread_ids[position]})
+
+        with open(file_path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def _intern(self, string: str) -> int:
+        string_id = self._ids.get(string)
+        if string_id is None:
+            with self._intern_lock:
+                string_id = self._ids.get(string)
+                if string_id is None:
+                    self._strings.append(string)
+                    string_id = len(self._strings) - 1
+                    self._ids[string] = string_id
+        return string_id
+
+
+# Shared by the whole application. Set TRACE=1 to record from startup; main.py
+# then writes the trace to TRACE_FILE (default trace.json) on exit.
+tracer = Tracer(enabled=os.environ.get("TRACE") == "1")
@@ -1,13 +1,14 @@
 from dataclasses import asdict, dataclass
+from functools import lru_cache
+from importlib import resources
 from io import StringIO
 import json
 from pathlib import Path
-import pkg_resources
 import time
 from typing import Dict, List
 
 
-__all__ = ("EMGSensorMeta", "EMGSensor", "DSChannel")
+__all__ = ("EMGSensorMeta", "EMGSensor", "DSChannel", "SensorInventory")
 
 
 @dataclass
@@ -35,6 +36,15 @@ class EMGSensor:
     channels: List[DSChannel]
 
 
+@dataclass
+class SensorInventory:
+    """Sensors known to the Base Station, by slot number (1-16)"""
+
+    paired: List[int]
+    active: List[int]
+    sensors: Dict[int, EMGSensor]  # Properties of each paired sensor
+
+
 @dataclass
 class EMGSensorMeta:
     """Metadata associated with a EMG sensor
@@ -45,9 +55,15 @@ class EMGSensorMeta:
     side: str = ""
 
 
+@lru_cache(maxsize=None)
 def load_avanti_modes():
-    """Load Avanti modes file. Must use Unix line endings."""
-    raw = pkg_resources.resource_string(__name__, "avanti_modes.tsv").decode()
+    """
+    Load Avanti modes file. Must use Unix line endings.
+
+    The file is parsed once; later calls return the same dict, so don't
+    modify it.
+    """
+    raw = resources.files(__package__).joinpath("avanti_modes.tsv").read_text()
     buf = StringIO(raw.strip())
     keys = buf.readline().strip().split("\t")[1:]
     modes = {}
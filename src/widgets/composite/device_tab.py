@@ -1,20 +1,30 @@
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 from PySide6.QtWidgets import QLabel, QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QGroupBox
 from PySide6.QtCore import Signal
 
+from src.devices.device_registry import create_manager, load_manager_class
 from src.devices.device_types import DeviceTypes
-from src.ui.basic.slide_toggle import SlideToggle
+from src.utils.message_utils import MessageUtils
+from src.widgets.basic.slide_toggle import SlideToggle
+from src.widgets.composite.latency_widget import LatencyWidget
+
+if TYPE_CHECKING:
+    from src.utils.latency import LatencyTracker
 
 class DeviceWidget(QWidget):
-    signal_connection_toggled = Signal(DeviceTypes, str)
-    signal_streaming_toggled = Signal(DeviceTypes, str)
+    signal_connection_toggled = Signal(object, bool)
+    signal_streaming_toggled = Signal(object, bool)
 
     def __init__(self, device: Optional[DeviceTypes] = None):
         super().__init__()
 
         self.device = device if device else "Global"
 
+        # Imported on first connection, so SDKs load only for devices in use
+        self.manager_class: Optional[type] = None
+        self.manager = None
+
         # Create labels and toggle switches
         self.connection_label = QLabel("Connection")
         self.connection_toggle = SlideToggle()
@@ -43,10 +53,14 @@ class DeviceWidget(QWidget):
 
         self.plots_group_box.setLayout(self.plots_layout)
 
+        # Filled in once the device's manager is created on first connection
+        self.latency_widget = LatencyWidget()
+
         # Arrange connection, streaming, and plots
         self.main_layout = QHBoxLayout()
         self.main_layout.addLayout(self.connection_streaming_layout)
         self.main_layout.addWidget(self.plots_group_box)
+        self.main_layout.addWidget(self.latency_widget)
 
         # Set up main layout
         self.setLayout(self.main_layout)
@@ -54,14 +68,86 @@ class DeviceWidget(QWidget):
         # Connect signals
         self._connect_signals()
 
+    def set_latency_tracker(self, latency_tracker: "LatencyTracker"):
+        """Show the latencies of the device's manager."""
+        self.latency_widget.set_latency_tracker(latency_tracker)
+
     def _connect_signals(self):
         self.connection_toggle.signal_toggled.connect(self._connection_toggled)
         self.streaming_toggle.signal_toggled.connect(self._streaming_toggled)
 
+    def load_backend(self) -> bool:
+        """
+        Import the device's manager, if not done yet.
+
+        Returns:
+            bool: False if the device's SDK could not be imported
+        """
+        if self.manager_class is None and isinstance(self.device, DeviceTypes):
+            try:
+                self.manager_class = load_manager_class(self.device)
+            except ImportError as e:
+                MessageUtils.show_error_message(self,
+                                                "Device Error",
+                                                f"Failed to Load {self.device.value}",
+                                                f"The device backend could not be imported: {e}")
+                return False
+        return True
+
     def _connection_toggled(self, is_connected: bool):
+        if isinstance(self.device, DeviceTypes):
+            if is_connected and not (self.load_backend() and self._connect_manager()):
+                self._set_toggle_silently(self.connection_toggle, False)
+                return
+            if not is_connected and self.manager is not None:
+                if self.streaming_toggle.isChecked():
+                    self._set_toggle_silently(self.streaming_toggle, False)
+                    self._run_manager_command("stop_streaming")
+                self._run_manager_command("disconnect")
+
         self.signal_connection_toggled.emit(self.device, is_connected)
-        print(f"Emitting: {self.device}, {is_connected}")
 
     def _streaming_toggled(self, is_streaming: bool):
+        if isinstance(self.device, DeviceTypes):
+            command = "start_streaming" if is_streaming else "stop_streaming"
+            if not self.connection_toggle.isChecked() or not self._run_manager_command(command):
+                self._set_toggle_silently(self.streaming_toggle, not is_streaming)
+                return
+
         self.signal_streaming_toggled.emit(self.device, is_streaming)
-        print(f"Emitting: {self.device}, {is_streaming}")
\ No newline at end of file
+
+    def _connect_manager(self) -> bool:
+        """Create the device's manager from its loaded class, if needed, and connect it."""
+        if self.manager is None:
+            self.manager = create_manager(self.device, self.manager_class)
+            self.set_latency_tracker(self.manager.latency_tracker)
+
+        return self._run_manager_command("connect")
+
+    def _run_manager_command(self, command: str) -> bool:
+        """
+        Call a manager method, showing an error message if it fails.
+
+        Returns:
+            bool: False if the method raised or returned False
+        """
+        try:
+            succeeded = getattr(self.manager, command)() is not False
+            error = "The device did not respond."
+        except Exception as e:
+            succeeded = False
+            error = str(e)
+
+        if not succeeded:
+            MessageUtils.show_error_message(self,
+                                            "Device Error",
+                                            f"{self.device.value} {command.replace('_', ' ')} failed",
+                                            error)
+        return succeeded
+
+    @staticmethod
+    def _set_toggle_silently(toggle: SlideToggle, checked: bool):
+        """Set a toggle without emitting signal_toggled."""
+        toggle.blockSignals(True)
+        toggle.setChecked(checked)
+        toggle.blockSignals(False)
\ No newline at end of file
@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (QFileDialog, QGroupBox, QHBoxLayout, QPushButton,
+                               QTableWidget, QTableWidgetItem, QVBoxLayout)
+
+# Only for annotations, so the widget can be built without numpy loaded
+if TYPE_CHECKING:
+    from src.utils.latency import LatencyTracker
+
+
+class LatencyWidget(QGroupBox):
+    """
+    Table of a device's p50, p95 and p99 latency at each pipeline stage, in
+    milliseconds, with buttons to reset the histograms and dump them to a
+    JSON file.
+    """
+
+    PERCENTILES = ("p50", "p95", "p99")
+    REFRESH_INTERVAL = 1000  # ms
+
+    def __init__(self, latency_tracker: Optional["LatencyTracker"] = None, parent=None):
+        super().__init__("Latency (ms)", parent)
+
+        self.latency_tracker: Optional["LatencyTracker"] = None
+
+        self.table = QTableWidget(0, len(self.PERCENTILES))
+        self.table.setHorizontalHeaderLabels(list(self.PERCENTILES))
+
+        self.reset_button = QPushButton("Reset")
+        self.dump_button = QPushButton("Dump...")
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.reset_button)
+        button_layout.addWidget(self.dump_button)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self._connect_signals()
+
+        if latency_tracker is not None:
+            self.set_latency_tracker(latency_tracker)
+
+    def set_latency_tracker(self, latency_tracker: "LatencyTracker") -> None:
+        """Show the latencies of a device manager's tracker."""
+        self.latency_tracker = latency_tracker
+
+        stages = list(latency_tracker.histograms)
+        self.table.setRowCount(len(stages))
+        self.table.setVerticalHeaderLabels([stage.value for stage in stages])
+
+        self.refresh()
+        self.refresh_timer.start()
+
+    def refresh(self) -> None:
+        """Update the table from the tracker's histograms."""
+        if self.latency_tracker is None:
+            return
+
+        for row, percentiles in enumerate(self.latency_tracker.get_percentiles().values()):
+            for column, name in enumerate(self.PERCENTILES):
+                value = percentiles[name]
+                text = "-" if value is None else f"{value:.1f}"
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def _connect_signals(self):
+        self.reset_button.clicked.connect(self._reset)
+        self.dump_button.clicked.connect(self._dump)
+
+    def _reset(self):
+        if self.latency_tracker is not None:
+            self.latency_tracker.reset()
+            self.refresh()
+
+    def _dump(self):
+        if self.latency_tracker is None:
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(self,
+                                                   "Save Latency Histograms",
+                                                   f"{self.latency_tracker.name}_latency.json",
+                                                   "JSON files (*.json)")
+        if file_path:
+            self.latency_tracker.dump(Path(file_path))
@@ -1,19 +1,66 @@
+from typing import Dict, Optional
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget)
 
-from src.ui.composite.config_widget import ConfigWidget
-from src.ui.composite.trial_widget import TrialWidget
-from src.ui.composite.device_tab import DeviceWidget
+from src.widgets.composite.config_widget import ConfigWidget
+from src.widgets.composite.trial_widget import TrialWidget
+from src.widgets.composite.device_tab import DeviceWidget
 from src.devices.device_types import DeviceTypes
 
 
 class TabbedWidget(QTabWidget):
+    """
+    One DeviceWidget tab per device.
+
+    Device tabs are built the first time they are shown, and each device's
+    backend is imported the first time it is connected.
+    """
+
+    DEVICE_TABS = [(None, "Global"),
+                   (DeviceTypes.QTM, "QTM"),
+                   (DeviceTypes.TRIGNO, "Trigno"),
+                   (DeviceTypes.USBAMP, "USBAmp")]
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.addTab(DeviceWidget(), "Global")
-        self.addTab(DeviceWidget(DeviceTypes.QTM), "QTM")
-        self.addTab(DeviceWidget(DeviceTypes.TRIGNO), "Trigno")
-        self.addTab(DeviceWidget(DeviceTypes.USBAMP), "USBAmp")
+        self.device_widgets: Dict[Optional[DeviceTypes], DeviceWidget] = {}
+
+        # Placeholders are replaced by DeviceWidgets in _build_tab()
+        for _, title in self.DEVICE_TABS:
+            self.addTab(QWidget(), title)
+
+        self.currentChanged.connect(self._build_tab)
+        self._build_tab(self.currentIndex())
+
+    def get_device_widget(self, device: Optional[DeviceTypes]) -> DeviceWidget:
+        """Return a device's tab, building it if it has not been shown yet."""
+        index = [tab_device for tab_device, _ in self.DEVICE_TABS].index(device)
+        self._build_tab(index)
+        return self.device_widgets[device]
+
+    def _build_tab(self, index: int) -> None:
+        if index < 0:
+            return
+
+        device, title = self.DEVICE_TABS[index]
+        if device in self.device_widgets:
+            return
+
+        device_widget = DeviceWidget(device)
+        self.device_widgets[device] = device_widget
+
+        # Replacing a tab moves the current index; don't recurse meanwhile
+        current_index = self.currentIndex()
+        placeholder = self.widget(index)
+
+        self.blockSignals(True)
+        self.removeTab(index)
+        self.insertTab(index, device_widget, title)
+        self.setCurrentIndex(current_index)
+        self.blockSignals(False)
+
+        placeholder.deleteLater()
 
 class TopWidget(QWidget):
     def __init__(self, parent=None):
@@ -5,7 +5,7 @@ from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QMainWindow
 
 from src.managers.config_manager import ConfigManager
-from src.ui.composite.config_widget import ConfigWidget
+from src.widgets.composite.config_widget import ConfigWidget
 
 
 class ConfigMainWindow(QMainWindow):
@@ -45,14 +45,15 @@ class ConfigMainWindow(QMainWindow):
         self.config_manager.set_config(config_data)
         self.config_manager.export_config()
 
-    def _handle_sensor_map_upload(self, sensor_map_path: str) -> None:
+    def _handle_sensor_map_upload(self, sensor_map_path: Path) -> None:
         """
-        Handles the sensor map upload signal.
+        Handles the sensor map upload signal by compiling the sensor map, so
+        that a malformed file is reported straight away.
 
         Args:
-            sensor_map_path (str): The path of the uploaded sensor map.
+            sensor_map_path (Path): The path of the uploaded sensor map.
         """
-        print(sensor_map_path)
+        self.config_manager.load_sensor_map(sensor_map_path)
 
     def _handle_set_config(self, config_data: Dict[str, str]) -> None:
         """
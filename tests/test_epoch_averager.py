@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.detectors.epoch_averager import AveragingMode, EpochAverager
+
+CHANNEL_COUNT = 4
+SAMPLE_COUNT = 50
+
+
+@pytest.fixture
+def epochs() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return 1e-3 * rng.standard_normal((30, CHANNEL_COUNT, SAMPLE_COUNT)) + 5e-3
+
+
+def test_cumulative_matches_numpy(epochs):
+    averager = EpochAverager(CHANNEL_COUNT, SAMPLE_COUNT, AveragingMode.CUMULATIVE)
+    for epoch in epochs:
+        averager.add(epoch)
+
+    assert averager.count == len(epochs)
+    np.testing.assert_allclose(averager.mean, epochs.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(averager.std, epochs.std(axis=0, ddof=1), rtol=1e-8)
+
+
+@pytest.mark.parametrize("epoch_count", [3, 10, 30])
+def test_window_matches_numpy(epochs, epoch_count):
+    window_size = 10
+    averager = EpochAverager(CHANNEL_COUNT, SAMPLE_COUNT, AveragingMode.WINDOW, window_size)
+    for epoch in epochs[:epoch_count]:
+        averager.add(epoch)
+
+    window = epochs[max(0, epoch_count - window_size):epoch_count]
+    np.testing.assert_allclose(averager.mean, window.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(averager.std, window.std(axis=0, ddof=1), rtol=1e-6)
+
+
+def test_exponential_matches_weighted_mean(epochs):
+    smoothing = 0.2
+    averager = EpochAverager(CHANNEL_COUNT, SAMPLE_COUNT, AveragingMode.EXPONENTIAL,
+                             smoothing=smoothing)
+    for epoch in epochs:
+        averager.add(epoch)
+
+    # The first epoch seeds the mean, and each later one has weight `smoothing`
+    weights = smoothing * (1 - smoothing) ** np.arange(len(epochs) - 1, -1, -1)
+    weights[0] = (1 - smoothing) ** (len(epochs) - 1)
+    expected = np.tensordot(weights, epochs, axes=1)
+
+    np.testing.assert_allclose(averager.mean, expected, rtol=1e-10)
+
+
+def test_variance_is_zero_for_one_epoch(epochs):
+    averager = EpochAverager(CHANNEL_COUNT, SAMPLE_COUNT)
+    averager.add(epochs[0])
+
+    np.testing.assert_array_equal(averager.mean, epochs[0])
+    np.testing.assert_array_equal(averager.std, 0)
+
+
+def test_reset_forgets_epochs(epochs):
+    averager = EpochAverager(CHANNEL_COUNT, SAMPLE_COUNT, AveragingMode.WINDOW, window_size=5)
+    for epoch in epochs[:8]:
+        averager.add(epoch)
+    averager.reset()
+    for epoch in epochs[10:13]:
+        averager.add(epoch)
+
+    np.testing.assert_allclose(averager.mean, epochs[10:13].mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(averager.std, epochs[10:13].std(axis=0, ddof=1), rtol=1e-8)
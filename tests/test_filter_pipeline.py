@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from src.filters.filter_pipeline import (BandPassStage, EnvelopeStage, FilterPipeline,
+                                         NotchStage, RectifyStage, create_emg_pipeline)
+
+SAMPLING_RATE = 2000.0
+CHANNEL_COUNT = 3
+
+
+@pytest.fixture
+def stream() -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((5000, CHANNEL_COUNT)).astype(np.float32)
+
+
+def filter_in_blocks(pipeline: FilterPipeline, data: np.ndarray, block_lengths) -> np.ndarray:
+    blocks = []
+    start = 0
+    for length in block_lengths:
+        blocks.append(pipeline.process(data[start:start + length]))
+        start += length
+    blocks.append(pipeline.process(data[start:]))
+    return np.concatenate(blocks)
+
+
+def filter_offline(stages, data: np.ndarray) -> np.ndarray:
+    filtered = data
+    for stage in stages:
+        if isinstance(stage, RectifyStage):
+            filtered = np.abs(filtered)
+        else:
+            filtered = signal.sosfilt(stage.sos, filtered, axis=0)
+    return filtered
+
+
+def test_block_output_matches_offline_sosfilt(stream):
+    stages = [BandPassStage(SAMPLING_RATE, CHANNEL_COUNT),
+              NotchStage(SAMPLING_RATE, CHANNEL_COUNT, harmonics=3),
+              RectifyStage(),
+              EnvelopeStage(SAMPLING_RATE, CHANNEL_COUNT)]
+    expected = filter_offline(stages, stream)
+
+    pipeline = FilterPipeline(stages)
+    filtered = filter_in_blocks(pipeline, stream, [1, 27, 100, 0, 999, 64])
+
+    assert filtered.dtype == np.float32
+    np.testing.assert_allclose(filtered, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_reset_restarts_filter_state(stream):
+    pipeline = create_emg_pipeline(SAMPLING_RATE, CHANNEL_COUNT)
+    first = pipeline.process(stream[:500])
+    pipeline.process(stream[500:])
+    pipeline.reset()
+
+    np.testing.assert_array_equal(pipeline.process(stream[:500]), first)
+
+
+def test_unfiltered_channels_pass_through(stream):
+    pipeline = create_emg_pipeline(SAMPLING_RATE, CHANNEL_COUNT, channels=[0, 2])
+    stages = [BandPassStage(SAMPLING_RATE, 2), NotchStage(SAMPLING_RATE, 2)]
+    expected = filter_offline(stages, stream[:, [0, 2]])
+
+    filtered = filter_in_blocks(pipeline, stream, [250, 250])
+
+    np.testing.assert_array_equal(filtered[:, 1], stream[:, 1])
+    np.testing.assert_allclose(filtered[:, [0, 2]], expected, rtol=1e-4, atol=1e-5)
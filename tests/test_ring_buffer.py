@@ -0,0 +1,101 @@
+import numpy as np
+
+from src.utils.ring_buffer import RingBuffer
+
+
+def make_block(start: int, length: int, channel_count: int = 2) -> np.ndarray:
+    """Block of shape (samples, channels) whose values are their sample indices."""
+    samples = np.arange(start, start + length, dtype=np.float32)
+    return np.column_stack([samples + 1000 * channel for channel in range(channel_count)])
+
+
+def test_latest_after_wraparound():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    for start in range(0, 35, 7):
+        ring_buffer.write(make_block(start, 7))
+
+    assert ring_buffer.total_samples == 35
+    np.testing.assert_array_equal(ring_buffer.latest(10), make_block(25, 10).T)
+    np.testing.assert_array_equal(ring_buffer.latest(100), make_block(25, 10).T)
+
+
+def test_block_longer_than_capacity_keeps_newest_samples():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 3))
+    ring_buffer.write(make_block(3, 25))
+
+    assert ring_buffer.total_samples == 28
+    np.testing.assert_array_equal(ring_buffer.latest(10), make_block(18, 10).T)
+
+
+def test_latest_is_a_view():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    for start in range(0, 16, 4):
+        ring_buffer.write(make_block(start, 4))
+
+    window = ring_buffer.latest(10)
+    assert not window.flags.owndata
+
+
+def test_read_since_across_mirror_boundary():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 8))
+    ring_buffer.write(make_block(8, 5))  # Wraps from index 8 to 2
+
+    first_index, data = ring_buffer.read_since(6)
+
+    assert first_index == 6
+    np.testing.assert_array_equal(data, make_block(6, 7).T)
+
+
+def test_read_since_reports_overwritten_samples():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 23))
+
+    first_index, data = ring_buffer.read_since(5)
+
+    assert first_index == 13
+    np.testing.assert_array_equal(data, make_block(13, 10).T)
+
+
+def test_read_since_when_up_to_date():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 4))
+
+    first_index, data = ring_buffer.read_since(4)
+
+    assert first_index == 4
+    assert data.shape == (2, 0)
+
+
+def test_skip_across_mirror_boundary_reads_nan():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 7))
+    ring_buffer.skip(6)  # Indices 7 to 12 wrap past the end of the buffer
+    ring_buffer.write(make_block(13, 2))
+
+    first_index, data = ring_buffer.read_since(5)
+
+    assert first_index == 5
+    assert ring_buffer.total_samples == 15
+    np.testing.assert_array_equal(data[:, :2], make_block(5, 2).T)
+    assert np.isnan(data[:, 2:8]).all()
+    np.testing.assert_array_equal(data[:, 8:], make_block(13, 2).T)
+
+
+def test_skip_longer_than_capacity():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 4))
+    ring_buffer.skip(25)
+
+    assert ring_buffer.total_samples == 29
+    assert np.isnan(ring_buffer.latest(10)).all()
+
+
+def test_clear_resets_sample_counter():
+    ring_buffer = RingBuffer(2, sampling_rate=10, capacity_seconds=1)
+    ring_buffer.write(make_block(0, 4))
+    ring_buffer.clear()
+
+    assert ring_buffer.total_samples == 0
+    assert ring_buffer.latest(10).shape == (2, 0)
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+
+from src.devices.device_types import DeviceTypes
+from src.recorders.session_format import INDEX_FILE_NAME, SessionReader, SessionWriter
+
+
+def make_block(start: int, length: int, channel_count: int = 3) -> np.ndarray:
+    """Block of shape (samples, channels) whose values are their sample indices."""
+    samples = np.arange(start, start + length, dtype=np.float32)
+    return np.column_stack([samples + 1000 * channel for channel in range(channel_count)])
+
+
+def test_round_trip_with_gaps(tmp_path):
+    writer = SessionWriter(tmp_path)
+    writer.add_device(DeviceTypes.TRIGNO, 3, 100.0, ["L TA", "R TA", "Trigger"])
+    writer.append(DeviceTypes.TRIGNO, make_block(0, 10), 0)
+    writer.append(DeviceTypes.TRIGNO, make_block(15, 10), 15)  # 5 samples lost
+    writer.append(DeviceTypes.TRIGNO, make_block(20, 10), 20)  # Overlaps by 5
+    writer.add_trial("trial_1", 0.05, 0.2, stimulus_intensity=12.0)
+    writer.close()
+
+    reader = SessionReader(tmp_path)
+    data = reader.get_device_data(DeviceTypes.TRIGNO)
+
+    assert data.shape == (30, 3)
+    np.testing.assert_array_equal(data[:10], make_block(0, 10))
+    assert np.isnan(data[10:15]).all()
+    np.testing.assert_array_equal(data[15:], make_block(15, 15))
+
+    assert reader.devices["Trigno"]["channel_names"] == ["L TA", "R TA", "Trigger"]
+    assert reader.trials[0]["stimulus_intensity"] == 12.0
+
+    trial = reader.get_trial(DeviceTypes.TRIGNO, "trial_1")
+    assert trial.shape == (15, 3)
+    np.testing.assert_array_equal(trial[:5], make_block(5, 5))
+    assert np.isnan(trial[5:10]).all()
+
+
+def test_recording_started_mid_stream(tmp_path):
+    writer = SessionWriter(tmp_path)
+    writer.add_device(DeviceTypes.TRIGNO, 3, 100.0)
+    writer.append(DeviceTypes.TRIGNO, make_block(5000, 10), 5000)
+    writer.append(DeviceTypes.TRIGNO, make_block(5012, 3), 5012)
+    writer.add_trial("trial_1", 50.0, 50.05)
+    writer.close()
+
+    with open(tmp_path / INDEX_FILE_NAME) as file:
+        assert json.load(file)["devices"]["Trigno"]["first_sample_index"] == 5000
+
+    reader = SessionReader(tmp_path)
+    data = reader.get_device_data(DeviceTypes.TRIGNO)
+
+    assert reader.get_first_sample_index(DeviceTypes.TRIGNO) == 5000
+    assert data.shape == (15, 3)
+    assert np.isnan(data[10:12]).all()
+    np.testing.assert_array_equal(reader.get_trial(DeviceTypes.TRIGNO, "trial_1"),
+                                  make_block(5000, 5))
+
+    # Times before recording started are left out
+    np.testing.assert_array_equal(reader.get_time_range(DeviceTypes.TRIGNO, 0.0, 50.02),
+                                  make_block(5000, 2))
+
+
+def test_device_without_data(tmp_path):
+    writer = SessionWriter(tmp_path)
+    writer.add_device(DeviceTypes.USBAMP, 4, 1200.0)
+    writer.close()
+
+    reader = SessionReader(tmp_path)
+
+    assert reader.get_first_sample_index(DeviceTypes.USBAMP) == 0
+    assert reader.get_device_data(DeviceTypes.USBAMP).shape == (0, 4)